@@ -1,30 +1,89 @@
 """Nicehash Excavator integration."""
 from __future__ import annotations
 
+import asyncio
+from datetime import timedelta
 import logging
 
+import voluptuous as vol
+
+from homeassistant.components import persistent_notification, websocket_api
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
-
-from .const import CONFIG_ENABLE_DEBUG_LOGGING, CONFIG_UPDATE_INTERVAL, DOMAIN
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.service import async_extract_config_entry_ids
+
+from .bulk import async_import_yaml
+from .commands import CommandQueue
+from .const import (
+    CONFIG_ENABLE_DEBUG_LOGGING,
+    ATTR_DURATION,
+    CONFIG_ENABLE_PUSH,
+    DATA_FARM,
+    DATA_METRICS_VIEW,
+    DATA_PROFILER,
+    DEFAULT_PROFILE_DURATION,
+    DOMAIN,
+    MAX_PROFILE_DURATION,
+    SERVICE_PROFILE,
+    SERVICE_REFRESH,
+)
+from .farm import Farm
+from .history import HistoryStore, websocket_query_history
+from .metrics import ExcavatorMetricsView
 from .mining_rig import MiningRig
+from .profiler import Profiler
+from .push import async_register_webhook, async_unregister_webhook
+from .statistics import StatisticsAggregator
+from .telemetry import websocket_subscribe_telemetry
+from .tuner import EfficiencyTuner
 
 _LOGGER = logging.getLogger(__name__)
 
 
-PLATFORMS = [Platform.SENSOR, Platform.SWITCH]
+PLATFORMS = [Platform.NUMBER, Platform.SENSOR, Platform.SWITCH]
+
+# Rigs are checked one by one, a broken rig must not reject the whole list
+CONFIG_SCHEMA = vol.Schema(
+    {DOMAIN: vol.All(cv.ensure_list, [dict])}, extra=vol.ALLOW_EXTRA
+)
+
+
+async def async_setup(hass: HomeAssistant, config: dict) -> bool:
+    """Register the websocket commands and add the rigs in configuration.yaml."""
+    websocket_api.async_register_command(hass, websocket_subscribe_telemetry)
+    websocket_api.async_register_command(hass, websocket_query_history)
+    if DOMAIN in config:
+        hass.async_create_task(async_import_yaml(hass, config[DOMAIN]))
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> bool:
     """Set up a config entry."""
 
-    mining_rig = MiningRig(hass, config_entry)
+    farm: Farm = hass.data.setdefault(DATA_FARM, Farm())
+    mining_rig = MiningRig(hass, config_entry, farm)
+    if mining_rig.enable_controls:
+        await mining_rig.commands.async_load()
+        await mining_rig.tuner.async_load()
+    if mining_rig.history_enabled:
+        await mining_rig.async_open_history()
+    if mining_rig.external_statistics:
+        # After the unload of a reloaded entry has stored its hour
+        await mining_rig.async_open_statistics()
     await mining_rig.update()
 
     hass.data.setdefault(DOMAIN, {})[config_entry.entry_id] = mining_rig
 
+    if config_entry.data.get(CONFIG_ENABLE_PUSH, False):
+        async_register_webhook(hass, config_entry)
+    if mining_rig.export_metrics:
+        async_register_metrics_view(hass)
+
     config_entry.async_on_unload(config_entry.add_update_listener(update_config))
+    async_register_services(hass)
 
     hass.config_entries.async_setup_platforms(config_entry, PLATFORMS)
     return True
@@ -37,10 +96,24 @@ async def async_unload_entry(hass: HomeAssistant, config_entry: ConfigEntry) ->
         config_entry, PLATFORMS
     )
     if unload_ok:
-        hass.data[DOMAIN].pop(config_entry.entry_id)
+        async_unregister_webhook(hass, config_entry)
+        mining_rig: MiningRig = hass.data[DOMAIN].pop(config_entry.entry_id)
+        mining_rig.async_shutdown()
+        await mining_rig.async_close_history()
+        await mining_rig.async_close_statistics()
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
+    """Delete the history files and the stored state of a removed rig."""
+    await hass.async_add_executor_job(
+        HistoryStore.remove, hass.config.path(DOMAIN), config_entry.entry_id
+    )
+    await CommandQueue.async_remove(hass, config_entry.entry_id)
+    await EfficiencyTuner.async_remove(hass, config_entry.entry_id)
+    await StatisticsAggregator.async_remove(hass, config_entry.entry_id)
+
+
 async def async_migrate_entry(hass, config_entry: ConfigEntry):
     """Migrate old entry."""
     _LOGGER.debug("Migrating from version %s", config_entry.version)
@@ -62,5 +135,100 @@ async def async_migrate_entry(hass, config_entry: ConfigEntry):
 async def update_config(hass, config_entry: ConfigEntry) -> None:
     """Handle options update."""
     mining_rig: MiningRig = hass.data[DOMAIN][config_entry.entry_id]
-    update_interval = config_entry.data.get(CONFIG_UPDATE_INTERVAL)
-    mining_rig.set_update_interval(hass, update_interval)
+    if mining_rig.requires_reload(config_entry):
+        await hass.config_entries.async_reload(config_entry.entry_id)
+        return
+
+    mining_rig.apply_config(config_entry)
+    async_unregister_webhook(hass, config_entry)
+    if config_entry.data.get(CONFIG_ENABLE_PUSH, False):
+        async_register_webhook(hass, config_entry)
+    if mining_rig.export_metrics:
+        async_register_metrics_view(hass)
+
+
+def async_register_metrics_view(hass: HomeAssistant) -> None:
+    """Register the OpenMetrics view once, views cannot be removed."""
+    if hass.data.get(DATA_METRICS_VIEW):
+        return
+    hass.http.register_view(ExcavatorMetricsView(hass))
+    hass.data[DATA_METRICS_VIEW] = True
+
+
+def async_register_services(hass: HomeAssistant) -> None:
+    """Register the integration services once."""
+    if hass.services.has_service(DOMAIN, SERVICE_REFRESH):
+        return
+
+    async def async_refresh(call: ServiceCall) -> None:
+        """Poll the targeted rigs, all rigs without a target."""
+        mining_rigs: dict[str, MiningRig] = hass.data.get(DOMAIN, {})
+        if any(key in call.data for key in cv.ENTITY_SERVICE_FIELDS):
+            entry_ids = await async_extract_config_entry_ids(hass, call)
+        else:
+            entry_ids = mining_rigs.keys()
+        await asyncio.gather(
+            *(
+                mining_rigs[entry_id].async_request_refresh()
+                for entry_id in entry_ids
+                if entry_id in mining_rigs
+            )
+        )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_REFRESH,
+        async_refresh,
+        schema=vol.Schema(cv.ENTITY_SERVICE_FIELDS),
+    )
+
+    async def async_profile(call: ServiceCall) -> None:
+        """Start profiling all rigs, the report is written when it ends."""
+        if hass.data.get(DATA_PROFILER) is not None:
+            raise HomeAssistantError("A profile is already running")
+        profiler = Profiler(hass, call.data[ATTR_DURATION].total_seconds())
+        hass.data[DATA_PROFILER] = profiler
+        hass.async_create_task(async_run_profile(hass, profiler))
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        async_profile,
+        schema=vol.Schema(
+            {
+                vol.Optional(
+                    ATTR_DURATION, default=timedelta(seconds=DEFAULT_PROFILE_DURATION)
+                ): vol.All(
+                    cv.positive_time_period,
+                    vol.Range(
+                        min=timedelta(seconds=1),
+                        max=timedelta(seconds=MAX_PROFILE_DURATION),
+                    ),
+                )
+            }
+        ),
+    )
+
+
+async def async_run_profile(hass: HomeAssistant, profiler: Profiler) -> None:
+    """Profile all rigs and write the report to the config directory."""
+    mining_rigs: list[MiningRig] = list(hass.data.get(DOMAIN, {}).values())
+    for mining_rig in mining_rigs:
+        mining_rig.set_profiler(profiler.phase_recorder(mining_rig.name))
+    try:
+        await profiler.async_run()
+    finally:
+        for mining_rig in mining_rigs:
+            mining_rig.set_profiler(None)
+        hass.data[DATA_PROFILER] = None
+    report_path, folded_path = await hass.async_add_executor_job(
+        profiler.write, hass.config.path()
+    )
+    _LOGGER.info("Profile written to %s and %s", report_path, folded_path)
+    persistent_notification.async_create(
+        hass,
+        f"Report: `{report_path}`\n\nFolded stacks for flamegraph.pl or "
+        f"speedscope: `{folded_path}`",
+        title="Nicehash Excavator profile",
+        notification_id=f"{DOMAIN}_profile",
+    )
@@ -0,0 +1,93 @@
+"""Incremental anomaly detection on the rig polls."""
+from __future__ import annotations
+
+from .const import (
+    ANOMALY_BASELINE_SAMPLES,
+    ANOMALY_BASELINE_WEIGHT,
+    ANOMALY_HASHRATE_DROP,
+    ANOMALY_HOTSPOT_DELTA,
+    ANOMALY_TEMP_SLOPE,
+    ANOMALY_TEMP_WINDOW,
+)
+from .data_containers import is_number
+
+
+class AnomalyDetector:
+    """Detects GPU incidents from consecutive MiningRig polls.
+
+    Only the previous temperature per GPU and a rolling hashrate baseline per
+    GPU and algorithm are kept, so each check is linear in the GPU count.
+    """
+
+    def __init__(self) -> None:
+        """Init AnomalyDetector."""
+        # uuid -> (timestamp, gpu temp) at the start of the slope window
+        self._last_temps: dict[str, tuple[float, float]] = {}
+        # (uuid, algorithm name) -> [baseline speed, sample count]
+        self._baselines: dict[tuple[str, str], list[float]] = {}
+
+    def check(self, mining_rig, now: float) -> list[str]:
+        """Return the anomalies found in the current poll."""
+        anomalies = []
+
+        for device in mining_rig.devices.values():
+            if device.too_hot is True:
+                anomalies.append(f"GPU {device.id} too hot")
+
+            if is_number(device.gpu_temp):
+                # The slope is taken over a minimum window, single polls at
+                # fast intervals are too noisy
+                last = self._last_temps.get(device.uuid)
+                if last is None:
+                    self._last_temps[device.uuid] = (now, device.gpu_temp)
+                elif now - last[0] >= ANOMALY_TEMP_WINDOW:
+                    slope = (device.gpu_temp - last[1]) / (now - last[0]) * 60
+                    if slope > ANOMALY_TEMP_SLOPE:
+                        anomalies.append(
+                            f"GPU {device.id} temperature rising {slope:.1f}°C/min"
+                        )
+                    self._last_temps[device.uuid] = (now, device.gpu_temp)
+
+                if (
+                    is_number(device.hotspot_temp)
+                    and device.hotspot_temp - device.gpu_temp > ANOMALY_HOTSPOT_DELTA
+                ):
+                    anomalies.append(f"GPU {device.id} hotspot delta too high")
+
+        for worker in mining_rig.workers.values():
+            for algorithm in worker.algorithms.values():
+                if not is_number(algorithm.speed):
+                    continue
+                key = (worker.device_uuid, algorithm.name)
+                baseline = self._baselines.get(key)
+                if baseline is None:
+                    self._baselines[key] = [algorithm.speed, 1]
+                    continue
+                speed, samples = baseline
+                if samples >= ANOMALY_BASELINE_SAMPLES and algorithm.speed < speed * (
+                    1 - ANOMALY_HASHRATE_DROP
+                ):
+                    # Keep the baseline untouched while the hashrate is down
+                    anomalies.append(
+                        f"GPU {worker.device_id} {algorithm.name} hashrate dropped"
+                    )
+                    continue
+                baseline[0] += ANOMALY_BASELINE_WEIGHT * (algorithm.speed - baseline[0])
+                baseline[1] += 1
+
+        if mining_rig.online:
+            self._prune(mining_rig)
+        return anomalies
+
+    def _prune(self, mining_rig) -> None:
+        """Forget the GPUs and algorithms missing from the current poll."""
+        uuids = {device.uuid for device in mining_rig.devices.values()}
+        for uuid in self._last_temps.keys() - uuids:
+            del self._last_temps[uuid]
+        keys = {
+            (worker.device_uuid, algorithm.name)
+            for worker in mining_rig.workers.values()
+            for algorithm in worker.algorithms.values()
+        }
+        for key in self._baselines.keys() - keys:
+            del self._baselines[key]
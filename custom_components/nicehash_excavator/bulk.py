@@ -0,0 +1,190 @@
+"""Adding many rigs at once from a YAML list or CSV text."""
+from __future__ import annotations
+
+import asyncio
+import csv
+import io
+import logging
+from typing import Any
+
+import aiohttp
+import voluptuous as vol
+
+from homeassistant.components import persistent_notification
+from homeassistant.config_entries import SOURCE_IMPORT
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import config_validation as cv
+
+from .const import (
+    BULK_CONCURRENCY,
+    BULK_TIMEOUT,
+    CONFIG_HOST_ADDRESS,
+    CONFIG_HOST_PORT,
+    CONFIG_NAME,
+    CONFIG_UPDATE_INTERVAL,
+    CONFIG_UPDATE_INTERVAL_FAST,
+    DEFAULT_HOST_PORT,
+    DEFAULT_UPDATE_INTERVAL,
+    DEFAULT_UPDATE_INTERVAL_FAST,
+    DOMAIN,
+    MAX_UPDATE_INTERVAL,
+    MIN_UPDATE_INTERVAL,
+)
+from .discovery import query_excavator
+from .excavator import QUERY_INFO, ExcavatorAPI
+
+_LOGGER = logging.getLogger(__name__)
+
+CSV_COLUMNS = (
+    CONFIG_NAME,
+    CONFIG_HOST_ADDRESS,
+    CONFIG_HOST_PORT,
+    CONFIG_UPDATE_INTERVAL,
+    CONFIG_UPDATE_INTERVAL_FAST,
+)
+
+UPDATE_INTERVAL = vol.All(
+    vol.Coerce(int), vol.Range(min=MIN_UPDATE_INTERVAL, max=MAX_UPDATE_INTERVAL)
+)
+
+RIG_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONFIG_NAME): cv.string,
+        vol.Required(CONFIG_HOST_ADDRESS): cv.string,
+        vol.Optional(CONFIG_HOST_PORT, default=DEFAULT_HOST_PORT): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=65535)
+        ),
+        vol.Optional(
+            CONFIG_UPDATE_INTERVAL, default=DEFAULT_UPDATE_INTERVAL
+        ): UPDATE_INTERVAL,
+        vol.Optional(
+            CONFIG_UPDATE_INTERVAL_FAST, default=DEFAULT_UPDATE_INTERVAL_FAST
+        ): UPDATE_INTERVAL,
+    }
+)
+
+
+def parse_csv(text: str) -> tuple[list[dict[str, Any]], dict[str, str]]:
+    """Read rigs from CSV lines of name, host, port and update intervals.
+
+    Only name and host are required, a header row naming the columns is
+    optional. Returns the rigs and the failures keyed by line.
+    """
+    rigs = []
+    failures = {}
+    columns = CSV_COLUMNS
+    first = True
+    for line, row in enumerate(csv.reader(io.StringIO(text)), start=1):
+        row = [cell.strip() for cell in row]
+        if not any(row) or row[0].startswith("#"):
+            continue
+        if first and CONFIG_NAME in row and set(row) <= set(CSV_COLUMNS):
+            columns = tuple(row)
+            first = False
+            continue
+        first = False
+        if len(row) > len(columns):
+            failures[f"line {line}"] = f"expected at most {len(columns)} columns"
+            continue
+        rigs.append({column: cell for column, cell in zip(columns, row) if cell})
+    return rigs, failures
+
+
+async def async_validate_rigs(
+    hass: HomeAssistant, rigs: list[dict[str, Any]]
+) -> tuple[list[dict[str, Any]], dict[str, str]]:
+    """Validate rigs concurrently, with at most BULK_CONCURRENCY connections.
+
+    Rigs already configured with the same host and port are skipped without
+    a failure, so a YAML list can be imported on every start.
+    Returns the valid rigs and the failures keyed by rig name.
+    """
+    entries = hass.config_entries.async_entries(DOMAIN)
+    names = {entry.data[CONFIG_NAME] for entry in entries}
+    configured = {
+        (
+            ExcavatorAPI.format_host_address(entry.data[CONFIG_HOST_ADDRESS]),
+            entry.data[CONFIG_HOST_PORT],
+        )
+        for entry in entries
+    }
+
+    candidates = []
+    failures = {}
+    for index, rig in enumerate(rigs, start=1):
+        label = str(rig.get(CONFIG_NAME) or f"rig {index}")
+        try:
+            rig = RIG_SCHEMA(rig)
+        except vol.Invalid as error:
+            failures[label] = str(error)
+            continue
+        address = (
+            ExcavatorAPI.format_host_address(rig[CONFIG_HOST_ADDRESS]),
+            rig[CONFIG_HOST_PORT],
+        )
+        if address in configured:
+            continue
+        if rig[CONFIG_NAME] in names:
+            failures[label] = "name already in use"
+            continue
+        names.add(rig[CONFIG_NAME])
+        configured.add(address)
+        candidates.append(rig)
+
+    semaphore = asyncio.Semaphore(BULK_CONCURRENCY)
+
+    async def responds(session: aiohttp.ClientSession, rig: dict[str, Any]) -> bool:
+        async with semaphore:
+            info = await query_excavator(
+                session, rig[CONFIG_HOST_ADDRESS], rig[CONFIG_HOST_PORT], QUERY_INFO
+            )
+        return info is not None
+
+    async with aiohttp.ClientSession(
+        timeout=aiohttp.ClientTimeout(total=BULK_TIMEOUT),
+        connector=aiohttp.TCPConnector(limit=BULK_CONCURRENCY),
+    ) as session:
+        results = await asyncio.gather(*(responds(session, rig) for rig in candidates))
+
+    valid = []
+    for rig, result in zip(candidates, results):
+        if result:
+            valid.append(rig)
+        else:
+            failures[rig[CONFIG_NAME]] = "no response"
+    return valid, failures
+
+
+async def async_create_entries(hass: HomeAssistant, rigs: list[dict[str, Any]]) -> None:
+    """Create a config entry per rig through the import step."""
+    await asyncio.gather(
+        *(
+            hass.config_entries.flow.async_init(
+                DOMAIN, context={"source": SOURCE_IMPORT}, data=rig
+            )
+            for rig in rigs
+        )
+    )
+
+
+def format_failures(failures: dict[str, str]) -> str:
+    """One line per failed rig."""
+    return "\n".join(f"- {name}: {reason}" for name, reason in failures.items())
+
+
+async def async_import_yaml(hass: HomeAssistant, rigs: list[dict[str, Any]]) -> None:
+    """Add the rigs listed in configuration.yaml that are not configured yet."""
+    valid, failures = await async_validate_rigs(hass, rigs)
+    await async_create_entries(hass, valid)
+    if valid:
+        _LOGGER.info("Added %s rigs from configuration.yaml", len(valid))
+    if failures:
+        _LOGGER.warning(
+            "Rigs from configuration.yaml not added:\n%s", format_failures(failures)
+        )
+        persistent_notification.async_create(
+            hass,
+            f"Rigs not added:\n{format_failures(failures)}",
+            title="Nicehash Excavator import",
+            notification_id=f"{DOMAIN}_import",
+        )
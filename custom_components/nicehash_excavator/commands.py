@@ -0,0 +1,259 @@
+"""Batched, rate limited commands to a MiningRig."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import logging
+from time import monotonic
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    COMMAND_BATCH_DELAY,
+    COMMAND_CONFIRM_POLLS,
+    COMMAND_MIN_INTERVAL,
+    DOMAIN,
+    FAN_SPEED_TOLERANCE,
+)
+from .data_containers import is_number
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+MINING = "mining"
+FAN_SPEED = "fan_speed"
+POWER_LIMIT = "power_limit"
+RESTART = "restart"
+
+
+class CommandQueue:
+    """Collects commands to the devices of a rig and sends them in batches.
+
+    Commands within COMMAND_BATCH_DELAY form one batch. A later command for
+    the same device and setting replaces an earlier one. All pauses of a
+    batch share one workers.free call and all resumes one workers.add call
+    per algorithm, so pausing a whole rig is a single call. A restart
+    joins both, freeing the workers of a device and adding them again. Calls to the rig
+    are at least COMMAND_MIN_INTERVAL apart. The expected state is kept
+    until a poll confirms it, for at most COMMAND_CONFIRM_POLLS polls.
+    The algorithms of paused devices are stored, so they can be resumed
+    after a restart.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        mining_rig,
+        send: Callable[[str, list[str]], Awaitable[dict[str, Any] | None]],
+    ) -> None:
+        """Init CommandQueue."""
+        self._hass = hass
+        self._mining_rig = mining_rig
+        self._send = send
+        self._store = self._get_store(hass, mining_rig.entry_id)
+        # (setting, device uuid) -> value
+        self._pending: dict[tuple[str, str], Any] = {}
+        self._expected: dict[tuple[str, str], tuple[Any, int]] = {}
+        # device uuid -> algorithms mined before the device was paused
+        self._paused_algorithms: dict[str, list[str]] = {}
+        # Excavator does not report power limits, the last accepted one is kept
+        self.power_limits: dict[str, float] = {}
+        self._cancel_flush = None
+        self._lock = asyncio.Lock()
+        self._last_call = 0.0
+
+    @staticmethod
+    def _get_store(hass: HomeAssistant, entry_id: str) -> Store:
+        """Store of the paused algorithms of a rig."""
+        return Store(hass, STORAGE_VERSION, f"{DOMAIN}.commands.{entry_id}")
+
+    @staticmethod
+    async def async_remove(hass: HomeAssistant, entry_id: str) -> None:
+        """Delete the stored paused algorithms of a removed rig."""
+        await CommandQueue._get_store(hass, entry_id).async_remove()
+
+    async def async_load(self) -> None:
+        """Load the algorithms of the devices paused before a restart."""
+        data = await self._store.async_load() or {}
+        for device_uuid, algorithms in data.items():
+            self._paused_algorithms.setdefault(device_uuid, algorithms)
+
+    def can_resume(self, device_uuid: str) -> bool:
+        """Return True if the algorithms to resume a paused device are known."""
+        return device_uuid in self._paused_algorithms
+
+    def desired(self, setting: str, device_uuid: str) -> Any:
+        """Value of a command not yet confirmed by a poll, None if there is none."""
+        key = (setting, device_uuid)
+        if key in self._pending:
+            return self._pending[key]
+        if key in self._expected:
+            return self._expected[key][0]
+        return None
+
+    def set_mining(self, device_uuid: str, mining: bool) -> None:
+        """Pause or resume the workers of a device."""
+        if not mining:
+            device = self._mining_rig.get_device_by_uuid(device_uuid)
+            if device is not None:
+                algorithms = [
+                    algorithm.name
+                    for worker in self._mining_rig.get_workers_for_device(device.id)
+                    for algorithm in worker.algorithms.values()
+                ]
+                if algorithms:
+                    self._paused_algorithms[device_uuid] = algorithms
+                    self._async_save()
+        self._queue(MINING, device_uuid, mining)
+
+    def set_fan_speed(self, device_uuid: str, speed: int) -> None:
+        """Set the fan speed of a device in percent."""
+        self._queue(FAN_SPEED, device_uuid, speed)
+
+    def set_power_limit(self, device_uuid: str, watts: float) -> None:
+        """Set the power limit of a device."""
+        self._queue(POWER_LIMIT, device_uuid, watts)
+
+    def restart_workers(self, device_uuid: str) -> None:
+        """Free the workers of a device and add them again."""
+        self._queue(RESTART, device_uuid, True)
+
+    def _queue(self, setting: str, device_uuid: str, value: Any) -> None:
+        """Add a command to the next batch."""
+        self._pending[(setting, device_uuid)] = value
+        if self._cancel_flush is None:
+            self._cancel_flush = async_call_later(
+                self._hass, COMMAND_BATCH_DELAY, self._async_flush
+            )
+
+    def async_cancel(self) -> None:
+        """Drop commands not sent yet."""
+        if self._cancel_flush is not None:
+            self._cancel_flush()
+            self._cancel_flush = None
+        self._pending.clear()
+
+    def _async_save(self) -> None:
+        """Store the paused algorithms."""
+        self._hass.async_create_task(
+            self._store.async_save(dict(self._paused_algorithms))
+        )
+
+    def _calls(
+        self, batch: dict[tuple[str, str], Any]
+    ) -> list[tuple[str, list[str], list[tuple[str, str]]]]:
+        """Turn a batch into Excavator calls with the commands each one covers."""
+        rig = self._mining_rig
+        free_ids: list[str] = []
+        free_keys = []
+        add_devices: dict[str, list[str]] = {}
+        add_keys: dict[str, list[tuple[str, str]]] = {}
+        calls = []
+
+        for key, value in batch.items():
+            setting, device_uuid = key
+            device = rig.get_device_by_uuid(device_uuid)
+            if device is None:
+                _LOGGER.warning("%s: GPU %s is gone", rig.name, device_uuid)
+                continue
+            if setting == RESTART:
+                workers = rig.get_workers_for_device(device.id)
+                free_ids.extend(str(worker.id) for worker in workers)
+                free_keys.append(key)
+                for worker in workers:
+                    for algorithm in worker.algorithms.values():
+                        add_devices.setdefault(algorithm.name, []).append(
+                            str(device.id)
+                        )
+                        add_keys.setdefault(algorithm.name, []).append(key)
+            elif setting == MINING and not value:
+                workers = rig.get_workers_for_device(device.id)
+                free_ids.extend(str(worker.id) for worker in workers)
+                free_keys.append(key)
+            elif setting == MINING:
+                if rig.get_workers_for_device(device.id):
+                    continue
+                if device_uuid not in self._paused_algorithms:
+                    _LOGGER.warning(
+                        "%s: no algorithm known to resume GPU %s", rig.name, device.id
+                    )
+                    continue
+                # Kept until a poll shows the device mining again
+                for name in self._paused_algorithms[device_uuid]:
+                    add_devices.setdefault(name, []).append(str(device.id))
+                    add_keys.setdefault(name, []).append(key)
+            elif setting == FAN_SPEED:
+                calls.append(
+                    ("device.set.fan.speed", [str(device.id), str(value)], [key])
+                )
+            elif setting == POWER_LIMIT:
+                calls.append(
+                    ("device.set.power_limit", [str(device.id), str(value)], [key])
+                )
+
+        if free_ids:
+            calls.insert(0, ("workers.free", free_ids, free_keys))
+        for name, device_ids in add_devices.items():
+            calls.append(("workers.add", [f"alg-{name}", *device_ids], add_keys[name]))
+        return calls
+
+    async def _async_flush(self, now=None) -> None:
+        """Send the pending batch, then poll to confirm it."""
+        self._cancel_flush = None
+        async with self._lock:
+            batch, self._pending = self._pending, {}
+            for method, params, keys in self._calls(batch):
+                wait = COMMAND_MIN_INTERVAL - (monotonic() - self._last_call)
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                response = await self._send(method, params)
+                self._last_call = monotonic()
+                if response is None or response.get("error"):
+                    _LOGGER.warning(
+                        "%s: %s %s failed: %s",
+                        self._mining_rig.name,
+                        method,
+                        params,
+                        response and response.get("error"),
+                    )
+                    continue
+                for key in keys:
+                    if key[0] == RESTART:
+                        continue
+                    if key[0] == POWER_LIMIT:
+                        self.power_limits[key[1]] = batch[key]
+                    else:
+                        self._expected[key] = (batch[key], COMMAND_CONFIRM_POLLS)
+        await self._mining_rig.async_request_refresh()
+
+    def confirm(self) -> None:
+        """Check the expected states against a fresh poll."""
+        rig = self._mining_rig
+        for key, (value, polls_left) in list(self._expected.items()):
+            setting, device_uuid = key
+            device = rig.get_device_by_uuid(device_uuid)
+            if device is None:
+                confirmed = False
+            elif setting == MINING:
+                confirmed = bool(rig.get_workers_for_device(device.id)) == value
+            else:
+                confirmed = (
+                    is_number(device.gpu_fan_speed)
+                    and abs(device.gpu_fan_speed - value) <= FAN_SPEED_TOLERANCE
+                )
+            if confirmed:
+                del self._expected[key]
+                if setting == MINING and value:
+                    if self._paused_algorithms.pop(device_uuid, None) is not None:
+                        self._async_save()
+            elif polls_left <= 1:
+                del self._expected[key]
+                _LOGGER.warning(
+                    "%s: %s of GPU %s not confirmed", rig.name, setting, device_uuid
+                )
+            else:
+                self._expected[key] = (value, polls_left - 1)
@@ -8,32 +8,76 @@ import voluptuous as vol
 
 from homeassistant.config_entries import (
     CONN_CLASS_LOCAL_PUSH,
+    SOURCE_IMPORT,
     ConfigEntry,
     ConfigFlow,
     OptionsFlow,
 )
 from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.selector import TextSelector, TextSelectorConfig
 
 from .const import (
+    CONFIG_AUTO_FAST_UPDATE,
+    CONFIG_COMPACT_MODE,
+    CONFIG_CSV,
+    CONFIG_ENABLE_CONTROLS,
     CONFIG_ENABLE_DEBUG_LOGGING,
+    CONFIG_ENABLE_PUSH,
+    CONFIG_EXCLUDE_ALGORITHMS,
+    CONFIG_EXCLUDE_GPUS,
+    CONFIG_EXCLUDE_METRICS,
+    CONFIG_EXPORT_METRICS,
+    CONFIG_EXCLUDE_RAW_STATES,
+    CONFIG_EXTERNAL_STATISTICS,
+    CONFIG_HISTORY_STORE,
     CONFIG_HOST_ADDRESS,
     CONFIG_HOST_PORT,
+    CONFIG_HOSTS,
     CONFIG_NAME,
+    CONFIG_NETWORK,
+    CONFIG_PORTS,
     CONFIG_UPDATE_INTERVAL,
     CONFIG_UPDATE_INTERVAL_FAST,
+    CONFIG_WATCHDOG_GRACE_PERIOD,
+    DEFAULT_DISCOVERY_NETWORK,
     DEFAULT_HOST_PORT,
     DEFAULT_UPDATE_INTERVAL,
     DEFAULT_UPDATE_INTERVAL_FAST,
     DOMAIN,
     ERROR_CANNOT_CONNECT,
+    ERROR_INVALID_NETWORK,
     ERROR_INVALID_PORT,
+    ERROR_INVALID_GRACE_PERIOD,
     ERROR_INVALID_UPDATE_INTERVAL,
+    ERROR_NETWORK_TOO_LARGE,
+    ERROR_NO_EXCAVATORS_FOUND,
     ERROR_NO_RESPONSE,
+    ERROR_NO_SELECTION,
+    ERROR_NO_VALID_RIGS,
     MAX_UPDATE_INTERVAL,
+    MAX_WATCHDOG_GRACE_PERIOD,
     MIN_UPDATE_INTERVAL,
+    MIN_WATCHDOG_GRACE_PERIOD,
+)
+from .bulk import (
+    async_create_entries,
+    async_validate_rigs,
+    format_failures,
+    parse_csv,
+)
+from .discovery import (
+    DiscoveredExcavator,
+    InvalidNetwork,
+    InvalidPort,
+    NetworkTooLarge,
+    async_scan,
+    parse_network,
+    parse_ports,
 )
 from .excavator import ExcavatorAPI
+from .filters import FILTER_METRICS, split_list
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -45,6 +89,15 @@ MAIN_DATA_SCHEMA = {
     vol.Required(
         CONFIG_UPDATE_INTERVAL_FAST, default=DEFAULT_UPDATE_INTERVAL_FAST
     ): int,
+    vol.Optional(CONFIG_AUTO_FAST_UPDATE, default=True): bool,
+    vol.Optional(CONFIG_ENABLE_PUSH, default=False): bool,
+    vol.Optional(CONFIG_EXPORT_METRICS, default=False): bool,
+    vol.Optional(CONFIG_ENABLE_CONTROLS, default=False): bool,
+    vol.Optional(CONFIG_WATCHDOG_GRACE_PERIOD, default=0): int,
+    vol.Optional(CONFIG_HISTORY_STORE, default=False): bool,
+    vol.Optional(CONFIG_COMPACT_MODE, default=False): bool,
+    vol.Optional(CONFIG_EXTERNAL_STATISTICS, default=False): bool,
+    vol.Optional(CONFIG_EXCLUDE_RAW_STATES, default=False): bool,
 }
 
 
@@ -56,6 +109,13 @@ async def get_errors(data: dict) -> dict[str, any]:
         _LOGGER.error(ERROR_INVALID_PORT)
         errors[CONFIG_HOST_PORT] = ERROR_INVALID_PORT
 
+    grace_period = data.get(CONFIG_WATCHDOG_GRACE_PERIOD, 0)
+    if grace_period and not (
+        MIN_WATCHDOG_GRACE_PERIOD <= grace_period <= MAX_WATCHDOG_GRACE_PERIOD
+    ):
+        _LOGGER.error(ERROR_INVALID_GRACE_PERIOD)
+        errors[CONFIG_WATCHDOG_GRACE_PERIOD] = ERROR_INVALID_GRACE_PERIOD
+
     try:
         excavator = ExcavatorAPI(data[CONFIG_HOST_ADDRESS], data[CONFIG_HOST_PORT])
         result = await excavator.test_connection()
@@ -70,6 +130,20 @@ async def get_errors(data: dict) -> dict[str, any]:
     return errors
 
 
+def discovered_entry_data(discovered: DiscoveredExcavator) -> dict:
+    """Config entry data of a discovered Excavator with the default options."""
+    name = f"Rig {discovered.host}"
+    if discovered.port != DEFAULT_HOST_PORT:
+        name += f" {discovered.port}"
+    return vol.Schema(MAIN_DATA_SCHEMA)(
+        {
+            CONFIG_NAME: name,
+            CONFIG_HOST_ADDRESS: discovered.host,
+            CONFIG_HOST_PORT: discovered.port,
+        }
+    )
+
+
 async def validate_update_intervals(data: dict) -> dict[str, any]:
     """Validate the user input"""
     errors = {}
@@ -96,8 +170,28 @@ class MainConfigFlow(ConfigFlow, domain=DOMAIN):
     VERSION = 1
     CONNECTION_CLASS = CONN_CLASS_LOCAL_PUSH
 
+    def __init__(self) -> None:
+        """Init MainConfigFlow."""
+        self._discovered: dict[str, DiscoveredExcavator] = {}
+
+    def _is_configured(self, host_address: str, host_port: int) -> bool:
+        """Return True if a rig with this host and port already exists."""
+        host_address = ExcavatorAPI.format_host_address(host_address)
+        return any(
+            ExcavatorAPI.format_host_address(entry.data[CONFIG_HOST_ADDRESS])
+            == host_address
+            and entry.data[CONFIG_HOST_PORT] == host_port
+            for entry in self._async_current_entries()
+        )
+
     async def async_step_user(self, user_input=None) -> FlowResult:
-        """Handle the initial step."""
+        """Add a single rig by host and port, or scan the network."""
+        return self.async_show_menu(
+            step_id="user", menu_options=["manual", "discovery", "bulk"]
+        )
+
+    async def async_step_manual(self, user_input=None) -> FlowResult:
+        """Handle the manual step."""
 
         errors = {}
         if user_input is not None:
@@ -110,9 +204,127 @@ class MainConfigFlow(ConfigFlow, domain=DOMAIN):
                 )
 
         return self.async_show_form(
-            step_id="user", data_schema=vol.Schema(MAIN_DATA_SCHEMA), errors=errors
+            step_id="manual", data_schema=vol.Schema(MAIN_DATA_SCHEMA), errors=errors
+        )
+
+    async def async_step_discovery(self, user_input=None) -> FlowResult:
+        """Scan a network range for Excavators."""
+        errors = {}
+        if user_input is not None:
+            try:
+                hosts = parse_network(user_input[CONFIG_NETWORK])
+            except InvalidNetwork:
+                errors[CONFIG_NETWORK] = ERROR_INVALID_NETWORK
+            except NetworkTooLarge:
+                errors[CONFIG_NETWORK] = ERROR_NETWORK_TOO_LARGE
+            try:
+                ports = parse_ports(user_input[CONFIG_PORTS])
+            except InvalidPort:
+                errors[CONFIG_PORTS] = ERROR_INVALID_PORT
+
+            if not errors:
+                self._discovered = {
+                    discovered.key: discovered
+                    for discovered in await async_scan(hosts, ports)
+                    if not self._is_configured(discovered.host, discovered.port)
+                }
+                if self._discovered:
+                    return await self.async_step_discovery_select()
+                errors["base"] = ERROR_NO_EXCAVATORS_FOUND
+
+        return self.async_show_form(
+            step_id="discovery",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONFIG_NETWORK, default=DEFAULT_DISCOVERY_NETWORK
+                    ): str,
+                    vol.Required(CONFIG_PORTS, default=str(DEFAULT_HOST_PORT)): str,
+                }
+            ),
+            errors=errors,
+        )
+
+    async def async_step_discovery_select(self, user_input=None) -> FlowResult:
+        """Add the selected Excavators, one config entry each."""
+        errors = {}
+        if user_input is not None:
+            entries = [
+                discovered_entry_data(self._discovered[key])
+                for key in user_input[CONFIG_HOSTS]
+            ]
+            if entries:
+                # A flow creates a single entry, the others are imported
+                for data in entries[1:]:
+                    self.hass.async_create_task(
+                        self.hass.config_entries.flow.async_init(
+                            DOMAIN, context={"source": SOURCE_IMPORT}, data=data
+                        )
+                    )
+                return self.async_create_entry(
+                    title=entries[0][CONFIG_NAME], data=entries[0]
+                )
+            errors["base"] = ERROR_NO_SELECTION
+
+        return self.async_show_form(
+            step_id="discovery_select",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONFIG_HOSTS, default=list(self._discovered)
+                    ): cv.multi_select(
+                        {
+                            key: discovered.label
+                            for key, discovered in self._discovered.items()
+                        }
+                    )
+                }
+            ),
+            errors=errors,
+        )
+
+    async def async_step_bulk(self, user_input=None) -> FlowResult:
+        """Add rigs from CSV lines, validated concurrently."""
+        errors = {}
+        failures = {}
+        if user_input is not None:
+            rigs, failures = parse_csv(user_input[CONFIG_CSV])
+            valid, validation_failures = await async_validate_rigs(self.hass, rigs)
+            failures.update(validation_failures)
+            if valid:
+                await async_create_entries(self.hass, valid)
+                return self.async_abort(
+                    reason="bulk_added",
+                    description_placeholders={
+                        "added": str(len(valid)),
+                        "failures": format_failures(failures),
+                    },
+                )
+            errors["base"] = ERROR_NO_VALID_RIGS
+
+        return self.async_show_form(
+            step_id="bulk",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONFIG_CSV,
+                        default=user_input[CONFIG_CSV] if user_input else "",
+                    ): TextSelector(TextSelectorConfig(multiline=True))
+                }
+            ),
+            errors=errors,
+            description_placeholders={"failures": format_failures(failures)},
         )
 
+    async def async_step_import(self, import_data: dict) -> FlowResult:
+        """Create an entry for a rig added together with others."""
+        if self._is_configured(
+            import_data[CONFIG_HOST_ADDRESS], import_data[CONFIG_HOST_PORT]
+        ):
+            return self.async_abort(reason="already_configured")
+        data = vol.Schema(MAIN_DATA_SCHEMA)(import_data)
+        return self.async_create_entry(title=data[CONFIG_NAME], data=data)
+
     @staticmethod
     @callback
     def async_get_options_flow(config_entry: ConfigEntry) -> OptionsFlowHandler:
@@ -139,6 +351,22 @@ class OptionsFlowHandler(OptionsFlow):
                 new[CONFIG_UPDATE_INTERVAL_FAST] = user_input[
                     CONFIG_UPDATE_INTERVAL_FAST
                 ]
+                new[CONFIG_AUTO_FAST_UPDATE] = user_input[CONFIG_AUTO_FAST_UPDATE]
+                new[CONFIG_ENABLE_PUSH] = user_input[CONFIG_ENABLE_PUSH]
+                new[CONFIG_EXPORT_METRICS] = user_input[CONFIG_EXPORT_METRICS]
+                new[CONFIG_ENABLE_CONTROLS] = user_input[CONFIG_ENABLE_CONTROLS]
+                new[CONFIG_WATCHDOG_GRACE_PERIOD] = user_input[
+                    CONFIG_WATCHDOG_GRACE_PERIOD
+                ]
+                new[CONFIG_HISTORY_STORE] = user_input[CONFIG_HISTORY_STORE]
+                new[CONFIG_EXCLUDE_GPUS] = split_list(user_input[CONFIG_EXCLUDE_GPUS])
+                new[CONFIG_EXCLUDE_METRICS] = user_input[CONFIG_EXCLUDE_METRICS]
+                new[CONFIG_EXCLUDE_ALGORITHMS] = split_list(
+                    user_input[CONFIG_EXCLUDE_ALGORITHMS]
+                )
+                new[CONFIG_COMPACT_MODE] = user_input[CONFIG_COMPACT_MODE]
+                new[CONFIG_EXTERNAL_STATISTICS] = user_input[CONFIG_EXTERNAL_STATISTICS]
+                new[CONFIG_EXCLUDE_RAW_STATES] = user_input[CONFIG_EXCLUDE_RAW_STATES]
                 # new[CONFIG_ENABLE_DEBUG_LOGGING] = user_input[
                 #    CONFIG_ENABLE_DEBUG_LOGGING
                 # ]
@@ -165,6 +393,70 @@ class OptionsFlowHandler(OptionsFlow):
                         CONFIG_UPDATE_INTERVAL_FAST,
                         default=self.config_entry.data.get(CONFIG_UPDATE_INTERVAL_FAST),
                     ): int,
+                    vol.Optional(
+                        CONFIG_AUTO_FAST_UPDATE,
+                        default=self.config_entry.data.get(
+                            CONFIG_AUTO_FAST_UPDATE, True
+                        ),
+                    ): bool,
+                    vol.Optional(
+                        CONFIG_ENABLE_PUSH,
+                        default=self.config_entry.data.get(CONFIG_ENABLE_PUSH, False),
+                    ): bool,
+                    vol.Optional(
+                        CONFIG_EXPORT_METRICS,
+                        default=self.config_entry.data.get(
+                            CONFIG_EXPORT_METRICS, False
+                        ),
+                    ): bool,
+                    vol.Optional(
+                        CONFIG_ENABLE_CONTROLS,
+                        default=self.config_entry.data.get(
+                            CONFIG_ENABLE_CONTROLS, False
+                        ),
+                    ): bool,
+                    vol.Optional(
+                        CONFIG_WATCHDOG_GRACE_PERIOD,
+                        default=self.config_entry.data.get(
+                            CONFIG_WATCHDOG_GRACE_PERIOD, 0
+                        ),
+                    ): int,
+                    vol.Optional(
+                        CONFIG_HISTORY_STORE,
+                        default=self.config_entry.data.get(CONFIG_HISTORY_STORE, False),
+                    ): bool,
+                    vol.Optional(
+                        CONFIG_EXCLUDE_GPUS,
+                        default=", ".join(
+                            self.config_entry.data.get(CONFIG_EXCLUDE_GPUS, [])
+                        ),
+                    ): str,
+                    vol.Optional(
+                        CONFIG_EXCLUDE_METRICS,
+                        default=self.config_entry.data.get(CONFIG_EXCLUDE_METRICS, []),
+                    ): cv.multi_select(FILTER_METRICS),
+                    vol.Optional(
+                        CONFIG_EXCLUDE_ALGORITHMS,
+                        default=", ".join(
+                            self.config_entry.data.get(CONFIG_EXCLUDE_ALGORITHMS, [])
+                        ),
+                    ): str,
+                    vol.Optional(
+                        CONFIG_COMPACT_MODE,
+                        default=self.config_entry.data.get(CONFIG_COMPACT_MODE, False),
+                    ): bool,
+                    vol.Optional(
+                        CONFIG_EXTERNAL_STATISTICS,
+                        default=self.config_entry.data.get(
+                            CONFIG_EXTERNAL_STATISTICS, False
+                        ),
+                    ): bool,
+                    vol.Optional(
+                        CONFIG_EXCLUDE_RAW_STATES,
+                        default=self.config_entry.data.get(
+                            CONFIG_EXCLUDE_RAW_STATES, False
+                        ),
+                    ): bool,
                     # vol.Optional(
                     #    CONFIG_ENABLE_DEBUG_LOGGING,
                     #    default=self.config_entry.data.get(CONFIG_ENABLE_DEBUG_LOGGING),
@@ -2,22 +2,137 @@
 
 DOMAIN = "nicehash_excavator"
 
+# Unit of the hashrate sensors and statistics
+HASHRATE_UNIT = "Mh/s"
 
 DEFAULT_HOST_PORT = 18000
 DEFAULT_UPDATE_INTERVAL = 60
 DEFAULT_UPDATE_INTERVAL_FAST = 1
 
+DEFAULT_FAST_UPDATE_DURATION = 60  # minutes
+MAX_FAST_UPDATE_DURATION = 1440  # minutes
+
 MAX_UPDATE_INTERVAL = 3600
 MIN_UPDATE_INTERVAL = 1
 
+# seconds in which further refresh requests collapse into a single poll
+REFRESH_COOLDOWN = 2
+
+# Automatic fast update on anomalies, in seconds
+FAST_UPDATE_ESCALATION_DURATION = 300
+FAST_UPDATE_ESCALATION_MAX_DURATION = 900
+FAST_UPDATE_ESCALATION_COOLDOWN = 900
+
+ANOMALY_TEMP_SLOPE = 10  # °C per minute
+ANOMALY_TEMP_WINDOW = 30  # seconds
+ANOMALY_HOTSPOT_DELTA = 25  # °C above GPU temp
+ANOMALY_HASHRATE_DROP = 0.3  # fraction below the rolling baseline
+ANOMALY_BASELINE_WEIGHT = 0.1
+ANOMALY_BASELINE_SAMPLES = 10
+
+SHARE_RATE_WINDOW = 600  # seconds
+
+# Network scan in the config flow
+DISCOVERY_CONCURRENCY = 128
+DISCOVERY_TIMEOUT = 1.0  # seconds per probe
+DISCOVERY_MAX_HOSTS = 1024
+DEFAULT_DISCOVERY_NETWORK = "192.168.1.0/24"
+
+# Command queue of the control entities
+COMMAND_BATCH_DELAY = 0.2  # seconds to collect commands into one batch
+COMMAND_MIN_INTERVAL = 0.1  # seconds between two calls to the same rig
+COMMAND_CONFIRM_POLLS = 2  # polls to wait for a command to show up
+FAN_SPEED_TOLERANCE = 5  # percent
+MIN_POWER_LIMIT = 50  # watts
+MAX_POWER_LIMIT = 600  # watts
+
+# Stalled worker watchdog
+MIN_WATCHDOG_GRACE_PERIOD = 30  # seconds, 0 disables the watchdog
+MAX_WATCHDOG_GRACE_PERIOD = 3600
+WATCHDOG_COLLAPSE_RATIO = 0.1  # fraction of the rolling baseline
+WATCHDOG_BACKOFF = 300  # seconds before restarting the same GPU again
+WATCHDOG_MAX_BACKOFF = 3600
+WATCHDOG_BACKOFF_RESET = 3600  # seconds after a restart that reset the backoff
+WATCHDOG_RESTART_BUDGET = 6  # restarts per rig and window
+WATCHDOG_BUDGET_WINDOW = 3600
+
+# Power limit tuner
+TUNER_STEP = 10  # watts
+TUNER_SETTLE_TIME = 60  # seconds after a change before measuring
+TUNER_WINDOW = 120  # seconds of measurement per power limit
+TUNER_OFFLINE_TIMEOUT = 300  # seconds a GPU may be unreachable while tuning
+DEFAULT_TUNER_MAX_TEMP = 75  # °C
+
+# Profiling
+PROFILE_SAMPLE_INTERVAL = 0.005  # seconds between stack samples
+PROFILE_LAG_INTERVAL = 0.05  # seconds between event loop lag probes
+DEFAULT_PROFILE_DURATION = 30
+MAX_PROFILE_DURATION = 600
+
+# Websocket telemetry, seconds between messages to a client
+DEFAULT_TELEMETRY_INTERVAL = 1.0
+MIN_TELEMETRY_INTERVAL = 0.1
+MAX_TELEMETRY_INTERVAL = 60.0
+
+# History store, (resolution in seconds, records) per tier, 0 is every poll
+HISTORY_TIERS = ((0, 86400), (60, 43200), (3600, 17520))
+HISTORY_SLOTS = 16  # GPUs per rig
+DEFAULT_HISTORY_POINTS = 300
+MAX_HISTORY_POINTS = 5000
+
+# Validation of rigs added in bulk
+BULK_CONCURRENCY = 16
+BULK_TIMEOUT = 5.0  # seconds per rig
+
 CONFIG_NAME = "name"
 CONFIG_HOST_ADDRESS = "host_address"
 CONFIG_HOST_PORT = "host_port"
 CONFIG_UPDATE_INTERVAL = "update_interval"
 CONFIG_UPDATE_INTERVAL_FAST = "update_interval_fast"
+CONFIG_COMPACT_MODE = "compact_mode"
+CONFIG_EXTERNAL_STATISTICS = "external_statistics"
+CONFIG_EXCLUDE_RAW_STATES = "exclude_raw_states"
+CONFIG_AUTO_FAST_UPDATE = "auto_fast_update"
+CONFIG_ENABLE_PUSH = "enable_push"
+CONFIG_WEBHOOK_ID = "webhook_id"
+CONFIG_EXPORT_METRICS = "export_metrics"
+CONFIG_ENABLE_CONTROLS = "enable_controls"
+CONFIG_WATCHDOG_GRACE_PERIOD = "watchdog_grace_period"
+CONFIG_HISTORY_STORE = "history_store"
+CONFIG_EXCLUDE_GPUS = "exclude_gpus"
+CONFIG_EXCLUDE_METRICS = "exclude_metrics"
+CONFIG_EXCLUDE_ALGORITHMS = "exclude_algorithms"
+CONFIG_NETWORK = "network"
+CONFIG_PORTS = "ports"
+CONFIG_HOSTS = "hosts"
+CONFIG_CSV = "csv"
 
 CONFIG_ENABLE_DEBUG_LOGGING = "enable_debug_logging"
 
+EVENT_RIG_ONLINE = f"{DOMAIN}_rig_online"
+EVENT_RIG_OFFLINE = f"{DOMAIN}_rig_offline"
+EVENT_GPU_ADDED = f"{DOMAIN}_gpu_added"
+EVENT_GPU_REMOVED = f"{DOMAIN}_gpu_removed"
+EVENT_WORKER_STARTED = f"{DOMAIN}_worker_started"
+EVENT_WORKER_STOPPED = f"{DOMAIN}_worker_stopped"
+EVENT_ALGORITHM_CHANGED = f"{DOMAIN}_algorithm_changed"
+EVENT_WORKER_RESTARTED = f"{DOMAIN}_worker_restarted"
+EVENT_RESTART_BUDGET_EXHAUSTED = f"{DOMAIN}_restart_budget_exhausted"
+
+DATA_METRICS_VIEW = f"{DOMAIN}_metrics_view"
+DATA_FARM = f"{DOMAIN}_farm"
+DATA_PROFILER = f"{DOMAIN}_profiler"
+
+SERVICE_ENABLE_FAST_UPDATE = "enable_fast_update"
+SERVICE_REFRESH = "refresh"
+SERVICE_PROFILE = "profile"
+SERVICE_TUNE_POWER_LIMIT = "tune_power_limit"
+SERVICE_STOP_POWER_TUNING = "stop_power_tuning"
+ATTR_MAX_TEMP = "max_temp"
+ATTR_DURATION = "duration"
+ATTR_ENDS_AT = "ends_at"
+ATTR_REMAINING = "remaining"
+
 API = "api"
 MINING_RIG = "mining_rig"
 
@@ -25,4 +140,10 @@ ERROR_CANNOT_CONNECT = "cannot_connect"
 ERROR_NO_RESPONSE = "no_response"
 ERROR_INVALID_PORT = "invalid_port"
 ERROR_INVALID_UPDATE_INTERVAL = "invalid_update_interval"
+ERROR_INVALID_GRACE_PERIOD = "invalid_grace_period"
 ERROR_UNKNOWN = "unknown"
+ERROR_INVALID_NETWORK = "invalid_network"
+ERROR_NETWORK_TOO_LARGE = "network_too_large"
+ERROR_NO_EXCAVATORS_FOUND = "no_excavators_found"
+ERROR_NO_SELECTION = "no_selection"
+ERROR_NO_VALID_RIGS = "no_valid_rigs"
@@ -1,107 +1,66 @@
-"""Classes that contain received data"""
+"""Classes that contain received data
 
+Built by the PayloadParser, missing or invalid values are None.
+"""
+from __future__ import annotations
 
-class GraphicsCard:
-    """contains gpu data"""
+from dataclasses import dataclass, field
 
-    id: int
-    name: str
-    subvendor: str
-    uuid: str
-    gpu_temp: int
-    gpu_load: int
-    gpu_load_memctrl: int
-    gpu_power_usage: float
-    gpu_fan_speed: int
-    too_hot: bool
-    vram_temp: int
-    hotspot_temp: int
-
-    def __init__(self, data=None) -> None:
-        """Init GraphicsCard."""
-        self.id = data.get("device_id") if data else "unavailable"
-        self.name = data.get("name") if data else "unavailable"
-        self.subvendor = data.get("subvendor") if data else "unavailable"
-        self.uuid = data.get("uuid") if data else "unavailable"
-        self.gpu_temp = data.get("gpu_temp") if data else "unavailable"
-        self.gpu_load = data.get("gpu_load") if data else "unavailable"
-        self.gpu_load_memctrl = data.get("gpu_load_memctrl") if data else "unavailable"
-        self.gpu_power_usage = data.get("gpu_power_usage") if data else "unavailable"
-        self.gpu_fan_speed = data.get("gpu_fan_speed") if data else "unavailable"
-        self.too_hot = data.get("too_hot") if data else "unavailable"
-        self.vram_temp = data.get("__vram_temp") if data else "unavailable"
-        self.hotspot_temp = data.get("__hotspot_temp") if data else "unavailable"
 
+@dataclass
+class GraphicsCard:
+    """contains gpu data"""
 
+    id: int | None = None
+    name: str | None = None
+    subvendor: str | None = None
+    uuid: str | None = None
+    gpu_temp: int | None = None
+    gpu_load: int | None = None
+    gpu_load_memctrl: int | None = None
+    gpu_power_usage: float | None = None
+    gpu_fan_speed: int | None = None
+    too_hot: bool | None = None
+    vram_temp: int | None = None
+    hotspot_temp: int | None = None
+
+
+@dataclass
 class Algorithm:
     """contains algorithm data"""
 
-    id: int
-    name: str
-    speed: float
-
-    def __init__(self, data=None) -> None:
-        """Init Algorithm."""
-        self.name = data.get("name") if data else "unavailable"
-
-        if "algorithm_id" in data:
-            self.id = data.get("algorithm_id")
-        else:
-            if "id" in data:
-                self.id = data.get("id")
-            else:
-                self.id = "unavailable"
-
-        if "speed" in data:
-            self.speed = data.get("speed")
-        else:
-            self.speed = "unavailable"
+    id: int | None = None
+    name: str | None = None
+    speed: float | None = None
+    # Cumulative since Excavator started, only reported by algorithm.list
+    accepted_shares: int | None = None
+    rejected_shares: int | None = None
 
 
+@dataclass
 class RigInfo:
     """contains Rig info"""
 
-    version: str
-    build_platform: str
-    build_number: int
-    excavator_cuda_ver: int
-    driver_cuda_ver: int
-    uptime: int
-    cpu_load: float
-    ram_load: float
-
-    def __init__(self, data=None) -> None:
-        """Init RigInfo."""
-        self.version = data.get("version") if data else "unavailable"
-        self.build_platform = data.get("build_platform") if data else "unavailable"
-        self.build_number = data.get("build_number") if data else "unavailable"
-        self.excavator_cuda_ver = (
-            data.get("excavator_cuda_ver") if data else "unavailable"
-        )
-        self.driver_cuda_ver = data.get("driver_cuda_ver") if data else "unavailable"
-        self.uptime = data.get("uptime") if data else "unavailable"
-        self.cpu_load = data.get("cpu_load") if data else "unavailable"
-        self.ram_load = data.get("ram_load") if data else "unavailable"
+    version: str | None = None
+    build_platform: str | None = None
+    build_number: int | None = None
+    excavator_cuda_ver: int | None = None
+    driver_cuda_ver: int | None = None
+    uptime: int | None = None
+    cpu_load: float | None = None
+    ram_load: float | None = None
 
 
+@dataclass
 class Worker:
     """contains Worker data"""
 
-    id: int
-    device_id: int
-    device_uuid: str
-    algorithms: dict[int, Algorithm]
-
-    def __init__(self, data=None) -> None:
-        """Init Worker."""
-        self.id = data.get("worker_id") if data else "unavailable"
-        self.device_id = data.get("device_id") if data else "unavailable"
-        self.device_uuid = data.get("device_uuid") if data else "unavailable"
-        self.algorithms = {}
-
-        if "algorithms" in data:
-            for algorithm_data in data.get("algorithms"):
-                algorithm = Algorithm(algorithm_data)
-                self.algorithms[algorithm.id] = algorithm
-        else:
-            self.algorithms = "unavailable"
+    id: int | None = None
+    device_id: int | None = None
+    device_uuid: str | None = None
+    algorithms: dict[int, Algorithm] = field(default_factory=dict)
+
+
+def is_number(value) -> bool:
+    """Return True for int and float values, excluding bool."""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
@@ -0,0 +1,88 @@
+"""Device triggers for Nicehash Excavator rigs and GPUs."""
+from __future__ import annotations
+
+import voluptuous as vol
+
+from homeassistant.components.device_automation import DEVICE_TRIGGER_BASE_SCHEMA
+from homeassistant.components.homeassistant.triggers import event as event_trigger
+from homeassistant.const import CONF_DEVICE_ID, CONF_DOMAIN, CONF_PLATFORM, CONF_TYPE
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant
+from homeassistant.helpers import device_registry
+
+from .const import DOMAIN
+from .farm import FARM_ID
+
+RIG_TRIGGER_TYPES = {
+    "rig_online",
+    "rig_offline",
+    "gpu_added",
+    "gpu_removed",
+    "worker_started",
+    "worker_stopped",
+    "algorithm_changed",
+    "worker_restarted",
+    "restart_budget_exhausted",
+}
+GPU_TRIGGER_TYPES = {
+    "gpu_removed",
+    "worker_started",
+    "worker_stopped",
+    "algorithm_changed",
+    "worker_restarted",
+}
+
+TRIGGER_SCHEMA = DEVICE_TRIGGER_BASE_SCHEMA.extend(
+    {vol.Required(CONF_TYPE): vol.In(RIG_TRIGGER_TYPES | GPU_TRIGGER_TYPES)}
+)
+
+
+def _is_farm_device(device: device_registry.DeviceEntry) -> bool:
+    """Return True if the device is the farm, which fires no events."""
+    return (DOMAIN, FARM_ID) in device.identifiers
+
+
+def _is_rig_device(device: device_registry.DeviceEntry) -> bool:
+    """Return True if the device is a rig and not a GPU."""
+    return any(
+        domain == DOMAIN and identifier.endswith(" Excavator")
+        for domain, identifier in device.identifiers
+    )
+
+
+async def async_get_triggers(hass: HomeAssistant, device_id: str) -> list[dict]:
+    """List device triggers for a rig or GPU device."""
+    device = device_registry.async_get(hass).async_get(device_id)
+    if device is None or _is_farm_device(device):
+        return []
+    trigger_types = RIG_TRIGGER_TYPES if _is_rig_device(device) else GPU_TRIGGER_TYPES
+    return [
+        {
+            CONF_PLATFORM: "device",
+            CONF_DOMAIN: DOMAIN,
+            CONF_DEVICE_ID: device_id,
+            CONF_TYPE: trigger_type,
+        }
+        for trigger_type in sorted(trigger_types)
+    ]
+
+
+async def async_attach_trigger(
+    hass: HomeAssistant, config, action, automation_info
+) -> CALLBACK_TYPE:
+    """Attach a trigger listening to the matching transition event."""
+    device = device_registry.async_get(hass).async_get(config[CONF_DEVICE_ID])
+    if device is not None and _is_rig_device(device):
+        event_data = {"rig_device_id": config[CONF_DEVICE_ID]}
+    else:
+        event_data = {"device_id": config[CONF_DEVICE_ID]}
+
+    event_config = event_trigger.TRIGGER_SCHEMA(
+        {
+            event_trigger.CONF_PLATFORM: "event",
+            event_trigger.CONF_EVENT_TYPE: f"{DOMAIN}_{config[CONF_TYPE]}",
+            event_trigger.CONF_EVENT_DATA: event_data,
+        }
+    )
+    return await event_trigger.async_attach_trigger(
+        hass, event_config, action, automation_info, platform_type="device"
+    )
@@ -0,0 +1,146 @@
+"""Discovery of Excavator instances in a local network."""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+import ipaddress
+import logging
+
+import aiohttp
+
+from .const import DISCOVERY_CONCURRENCY, DISCOVERY_MAX_HOSTS, DISCOVERY_TIMEOUT
+from .excavator import QUERY_DEVICES, QUERY_INFO, ExcavatorAPI
+from .parser import PayloadParser
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class InvalidNetwork(ValueError):
+    """The network is not a valid CIDR range."""
+
+
+class NetworkTooLarge(ValueError):
+    """The network has more hosts than DISCOVERY_MAX_HOSTS."""
+
+
+class InvalidPort(ValueError):
+    """A port is not a number from 1 to 65535."""
+
+
+@dataclass
+class DiscoveredExcavator:
+    """An Excavator answering the info method."""
+
+    host: str
+    port: int
+    version: str | None
+    gpu_count: int | None
+
+    @property
+    def key(self) -> str:
+        """Host and port."""
+        return f"{self.host}:{self.port}"
+
+    @property
+    def label(self) -> str:
+        """Host and port with version and GPU count for the selection list."""
+        details = [f"Excavator {self.version or 'unknown version'}"]
+        if self.gpu_count is not None:
+            details.append(f"{self.gpu_count} GPUs")
+        return f"{self.key} ({', '.join(details)})"
+
+
+def parse_network(value: str) -> list[str]:
+    """Return the host addresses of a CIDR range."""
+    try:
+        network = ipaddress.ip_network(value.strip(), strict=False)
+    except ValueError as error:
+        raise InvalidNetwork(value) from error
+    if network.num_addresses > DISCOVERY_MAX_HOSTS + 2:
+        raise NetworkTooLarge(value)
+    # hosts() is empty for a single address
+    return [str(host) for host in network.hosts()] or [str(network.network_address)]
+
+
+def parse_ports(value: str) -> list[int]:
+    """Return the ports of a comma separated list."""
+    ports = []
+    for part in value.split(","):
+        try:
+            port = int(part)
+        except ValueError as error:
+            raise InvalidPort(part) from error
+        if not 1 <= port <= 65535:
+            raise InvalidPort(part)
+        if port not in ports:
+            ports.append(port)
+    return ports
+
+
+async def query_excavator(
+    session: aiohttp.ClientSession, host: str, port: int, query: str
+) -> dict | None:
+    """Send one query, None on any error or a non JSON object response."""
+    url = f"{ExcavatorAPI.format_host_address(host)}:{port}/api?command={query}"
+    try:
+        async with session.get(url) as response:
+            if response.status != 200:
+                return None
+            data = await response.json(content_type=None)
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+async def _probe(
+    session: aiohttp.ClientSession,
+    semaphore: asyncio.Semaphore,
+    host: str,
+    port: int,
+) -> DiscoveredExcavator | None:
+    """Probe a host and port with the info method."""
+    async with semaphore:
+        info = await query_excavator(session, host, port, QUERY_INFO)
+        if info is None or "version" not in info:
+            return None
+        devices = await query_excavator(session, host, port, QUERY_DEVICES)
+    parser = PayloadParser()
+    return DiscoveredExcavator(
+        host=host,
+        port=port,
+        version=parser.parse_info(info).version,
+        gpu_count=None if devices is None else len(parser.parse_devices(devices)),
+    )
+
+
+async def async_scan(
+    hosts: list[str],
+    ports: list[int],
+    concurrency: int = DISCOVERY_CONCURRENCY,
+    timeout: float = DISCOVERY_TIMEOUT,
+) -> list[DiscoveredExcavator]:
+    """Probe all hosts on all ports, at most concurrency at a time.
+
+    Hosts that do not answer cost one timeout, so a /24 on one port takes
+    about 254 / concurrency * timeout seconds in the worst case.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    async with aiohttp.ClientSession(
+        timeout=aiohttp.ClientTimeout(total=timeout),
+        connector=aiohttp.TCPConnector(limit=concurrency, force_close=True),
+    ) as session:
+        results = await asyncio.gather(
+            *(
+                _probe(session, semaphore, host, port)
+                for host in hosts
+                for port in ports
+            )
+        )
+    found = [result for result in results if result is not None]
+    _LOGGER.debug(
+        "Found %s Excavators probing %s hosts on ports %s",
+        len(found),
+        len(hosts),
+        ports,
+    )
+    return found
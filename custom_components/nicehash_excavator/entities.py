@@ -0,0 +1,59 @@
+"""Entities of a rig that follow changes of its filter."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_platform, entity_registry
+from homeassistant.helpers.entity import Entity
+
+from .const import DOMAIN
+
+
+@callback
+def async_add_filtered_entities(
+    hass: HomeAssistant,
+    mining_rig,
+    config_entry: ConfigEntry,
+    async_add_entities,
+    create_entities: Callable[[], list[Entity]],
+) -> None:
+    """Add the entities kept by the rig filter and follow filter changes.
+
+    Entities covering a GPU, metric or algorithm set it as filter_subject,
+    the keyword arguments of RigFilter.excludes. After a filter change the
+    entities are created again from the first poll parsed with the new
+    filter and the ones not added yet are added. Entities the new filter
+    excludes are deleted from the entity registry, which also removes them
+    from Home Assistant. Entities only missing from the poll are kept.
+    """
+    domain = entity_platform.async_get_current_platform().domain
+    # unique id -> filter subject of the added entities
+    subjects: dict[str, dict[str, Any] | None] = {}
+
+    def add_entities() -> None:
+        rig_filter = mining_rig.rig_filter
+        registry = entity_registry.async_get(hass)
+        for unique_id, subject in list(subjects.items()):
+            if subject and rig_filter.excludes(**subject):
+                del subjects[unique_id]
+                entity_id = registry.async_get_entity_id(domain, DOMAIN, unique_id)
+                if entity_id is not None:
+                    registry.async_remove(entity_id)
+        new_entities = {
+            entity.unique_id: entity
+            for entity in create_entities()
+            if entity.unique_id not in subjects
+        }
+        for unique_id, entity in new_entities.items():
+            subjects[unique_id] = getattr(entity, "filter_subject", None)
+        if new_entities:
+            async_add_entities(list(new_entities.values()))
+
+    add_entities()
+    mining_rig.register_filter_callback(add_entities)
+    config_entry.async_on_unload(
+        lambda: mining_rig.remove_filter_callback(add_entities)
+    )
@@ -0,0 +1,88 @@
+"""Transition events computed from consecutive rig polls."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any
+
+from .const import (
+    EVENT_ALGORITHM_CHANGED,
+    EVENT_GPU_ADDED,
+    EVENT_GPU_REMOVED,
+    EVENT_RIG_OFFLINE,
+    EVENT_RIG_ONLINE,
+    EVENT_WORKER_STARTED,
+    EVENT_WORKER_STOPPED,
+)
+
+
+@dataclass
+class RigSnapshot:
+    """The parts of a poll that transitions are detected on."""
+
+    online: bool
+    # device uuid -> device id
+    devices: dict[str, int] = field(default_factory=dict)
+    # device uuid -> names of the algorithms mined on it
+    algorithms: dict[str, frozenset[str]] = field(default_factory=dict)
+
+    @classmethod
+    def from_mining_rig(cls, mining_rig, previous: RigSnapshot | None) -> RigSnapshot:
+        """Create a snapshot of the current MiningRig state.
+
+        An offline rig keeps the layout of the previous snapshot, so changes
+        during the downtime are reported once it is back online.
+        """
+        if not mining_rig.online and previous is not None:
+            return cls(False, previous.devices, previous.algorithms)
+        algorithms: dict[str, set[str]] = {}
+        for worker in mining_rig.workers.values():
+            names = algorithms.setdefault(worker.device_uuid, set())
+            names.update(algorithm.name for algorithm in worker.algorithms.values())
+        return cls(
+            online=mining_rig.online,
+            devices={device.uuid: device.id for device in mining_rig.devices.values()},
+            algorithms={uuid: frozenset(names) for uuid, names in algorithms.items()},
+        )
+
+
+def diff_snapshots(
+    old: RigSnapshot, new: RigSnapshot
+) -> list[tuple[str, dict[str, Any]]]:
+    """Return the events for the transitions between two snapshots."""
+    events = []
+    if old.online != new.online:
+        events.append((EVENT_RIG_ONLINE if new.online else EVENT_RIG_OFFLINE, {}))
+    if not new.online:
+        return events
+
+    for uuid in new.devices.keys() - old.devices.keys():
+        events.append((EVENT_GPU_ADDED, {"uuid": uuid, "gpu": new.devices[uuid]}))
+    for uuid in old.devices.keys() - new.devices.keys():
+        events.append((EVENT_GPU_REMOVED, {"uuid": uuid, "gpu": old.devices[uuid]}))
+
+    for uuid in old.algorithms.keys() | new.algorithms.keys():
+        old_algorithms = old.algorithms.get(uuid, frozenset())
+        new_algorithms = new.algorithms.get(uuid, frozenset())
+        if old_algorithms == new_algorithms:
+            continue
+        data = {"uuid": uuid, "gpu": new.devices.get(uuid, old.devices.get(uuid))}
+        if not old_algorithms:
+            events.append(
+                (EVENT_WORKER_STARTED, {**data, "algorithms": sorted(new_algorithms)})
+            )
+        elif not new_algorithms:
+            events.append(
+                (EVENT_WORKER_STOPPED, {**data, "algorithms": sorted(old_algorithms)})
+            )
+        else:
+            events.append(
+                (
+                    EVENT_ALGORITHM_CHANGED,
+                    {
+                        **data,
+                        "old_algorithms": sorted(old_algorithms),
+                        "algorithms": sorted(new_algorithms),
+                    },
+                )
+            )
+    return events
@@ -1,29 +1,97 @@
 """Nicehash Excavator API"""
 from __future__ import annotations
 
+import asyncio
+from collections.abc import Callable
+import json
 import logging
+from time import monotonic, perf_counter
+from typing import Any
 
 import aiohttp
-from aiohttp.client_reqrep import ClientResponse
+
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
 
 from .data_containers import Algorithm, GraphicsCard, RigInfo, Worker
+from .parser import PayloadParser
 
 _LOGGER = logging.getLogger(__name__)
 
+# Seconds a metadata (info) response is reused for identical queries
+METADATA_CACHE_TTL = 1.0
+
+QUERY_INFO = '{"id":1,"method":"info","params":[]}'
+QUERY_DEVICES = '{"id":1,"method":"devices.get","params":[]}'
+
 
 class ExcavatorAPI:
-    """Excavator API Implementation."""
+    """Excavator API Implementation.
+
+    Identical queries to the same host and port share one in-flight request,
+    across all instances (config flow, options flow and polling).
+    """
+
+    _in_flight: dict[tuple[str, int, str], asyncio.Future] = {}
+    _cache: dict[tuple[str, int, str], tuple[float, dict[str, Any]]] = {}
 
     def __init__(
-        self, host_address: str, host_port: int, enable_debug_logging: bool = False
+        self,
+        host_address: str,
+        host_port: int,
+        enable_debug_logging: bool = False,
+        parser: PayloadParser | None = None,
     ) -> None:
         """Init ExcavatorAPI."""
         self.host_address = self.format_host_address(host_address)
         self._host_port = host_port
         self._enable_debug_logging = enable_debug_logging
-
-    async def request(self, query: str) -> ClientResponse | None:
-        """Excavator API Request"""
+        self.parser = parser or PayloadParser()
+        # Called with the phase name and duration while a profile runs
+        self.profile = None
+
+    @property
+    def host_port(self) -> int:
+        """Port of the Excavator API."""
+        return self._host_port
+
+    async def request(self, query: str, cache_ttl: float = 0) -> dict[str, Any] | None:
+        """Excavator API Request
+
+        Joins an identical request already in flight, and returns a cached
+        response younger than cache_ttl seconds if one is given.
+        """
+        key = (self.host_address, self._host_port, query)
+        if cache_ttl:
+            cached = self._cache.get(key)
+            if cached is not None and monotonic() - cached[0] < cache_ttl:
+                return cached[1]
+
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._request(query))
+            self._in_flight[key] = future
+
+            def _done(finished: asyncio.Future) -> None:
+                if self._in_flight.get(key) is finished:
+                    del self._in_flight[key]
+
+            future.add_done_callback(_done)
+
+        # Shielded so a cancelled caller does not cancel the shared request
+        response = await asyncio.shield(future)
+        if cache_ttl and response is not None:
+            self._cache[key] = (monotonic(), response)
+        return response
+
+    async def _request(self, query: str) -> dict[str, Any] | None:
+        """Send a single request to Excavator.
+
+        The body is decoded from the raw bytes with orjson when available,
+        skipping the content type check and text decoding of response.json().
+        """
 
         url = f"{self.host_address}:{self._host_port}/api?command={query}"
 
@@ -34,7 +102,7 @@ class ExcavatorAPI:
             try:
                 async with session.get(url) as response:
                     if response.status == 200:
-                        return await response.json()
+                        return json_loads(await response.read())
                     if response.content:
                         raise Exception(
                             str(response.status)
@@ -49,32 +117,37 @@ class ExcavatorAPI:
                     _LOGGER.warning("Error while getting data from %s", url)
                 return None
 
+    async def send_command(
+        self, method: str, params: list[str]
+    ) -> dict[str, Any] | None:
+        """Send a command, never shared with or cached for other callers."""
+        query = json.dumps(
+            {"id": 1, "method": method, "params": params}, separators=(",", ":")
+        )
+        return await self._request(query)
+
     async def test_connection(self) -> bool:
         """Test connectivity"""
-        query = '{"id":1,"method":"info","params":[]}'
-        response = await self.request(query)
+        response = await self.request(QUERY_INFO, METADATA_CACHE_TTL)
         if response is not None:
             return True
         return False
 
     async def get_rig_info(self) -> RigInfo:
-        """Get Rig Information"""
-        query = '{"id":1,"method":"info","params":[]}'
-        response = await self.request(query)
+        """Get Rig Information
+
+        Always fresh, the cached info is only for test_connection.
+        """
+        response = await self.request(QUERY_INFO)
         if response is not None:
-            return RigInfo(response)
+            return self._parse(self.parser.parse_info, response)
         return None
 
     async def get_devices(self) -> dict[int, GraphicsCard]:
         """Get the devices"""
-        query = '{"id":1,"method":"devices.get","params":[]}'
-        response = await self.request(query)
+        response = await self.request(QUERY_DEVICES)
         if response is not None:
-            devices = {}
-            for device_data in response.get("devices"):
-                card = GraphicsCard(device_data)
-                devices[card.id] = card
-            return devices
+            return self._parse(self.parser.parse_devices, response)
         return {}
 
     async def get_algorithms(self) -> dict[int, Algorithm]:
@@ -82,11 +155,7 @@ class ExcavatorAPI:
         query = '{"id":1,"method":"algorithm.list","params":[]}'
         response = await self.request(query)
         if response is not None:
-            algorithms = {}
-            for algorithm_data in response.get("algorithms"):
-                algorithm = Algorithm(algorithm_data)
-                algorithms[algorithm.id] = algorithm
-            return algorithms
+            return self._parse(self.parser.parse_algorithms, response)
         return {}
 
     async def get_workers(self) -> dict[int, Worker]:
@@ -94,13 +163,18 @@ class ExcavatorAPI:
         query = '{"id":1,"method":"worker.list","params":[]}'
         response = await self.request(query)
         if response is not None:
-            workers = {}
-            for worker_data in response.get("workers"):
-                worker = Worker(worker_data)
-                workers[worker.id] = worker
-            return workers
+            return self._parse(self.parser.parse_workers, response)
         return {}
 
+    def _parse(self, parse: Callable[[dict[str, Any]], Any], response: dict) -> Any:
+        """Parse a response, timed while a profile runs."""
+        if self.profile is None:
+            return parse(response)
+        started = perf_counter()
+        result = parse(response)
+        self.profile("parse", perf_counter() - started)
+        return result
+
     @staticmethod
     def format_host_address(host_address: str) -> str:
         """Add http if missing"""
@@ -0,0 +1,152 @@
+"""A virtual farm aggregating all configured MiningRigs."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+from homeassistant.core import Callable
+
+from .data_containers import is_number
+
+FARM_NAME = "Mining farm"
+FARM_ID = "farm"
+
+
+@dataclass
+class RigContribution:
+    """What a single rig contributes to the farm totals."""
+
+    online: bool = False
+    power: float = 0
+    # algorithm name -> speed in H/s
+    hashrates: dict[str, float] = field(default_factory=dict)
+    # (temperature, rig name, gpu id) of the hottest GPU
+    hottest_gpu: tuple[float, str, int] | None = None
+
+    @classmethod
+    def from_mining_rig(cls, mining_rig) -> RigContribution:
+        """Compute the contribution of the current MiningRig state."""
+        if not mining_rig.online:
+            return cls()
+        contribution = cls(online=True)
+        for device in mining_rig.devices.values():
+            if is_number(device.gpu_power_usage):
+                contribution.power += device.gpu_power_usage
+            if is_number(device.gpu_temp) and (
+                contribution.hottest_gpu is None
+                or device.gpu_temp > contribution.hottest_gpu[0]
+            ):
+                contribution.hottest_gpu = (device.gpu_temp, mining_rig.name, device.id)
+        for algorithm in mining_rig.algorithms.values():
+            if is_number(algorithm.speed):
+                contribution.hashrates[algorithm.name] = (
+                    contribution.hashrates.get(algorithm.name, 0) + algorithm.speed
+                )
+        return contribution
+
+
+class Farm:
+    """Running totals across all MiningRigs.
+
+    Each rig poll replaces that rig's contribution and applies only the
+    difference to the totals, instead of summing over all rigs again. The
+    hottest GPU is only searched again when the rig holding it cools down or
+    leaves, and listeners are only called when a total changed.
+    """
+
+    def __init__(self) -> None:
+        """Init Farm."""
+        self._contributions: dict[str, RigContribution] = {}
+        self.total_power = 0.0
+        self.hashrates: dict[str, float] = {}
+        self.online_rigs = 0
+        # (temperature, rig name, gpu id) of the hottest GPU in the farm
+        self.hottest_gpu: tuple[float, str, int] | None = None
+        self.owner_entry_id = None
+        # entry_id -> adds the farm entities to the sensor platform of that rig
+        self._hosts: dict[str, Callable[[], None]] = {}
+        self._callbacks = set()
+
+    def add_host(self, entry_id: str, setup: Callable[[], None]) -> None:
+        """Offer a loaded rig to host the farm entities."""
+        self._hosts[entry_id] = setup
+        if self.owner_entry_id is None:
+            self._adopt(entry_id)
+
+    def remove_host(self, entry_id: str) -> None:
+        """Withdraw a rig and hand the farm entities to a remaining one."""
+        self._hosts.pop(entry_id, None)
+        if self.owner_entry_id != entry_id:
+            return
+        self.owner_entry_id = None
+        if self._hosts:
+            self._adopt(next(iter(self._hosts)))
+
+    def _adopt(self, entry_id: str) -> None:
+        """Let a rig add the farm entities to its sensor platform."""
+        self.owner_entry_id = entry_id
+        self._hosts[entry_id]()
+
+    def register_callback(self, callback: Callable[[], None]) -> None:
+        """Register callback, called when the totals change."""
+        self._callbacks.add(callback)
+
+    def remove_callback(self, callback: Callable[[], None]) -> None:
+        """Remove previously registered callback."""
+        self._callbacks.discard(callback)
+
+    def _find_hottest_gpu(self) -> tuple[float, str, int] | None:
+        """Search the hottest GPU in all contributions."""
+        hottest = None
+        for contribution in self._contributions.values():
+            if contribution.hottest_gpu is not None and (
+                hottest is None or contribution.hottest_gpu[0] > hottest[0]
+            ):
+                hottest = contribution.hottest_gpu
+        return hottest
+
+    def update_rig(self, rig_id: str, contribution: RigContribution) -> None:
+        """Replace the contribution of a rig and apply the difference."""
+        previous = self._contributions.get(rig_id, RigContribution())
+        self._contributions[rig_id] = contribution
+        self._apply(previous, contribution)
+
+    def remove_rig(self, rig_id: str) -> None:
+        """Remove a rig from the farm."""
+        previous = self._contributions.pop(rig_id, None)
+        if previous is not None:
+            self._apply(previous, RigContribution())
+
+    def _apply(self, previous: RigContribution, current: RigContribution) -> None:
+        """Apply the difference between two contributions to the totals."""
+        changed = (
+            current.online != previous.online
+            or current.power != previous.power
+            or current.hashrates != previous.hashrates
+        )
+        self.online_rigs += current.online - previous.online
+        self.total_power += current.power - previous.power
+
+        for name in previous.hashrates.keys() | current.hashrates.keys():
+            speed = self.hashrates.get(name, 0) + (
+                current.hashrates.get(name, 0) - previous.hashrates.get(name, 0)
+            )
+            self.hashrates[name] = speed
+
+        hottest = self.hottest_gpu
+        if current.hottest_gpu is not None and (
+            hottest is None or current.hottest_gpu[0] >= hottest[0]
+        ):
+            self.hottest_gpu = current.hottest_gpu
+        elif previous.hottest_gpu is not None and previous.hottest_gpu == hottest:
+            self.hottest_gpu = self._find_hottest_gpu()
+        changed = changed or self.hottest_gpu != hottest
+
+        if not self._contributions:
+            # Drop accumulated float error once the farm is empty
+            self.total_power = 0.0
+            self.hashrates = {name: 0.0 for name in self.hashrates}
+
+        if not changed:
+            return
+        for callback in self._callbacks:
+            callback()
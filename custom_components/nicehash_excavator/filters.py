@@ -0,0 +1,91 @@
+"""Per-rig filters for GPUs, metrics and algorithms."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any
+
+from .const import (
+    CONFIG_EXCLUDE_ALGORITHMS,
+    CONFIG_EXCLUDE_GPUS,
+    CONFIG_EXCLUDE_METRICS,
+)
+
+# metric class -> label, the keys of the device sensors plus the per
+# algorithm sensors
+FILTER_METRICS = {
+    "temp": "GPU temperature",
+    "vram_temp": "VRAM temperature",
+    "hotspot_temp": "Hotspot temperature",
+    "overtemp": "Overtemp",
+    "fan": "Fan",
+    "power": "Power",
+    "gpu_model": "GPU model",
+    "vendor_id": "Vendor ID",
+    "hashrate": "Hashrates",
+    "shares": "Share rates",
+}
+
+# metric class -> GraphicsCard attribute that is not parsed when excluded
+METRIC_FIELDS = {
+    "temp": "gpu_temp",
+    "vram_temp": "vram_temp",
+    "hotspot_temp": "hotspot_temp",
+    "overtemp": "too_hot",
+    "fan": "gpu_fan_speed",
+    "power": "gpu_power_usage",
+}
+
+
+def split_list(value: str) -> list[str]:
+    """Split a comma or whitespace separated option text."""
+    return [part for part in value.replace(",", " ").split() if part]
+
+
+@dataclass(frozen=True)
+class RigFilter:
+    """GPUs, metric classes and algorithms excluded for a rig.
+
+    Immutable, compared with the filter of changed options.
+    """
+
+    # GPU uuids or device ids
+    gpus: frozenset[str] = field(default_factory=frozenset)
+    metrics: frozenset[str] = field(default_factory=frozenset)
+    algorithms: frozenset[str] = field(default_factory=frozenset)
+
+    @classmethod
+    def from_config(cls, data: dict[str, Any]) -> RigFilter:
+        """Filter of the config entry options."""
+        return cls(
+            frozenset(data.get(CONFIG_EXCLUDE_GPUS, ())),
+            frozenset(data.get(CONFIG_EXCLUDE_METRICS, ())),
+            frozenset(data.get(CONFIG_EXCLUDE_ALGORITHMS, ())),
+        )
+
+    @property
+    def device_fields(self) -> frozenset[str]:
+        """GraphicsCard attributes not to parse."""
+        return frozenset(
+            METRIC_FIELDS[metric] for metric in self.metrics if metric in METRIC_FIELDS
+        )
+
+    def excludes_gpu(self, device_id: Any, device_uuid: Any) -> bool:
+        """Return True if a GPU is excluded by its id or uuid."""
+        return str(device_id) in self.gpus or device_uuid in self.gpus
+
+    def excludes(
+        self,
+        device_id: Any = None,
+        device_uuid: Any = None,
+        metric: str | None = None,
+        algorithm: str | None = None,
+    ) -> bool:
+        """Return True if an entity of this GPU, metric or algorithm is excluded."""
+        return (
+            (device_uuid is not None and self.excludes_gpu(device_id, device_uuid))
+            or metric in self.metrics
+            or algorithm in self.algorithms
+        )
+
+
+NO_FILTER = RigFilter()
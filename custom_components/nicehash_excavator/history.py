@@ -0,0 +1,421 @@
+"""Memory-mapped time-series store for the per-poll history of a rig."""
+from __future__ import annotations
+
+from collections.abc import Callable
+import math
+import mmap
+import os
+import struct
+import threading
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DEFAULT_HISTORY_POINTS,
+    DOMAIN,
+    HISTORY_SLOTS,
+    HISTORY_TIERS,
+    MAX_HISTORY_POINTS,
+)
+from .data_containers import is_number
+
+MAGIC = b"NHXH"
+VERSION = 1
+# magic, version, slots, metrics, capacity, head, count
+HEADER = struct.Struct("<4sHHIIII")
+
+# metric, value accessor on a GraphicsCard
+DEVICE_METRICS: tuple[tuple[str, Callable], ...] = (
+    ("temp", lambda d: d.gpu_temp),
+    ("vram_temp", lambda d: d.vram_temp),
+    ("hotspot_temp", lambda d: d.hotspot_temp),
+    ("fan", lambda d: d.gpu_fan_speed),
+    ("power", lambda d: d.gpu_power_usage),
+    ("load", lambda d: d.gpu_load),
+)
+# Summed over the algorithms of a GPU, in Mh/s
+HASHRATE = "hashrate"
+METRICS = tuple(metric for metric, _ in DEVICE_METRICS) + (HASHRATE,)
+
+NAN = float("nan")
+
+
+def _number(value: Any) -> float:
+    """Value as float, NaN for missing values."""
+    if is_number(value):
+        return float(value)
+    return NAN
+
+
+def read_values(mining_rig) -> list[list[float]]:
+    """Current metrics of a rig, one list of slot values per metric."""
+    values = [[NAN] * HISTORY_SLOTS for _ in METRICS]
+    for device in mining_rig.devices.values():
+        if not isinstance(device.id, int) or not 0 <= device.id < HISTORY_SLOTS:
+            continue
+        for index, (_, value_fn) in enumerate(DEVICE_METRICS):
+            values[index][device.id] = _number(value_fn(device))
+    hashrates = values[-1]
+    for worker in mining_rig.workers.values():
+        slot = worker.device_id
+        if not isinstance(slot, int) or not 0 <= slot < HISTORY_SLOTS:
+            continue
+        for algorithm in worker.algorithms.values():
+            speed = _number(algorithm.speed) / 1e6
+            if not math.isnan(speed):
+                hashrates[slot] = speed + (
+                    0.0 if math.isnan(hashrates[slot]) else hashrates[slot]
+                )
+    return values
+
+
+class TimeSeriesFile:
+    """Fixed-size ring of records in a memory-mapped file.
+
+    The file holds a header, a float64 timestamp column and one float32
+    column per metric and GPU slot, so a query only touches the pages of the
+    columns it reads. Missing values are NaN. Once full, every new record
+    replaces the oldest one.
+    """
+
+    def __init__(self, path: str, capacity: int) -> None:
+        """Open or create the file, a file of another layout is replaced."""
+        self.capacity = capacity
+        size = HEADER.size + capacity * (8 + len(METRICS) * HISTORY_SLOTS * 4)
+        header = (MAGIC, VERSION, HISTORY_SLOTS, len(METRICS), capacity)
+        descriptor = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            existing = os.read(descriptor, HEADER.size)
+            valid = (
+                len(existing) == HEADER.size
+                and HEADER.unpack(existing)[:5] == header
+                and os.fstat(descriptor).st_size == size
+            )
+            if not valid:
+                # Sparse until written
+                os.ftruncate(descriptor, 0)
+                os.ftruncate(descriptor, size)
+            self._mmap = mmap.mmap(descriptor, size)
+        finally:
+            os.close(descriptor)
+        if valid:
+            self._head, self.count = HEADER.unpack_from(self._mmap)[5:]
+        else:
+            self._head = self.count = 0
+            self._write_header()
+
+        view = memoryview(self._mmap)
+        offset = HEADER.size
+        self._timestamps = view[offset : offset + capacity * 8].cast("d")
+        offset += capacity * 8
+        self._columns: list[list[memoryview]] = []
+        for _ in METRICS:
+            slots = []
+            for _ in range(HISTORY_SLOTS):
+                slots.append(view[offset : offset + capacity * 4].cast("f"))
+                offset += capacity * 4
+            self._columns.append(slots)
+
+    def _write_header(self) -> None:
+        """Store the write position."""
+        HEADER.pack_into(
+            self._mmap,
+            0,
+            MAGIC,
+            VERSION,
+            HISTORY_SLOTS,
+            len(METRICS),
+            self.capacity,
+            self._head,
+            self.count,
+        )
+
+    def append(self, timestamp: float, values: list[list[float]]) -> None:
+        """Write a record, replacing the oldest one if full."""
+        index = self._head
+        self._timestamps[index] = timestamp
+        for columns, slot_values in zip(self._columns, values):
+            for column, value in zip(columns, slot_values):
+                column[index] = value
+        self._head = (index + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        self._write_header()
+
+    def _physical(self, position: int) -> int:
+        """Index in the file of the record at a position, oldest first."""
+        return (self._head - self.count + position) % self.capacity
+
+    def timestamp(self, position: int) -> float:
+        """Timestamp of the record at a position, oldest first."""
+        return self._timestamps[self._physical(position)]
+
+    def bisect(self, timestamp: float) -> int:
+        """Position of the first record at or after a timestamp."""
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self.timestamp(middle) < timestamp:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def read(
+        self, start: int, end: int, metric: int, slot: int
+    ) -> tuple[list[float], list[float]]:
+        """Timestamps and values of the records in [start, end)."""
+        timestamps: list[float] = []
+        values: list[float] = []
+        if start >= end:
+            return timestamps, values
+        column = self._columns[metric][slot]
+        first = self._physical(start)
+        last = first + end - start
+        # At most two contiguous parts, before and after the ring wraps
+        for low, high in ((first, min(last, self.capacity)), (0, last - self.capacity)):
+            if low < high:
+                timestamps += self._timestamps[low:high].tolist()
+                values += column[low:high].tolist()
+        return timestamps, values
+
+    def close(self) -> None:
+        """Write back and close the file."""
+        self._timestamps.release()
+        for columns in self._columns:
+            for column in columns:
+                column.release()
+        self._mmap.flush()
+        self._mmap.close()
+
+
+class Downsampler:
+    """Means of the values per bucket of a fixed resolution."""
+
+    def __init__(self, resolution: int) -> None:
+        """Init Downsampler."""
+        self.resolution = resolution
+        self._bucket: float | None = None
+        self._sums = [[0.0] * HISTORY_SLOTS for _ in METRICS]
+        self._counts = [[0] * HISTORY_SLOTS for _ in METRICS]
+
+    def add(
+        self, timestamp: float, values: list[list[float]]
+    ) -> tuple[float, list[list[float]]] | None:
+        """Add a record, return the finished bucket when a new one starts."""
+        bucket = timestamp - timestamp % self.resolution
+        finished = None
+        if self._bucket is not None and bucket != self._bucket:
+            finished = (
+                self._bucket,
+                [
+                    [total / count if count else NAN for total, count in zip(s, c)]
+                    for s, c in zip(self._sums, self._counts)
+                ],
+            )
+            self._sums = [[0.0] * HISTORY_SLOTS for _ in METRICS]
+            self._counts = [[0] * HISTORY_SLOTS for _ in METRICS]
+        self._bucket = bucket
+        for sums, counts, slot_values in zip(self._sums, self._counts, values):
+            for slot, value in enumerate(slot_values):
+                if not math.isnan(value):
+                    sums[slot] += value
+                    counts[slot] += 1
+        return finished
+
+
+class HistoryStore:
+    """Per-poll history of a rig with downsampled tiers for older data.
+
+    Every poll is written to the raw tier. The coarser tiers of HISTORY_TIERS
+    receive the mean of each finished bucket, so the history reaches further
+    back the coarser it gets. A bucket in progress is lost on restart.
+
+    All methods block and run in the executor, a lock keeps appends, queries
+    and closing from overlapping.
+    """
+
+    def __init__(self, directory: str, name: str) -> None:
+        """Open the tier files."""
+        os.makedirs(directory, exist_ok=True)
+        self.tiers: list[tuple[int, TimeSeriesFile]] = [
+            (
+                resolution,
+                TimeSeriesFile(
+                    os.path.join(directory, f"{name}.{resolution}.bin"), capacity
+                ),
+            )
+            for resolution, capacity in HISTORY_TIERS
+        ]
+        self._downsamplers = [
+            Downsampler(resolution) for resolution, _ in HISTORY_TIERS[1:]
+        ]
+        self._lock = threading.Lock()
+        self._closed = False
+
+    @staticmethod
+    def remove(directory: str, name: str) -> None:
+        """Delete the tier files of a rig."""
+        for resolution, _ in HISTORY_TIERS:
+            path = os.path.join(directory, f"{name}.{resolution}.bin")
+            if os.path.exists(path):
+                os.remove(path)
+
+    def append(self, timestamp: float, values: list[list[float]]) -> None:
+        """Write a poll to the raw tier and the finished buckets to the others."""
+        with self._lock:
+            if self._closed:
+                return
+            self.tiers[0][1].append(timestamp, values)
+            for downsampler, (_, tier) in zip(self._downsamplers, self.tiers[1:]):
+                finished = downsampler.add(timestamp, values)
+                if finished is not None:
+                    tier.append(*finished)
+
+    def query(
+        self,
+        metric: str,
+        start: float,
+        end: float,
+        slots: list[int],
+        points: int,
+    ) -> dict[str, Any]:
+        """Mean, min and max per bucket of a metric.
+
+        Reads the coarsest tier that reaches back to start with at least one
+        record per point, or the finest one reaching back if none has enough.
+        """
+        with self._lock:
+            if self._closed:
+                raise ValueError("History store is closed")
+            return self._query(metric, start, end, slots, points)
+
+    def _query(
+        self,
+        metric: str,
+        start: float,
+        end: float,
+        slots: list[int],
+        points: int,
+    ) -> dict[str, Any]:
+        """Query while holding the lock."""
+        metric_index = METRICS.index(metric)
+        candidates = []
+        for resolution, tier in self.tiers:
+            first = tier.bisect(start)
+            if tier.count < tier.capacity or first > 0:
+                candidates.append((resolution, tier, first, tier.bisect(end)))
+        if not candidates:
+            # Longer ago than any tier reaches, the coarsest one goes furthest
+            resolution, tier = self.tiers[-1]
+            candidates.append((resolution, tier, 0, tier.bisect(end)))
+        resolution, tier, first, last = next(
+            (
+                candidate
+                for candidate in reversed(candidates)
+                if candidate[3] - candidate[2] >= points
+            ),
+            candidates[0],
+        )
+
+        width = (end - start) / points
+        result: dict[str, Any] = {
+            "resolution": resolution,
+            "timestamps": [start + width * bucket for bucket in range(points)],
+            "slots": {},
+        }
+        for slot in slots:
+            sums = [0.0] * points
+            counts = [0] * points
+            minimums = [math.inf] * points
+            maximums = [-math.inf] * points
+            timestamps, values = tier.read(first, last, metric_index, slot)
+            for timestamp, value in zip(timestamps, values):
+                if math.isnan(value):
+                    continue
+                bucket = min(int((timestamp - start) / width), points - 1)
+                sums[bucket] += value
+                counts[bucket] += 1
+                minimums[bucket] = min(minimums[bucket], value)
+                maximums[bucket] = max(maximums[bucket], value)
+            if not any(counts):
+                continue
+            result["slots"][str(slot)] = {
+                "mean": [
+                    round(total / count, 3) if count else None
+                    for total, count in zip(sums, counts)
+                ],
+                "min": [
+                    round(value, 3) if count else None
+                    for value, count in zip(minimums, counts)
+                ],
+                "max": [
+                    round(value, 3) if count else None
+                    for value, count in zip(maximums, counts)
+                ],
+            }
+        return result
+
+    def close(self) -> None:
+        """Close all tier files."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            for _, tier in self.tiers:
+                tier.close()
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): f"{DOMAIN}/history/query",
+        vol.Required("entry_id"): str,
+        vol.Required("metric"): vol.In(METRICS),
+        vol.Required("start_time"): cv.datetime,
+        vol.Optional("end_time"): cv.datetime,
+        vol.Optional("slots"): [vol.All(int, vol.Range(min=0, max=HISTORY_SLOTS - 1))],
+        vol.Optional("points", default=DEFAULT_HISTORY_POINTS): vol.All(
+            int, vol.Range(min=1, max=MAX_HISTORY_POINTS)
+        ),
+    }
+)
+@websocket_api.async_response
+async def websocket_query_history(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict
+) -> None:
+    """Return a metric of a rig aggregated into points buckets."""
+    mining_rig = hass.data.get(DOMAIN, {}).get(msg["entry_id"])
+    if mining_rig is None or mining_rig.history is None:
+        connection.send_error(
+            msg["id"], websocket_api.ERR_NOT_FOUND, "No history for this rig"
+        )
+        return
+    start = dt_util.as_utc(msg["start_time"]).timestamp()
+    end = dt_util.as_utc(msg.get("end_time") or dt_util.utcnow()).timestamp()
+    if end <= start:
+        connection.send_error(
+            msg["id"], websocket_api.ERR_INVALID_FORMAT, "end_time before start_time"
+        )
+        return
+    slots = msg.get("slots", range(HISTORY_SLOTS))
+    try:
+        result = await hass.async_add_executor_job(
+            mining_rig.history.query,
+            msg["metric"],
+            start,
+            end,
+            sorted(set(slots)),
+            msg["points"],
+        )
+    except ValueError:
+        # Closed by an unload or an option change while queued
+        connection.send_error(
+            msg["id"], websocket_api.ERR_NOT_FOUND, "No history for this rig"
+        )
+        return
+    connection.send_result(msg["id"], result)
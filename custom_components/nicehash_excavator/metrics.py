@@ -0,0 +1,184 @@
+"""OpenMetrics exporter for the rig snapshots."""
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+
+from aiohttp import web
+
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .data_containers import is_number
+from .mining_rig import MiningRig
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+PREFIX = DOMAIN
+
+# name, help, value accessor on a GraphicsCard
+DEVICE_METRICS: tuple[tuple[str, str, Callable], ...] = (
+    ("gpu_temperature_celsius", "GPU temperature", lambda d: d.gpu_temp),
+    ("gpu_vram_temperature_celsius", "VRAM temperature", lambda d: d.vram_temp),
+    (
+        "gpu_hotspot_temperature_celsius",
+        "Hotspot temperature",
+        lambda d: d.hotspot_temp,
+    ),
+    ("gpu_fan_speed_percent", "Fan speed", lambda d: d.gpu_fan_speed),
+    ("gpu_power_watts", "Power usage", lambda d: d.gpu_power_usage),
+    ("gpu_load_percent", "GPU load", lambda d: d.gpu_load),
+    ("gpu_too_hot", "GPU reports too hot", lambda d: d.too_hot),
+)
+
+
+def _escape(value) -> str:
+    """Escape a label value."""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _sample(name: str, labels: dict[str, str], value) -> str | None:
+    """Render one sample line, None for missing values."""
+    if isinstance(value, bool):
+        value = int(value)
+    elif not is_number(value):
+        return None
+    label_string = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+    return f"{PREFIX}_{name}{{{label_string}}} {value}"
+
+
+def _family(name: str, help_text: str, samples: Iterable[str | None]) -> list[str]:
+    """Render a gauge metric family."""
+    lines = [f"# TYPE {PREFIX}_{name} gauge", f"# HELP {PREFIX}_{name} {help_text}"]
+    lines.extend(sample for sample in samples if sample is not None)
+    return lines
+
+
+def render_metrics(mining_rigs: Iterable[MiningRig]) -> str:
+    """Render the current snapshots of all rigs in OpenMetrics text format."""
+    mining_rigs = list(mining_rigs)
+    lines = []
+
+    lines += _family(
+        "rig_up",
+        "Rig answered the last poll",
+        (_sample("rig_up", {"rig": rig.name}, rig.online) for rig in mining_rigs),
+    )
+    lines += _family(
+        "rig_poll_duration_seconds",
+        "Duration of the last poll",
+        (
+            _sample(
+                "rig_poll_duration_seconds",
+                {"rig": rig.name},
+                rig.last_update_duration,
+            )
+            for rig in mining_rigs
+        ),
+    )
+    lines += _family(
+        "rig_cpu_load_percent",
+        "CPU load",
+        (
+            _sample(
+                "rig_cpu_load_percent",
+                {"rig": rig.name},
+                getattr(rig.info, "cpu_load", None),
+            )
+            for rig in mining_rigs
+        ),
+    )
+    lines += _family(
+        "rig_ram_load_percent",
+        "RAM load",
+        (
+            _sample(
+                "rig_ram_load_percent",
+                {"rig": rig.name},
+                getattr(rig.info, "ram_load", None),
+            )
+            for rig in mining_rigs
+        ),
+    )
+
+    for name, help_text, value_fn in DEVICE_METRICS:
+        lines += _family(
+            name,
+            help_text,
+            (
+                _sample(
+                    name,
+                    {
+                        "rig": rig.name,
+                        "gpu": device.id,
+                        "uuid": device.uuid,
+                        "model": device.name,
+                    },
+                    value_fn(device),
+                )
+                for rig in mining_rigs
+                if rig.online
+                for device in rig.devices.values()
+            ),
+        )
+
+    lines += _family(
+        "worker_hashrate_hashes_per_second",
+        "Hashrate per GPU and algorithm",
+        (
+            _sample(
+                "worker_hashrate_hashes_per_second",
+                {
+                    "rig": rig.name,
+                    "gpu": worker.device_id,
+                    "uuid": worker.device_uuid,
+                    "algorithm": algorithm.name,
+                },
+                algorithm.speed,
+            )
+            for rig in mining_rigs
+            if rig.online
+            for worker in rig.workers.values()
+            for algorithm in worker.algorithms.values()
+        ),
+    )
+    lines += _family(
+        "algorithm_hashrate_hashes_per_second",
+        "Hashrate per algorithm",
+        (
+            _sample(
+                "algorithm_hashrate_hashes_per_second",
+                {"rig": rig.name, "algorithm": algorithm.name},
+                algorithm.speed,
+            )
+            for rig in mining_rigs
+            if rig.online
+            for algorithm in rig.algorithms.values()
+        ),
+    )
+
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+class ExcavatorMetricsView(HomeAssistantView):
+    """Serve the rig snapshots for Prometheus without the state machine."""
+
+    url = f"/api/{DOMAIN}/metrics"
+    name = f"api:{DOMAIN}:metrics"
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Init ExcavatorMetricsView."""
+        self._hass = hass
+
+    async def get(self, request: web.Request) -> web.Response:
+        """Render the metrics of all rigs with the export enabled."""
+        mining_rigs = (
+            rig
+            for rig in self._hass.data.get(DOMAIN, {}).values()
+            if rig.export_metrics
+        )
+        return web.Response(
+            body=render_metrics(mining_rigs).encode(),
+            headers={"Content-Type": CONTENT_TYPE},
+        )
@@ -2,38 +2,87 @@
 from __future__ import annotations
 
 import datetime
+import logging
+from time import monotonic, perf_counter, time
+from typing import Any
 
 import homeassistant
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import Callable, HomeAssistant
+from homeassistant.core import Callable, HomeAssistant, callback
+from homeassistant.helpers import device_registry
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.util import dt as dt_util
 
+from .anomaly import AnomalyDetector
+from .commands import CommandQueue
 from .const import (
+    CONFIG_AUTO_FAST_UPDATE,
+    CONFIG_COMPACT_MODE,
+    CONFIG_ENABLE_CONTROLS,
     CONFIG_ENABLE_DEBUG_LOGGING,
+    CONFIG_EXCLUDE_RAW_STATES,
+    CONFIG_EXPORT_METRICS,
+    CONFIG_EXTERNAL_STATISTICS,
     CONFIG_HOST_ADDRESS,
+    CONFIG_HISTORY_STORE,
     CONFIG_HOST_PORT,
     CONFIG_NAME,
     CONFIG_UPDATE_INTERVAL,
+    CONFIG_UPDATE_INTERVAL_FAST,
+    CONFIG_WATCHDOG_GRACE_PERIOD,
+    DEFAULT_FAST_UPDATE_DURATION,
+    DOMAIN,
+    EVENT_RESTART_BUDGET_EXHAUSTED,
+    EVENT_WORKER_RESTARTED,
+    FAST_UPDATE_ESCALATION_COOLDOWN,
+    FAST_UPDATE_ESCALATION_DURATION,
+    FAST_UPDATE_ESCALATION_MAX_DURATION,
+    REFRESH_COOLDOWN,
 )
 from .data_containers import Algorithm, GraphicsCard, Worker
+from .events import RigSnapshot, diff_snapshots
+from .farm import Farm, RigContribution
+from .filters import RigFilter
+from .history import HistoryStore, read_values
 from .excavator import ExcavatorAPI
+from .parser import PayloadParser
+from .profiler import PhaseRecorder
+from .shares import ShareTracker
+from .statistics import StatisticsAggregator
+from .telemetry import TelemetryStream
+from .tuner import EfficiencyTuner
+from .watchdog import WorkerWatchdog
+
+_LOGGER = logging.getLogger(__name__)
 
 
 class MiningRig:
     """The Rig containing devices"""
 
-    def __init__(self, hass: HomeAssistant, config_entry: ConfigEntry) -> None:
+    def __init__(
+        self, hass: HomeAssistant, config_entry: ConfigEntry, farm: Farm | None = None
+    ) -> None:
         """Init MiningRig."""
         self._hass = hass
+        self._farm = farm
+        self.entry_id = config_entry.entry_id
         self._name = config_entry.data[CONFIG_NAME]
         self._id = config_entry.data[CONFIG_NAME].lower()
         try:
             self._enable_debug_logging = config_entry.data[CONFIG_ENABLE_DEBUG_LOGGING]
         except KeyError:
             self._enable_debug_logging = False
+        self.compact_mode = config_entry.data.get(CONFIG_COMPACT_MODE, False)
+        self.exclude_raw_states = config_entry.data.get(
+            CONFIG_EXCLUDE_RAW_STATES, False
+        )
+        self.rig_filter = RigFilter.from_config(config_entry.data)
+        self._parser = PayloadParser(self.rig_filter)
         self._api = ExcavatorAPI(
             config_entry.data[CONFIG_HOST_ADDRESS],
             config_entry.data[CONFIG_HOST_PORT],
             self._enable_debug_logging,
+            self._parser,
         )
         self.algorithms = {}
         self.devices = {}
@@ -41,17 +90,178 @@ class MiningRig:
         self.online = True
         self.info = None
 
+        self._layout = None
+        self._device_id_by_uuid: dict[str, int] = {}
+        self._worker_ids_by_device: dict[int, list[int]] = {}
+        self._worker_ids_by_algorithm: dict[str, list[int]] = {}
+        self._worker_algorithm_ids: dict[tuple[str, str], tuple[int, int]] = {}
+
+        self.external_statistics = config_entry.data.get(
+            CONFIG_EXTERNAL_STATISTICS, False
+        )
+        self._statistics = None
+
+        self._snapshot = None
+        self._last_push = None
+        self.last_update_duration = None
+        self.shares = ShareTracker()
+        self.export_metrics = config_entry.data.get(CONFIG_EXPORT_METRICS, False)
+        self.enable_controls = config_entry.data.get(CONFIG_ENABLE_CONTROLS, False)
+        self.commands = CommandQueue(hass, self, self.async_send_command)
+        self.tuner = EfficiencyTuner(hass, self)
+        self._watchdog = None
+        grace_period = config_entry.data.get(CONFIG_WATCHDOG_GRACE_PERIOD, 0)
+        if grace_period:
+            self._watchdog = WorkerWatchdog(grace_period)
+        self.watchdog_restarts = 0
+        self._profile: PhaseRecorder | None = None
+        self.telemetry = TelemetryStream()
+        self.history_enabled = config_entry.data.get(CONFIG_HISTORY_STORE, False)
+        # Opened by async_open_history, the files are accessed in the executor
+        self.history: HistoryStore | None = None
+
         self._callbacks = set()
+        # Called after the first poll parsed with a changed filter
+        self._filter_callbacks: set[Callable[[], None]] = set()
+        self._filter_changed = False
+
+        self._anomaly_detector = None
+        if config_entry.data.get(CONFIG_AUTO_FAST_UPDATE, True):
+            self._anomaly_detector = AnomalyDetector()
+        self._escalation_started = None
+        self._escalated_until = None
+        self.fast_update = False
+        self.fast_update_until: datetime.datetime | None = None
+        self.fast_update_duration = DEFAULT_FAST_UPDATE_DURATION * 60
+        self._cancel_fast_update_timer = None
 
         self._remove_update_listener = None
-        update_interval = config_entry.data.get(CONFIG_UPDATE_INTERVAL)
-        self.set_update_interval(hass, update_interval)
+        self._active_update_interval = None
+        self._refresh_debouncer = Debouncer(
+            hass,
+            _LOGGER,
+            cooldown=REFRESH_COOLDOWN,
+            immediate=True,
+            function=self._async_refresh,
+        )
+        self.update_interval = config_entry.data.get(CONFIG_UPDATE_INTERVAL)
+        self.update_interval_fast = config_entry.data.get(CONFIG_UPDATE_INTERVAL_FAST)
+        self._apply_update_interval()
+
+    def requires_reload(self, config_entry: ConfigEntry) -> bool:
+        """Return True if changed options need the config entry to be reloaded."""
+        return (
+            config_entry.data.get(CONFIG_COMPACT_MODE, False) != self.compact_mode
+            or config_entry.data.get(CONFIG_EXCLUDE_RAW_STATES, False)
+            != self.exclude_raw_states
+            or config_entry.data.get(CONFIG_ENABLE_CONTROLS, False)
+            != self.enable_controls
+            or bool(config_entry.data.get(CONFIG_WATCHDOG_GRACE_PERIOD, 0))
+            != self.watchdog_enabled
+        )
+
+    def apply_config(self, config_entry: ConfigEntry) -> None:
+        """Apply changed options to the running MiningRig.
+
+        Entities, indexes, baselines and statistics buckets are kept, only the
+        parts affected by the options are replaced. A changed filter applies
+        from the next poll, which also adds and removes the filtered entities.
+        """
+        rig_filter = RigFilter.from_config(config_entry.data)
+        if rig_filter != self.rig_filter:
+            self.rig_filter = rig_filter
+            self._parser = self._api.parser = PayloadParser(rig_filter)
+            self._filter_changed = True
+            self._hass.async_create_task(self.async_request_refresh())
+
+        host_address = ExcavatorAPI.format_host_address(
+            config_entry.data[CONFIG_HOST_ADDRESS]
+        )
+        host_port = config_entry.data[CONFIG_HOST_PORT]
+        if (host_address, host_port) != (self._api.host_address, self._api.host_port):
+            _LOGGER.info("%s: connecting to %s:%s", self._name, host_address, host_port)
+            self._api = ExcavatorAPI(
+                host_address, host_port, self._enable_debug_logging, self._parser
+            )
+            self._api.profile = self._profile
+            self._hass.async_create_task(self.update())
+
+        self.external_statistics = config_entry.data.get(
+            CONFIG_EXTERNAL_STATISTICS, False
+        )
+        if not self.external_statistics and self._statistics is not None:
+            # Kept, so enabling them again needs no second load of the Store
+            self._statistics.async_flush()
+        elif self.external_statistics and self._statistics is None:
+            self._hass.async_create_task(self.async_open_statistics())
+
+        self.history_enabled = config_entry.data.get(CONFIG_HISTORY_STORE, False)
+        if self.history_enabled and self.history is None:
+            self._hass.async_create_task(self.async_open_history())
+        elif not self.history_enabled and self.history is not None:
+            self._hass.async_create_task(self.async_close_history())
+
+        self.export_metrics = config_entry.data.get(CONFIG_EXPORT_METRICS, False)
+        if self._watchdog is not None:
+            self._watchdog.grace_period = config_entry.data[
+                CONFIG_WATCHDOG_GRACE_PERIOD
+            ]
+        self.set_auto_fast_update(config_entry.data.get(CONFIG_AUTO_FAST_UPDATE, True))
+        self.set_update_intervals(
+            config_entry.data.get(CONFIG_UPDATE_INTERVAL),
+            config_entry.data.get(CONFIG_UPDATE_INTERVAL_FAST),
+        )
+
+    @property
+    def name(self) -> str:
+        """Name of the MiningRig."""
+        return self._name
+
+    @property
+    def watchdog_enabled(self) -> bool:
+        """Return True if stalled workers are restarted."""
+        return self._watchdog is not None
 
     @property
     def mining_rig_id(self) -> str:
         """ID for MiningRig."""
         return self._id
 
+    def set_profiler(self, profile: PhaseRecorder | None) -> None:
+        """Report the durations of the poll phases to a Profiler, None to stop."""
+        self._profile = profile
+        self._api.profile = profile
+
+    async def async_open_history(self) -> None:
+        """Open the history store of the rig."""
+        history = await self._hass.async_add_executor_job(
+            HistoryStore, self._hass.config.path(DOMAIN), self.entry_id
+        )
+        if not self.history_enabled or self.history is not None:
+            # Disabled or opened again while the files were opened
+            await self._hass.async_add_executor_job(history.close)
+            return
+        self.history = history
+
+    async def async_close_history(self) -> None:
+        """Close the history store of the rig, the files are kept."""
+        history, self.history = self.history, None
+        if history is not None:
+            await self._hass.async_add_executor_job(history.close)
+
+    async def async_open_statistics(self) -> None:
+        """Start the statistics of the rig, continuing the stored hour."""
+        statistics = StatisticsAggregator(self._hass, self._name, self.entry_id)
+        await statistics.async_load()
+        if self._statistics is None:
+            self._statistics = statistics
+
+    async def async_close_statistics(self) -> None:
+        """Import the hour so far and store it to be continued."""
+        statistics, self._statistics = self._statistics, None
+        if statistics is not None:
+            await statistics.async_shutdown()
+
     async def test_connection(self) -> bool:
         """Test connectivity to the MiningRig."""
         self.online = await self._api.test_connection()
@@ -65,33 +275,337 @@ class MiningRig:
         """Remove previously registered callback."""
         self._callbacks.discard(callback)
 
+    def register_filter_callback(self, callback: Callable[[], None]) -> None:
+        """Register callback, called when a changed filter is applied."""
+        self._filter_callbacks.add(callback)
+
+    def remove_filter_callback(self, callback: Callable[[], None]) -> None:
+        """Remove previously registered filter callback."""
+        self._filter_callbacks.discard(callback)
+
     async def update(self, event=None) -> None:
-        """Update MiningRig via Excavator API."""
+        """Update MiningRig via Excavator API.
+
+        Skipped while snapshots are pushed, polling is only the fallback then.
+        """
+        if (
+            self._last_push is not None
+            and monotonic() - self._last_push < self._active_update_interval
+        ):
+            return
+        await self._async_poll()
+
+    async def _async_poll(self) -> None:
+        """Read a snapshot from the Excavator API."""
+        started = monotonic()
+        self.info = await self._api.get_rig_info()
         self.algorithms = await self._api.get_algorithms()
         self.devices = await self._api.get_devices()
         self.workers = await self._api.get_workers()
-        self.info = await self._api.get_rig_info()
+        self.last_update_duration = monotonic() - started
+        await self._process_update()
+        if self._profile is not None:
+            self._profile("update", monotonic() - started)
+
+    async def async_request_refresh(self) -> None:
+        """Poll as soon as possible.
+
+        The first request polls immediately, further requests within
+        REFRESH_COOLDOWN collapse into a single poll after it.
+        """
+        await self._refresh_debouncer.async_call()
+
+    async def _async_refresh(self) -> None:
+        """Poll now and restart the periodic timer from this poll."""
+        await self._async_poll()
+        self._apply_update_interval(restart=True)
+
+    async def async_send_command(
+        self, method: str, params: list[str]
+    ) -> dict[str, Any] | None:
+        """Send a command to Excavator, use the CommandQueue for device commands."""
+        return await self._api.send_command(method, params)
+
+    async def async_push(self, payload: dict[str, Any]) -> None:
+        """Update MiningRig from a snapshot pushed by the sidecar.
+
+        The payload maps the Excavator methods info, devices.get,
+        algorithm.list and worker.list to their unmodified responses.
+        """
+        self._last_push = monotonic()
+        started = perf_counter()
+        info = payload.get("info")
+        parser = self._parser
+        self.info = parser.parse_info(info) if isinstance(info, dict) else None
+        self.algorithms = parser.parse_algorithms(payload.get("algorithm.list") or {})
+        self.devices = parser.parse_devices(payload.get("devices.get") or {})
+        self.workers = parser.parse_workers(payload.get("worker.list") or {})
+        if self._profile is not None:
+            self._profile("parse", perf_counter() - started)
+        await self._process_update()
+
+    async def _process_update(self) -> None:
+        """Derive state from freshly received data and notify listeners."""
+        started = perf_counter()
         if self.info is None:
             self.online = False
         else:
             self.online = True
+        self._update_indexes()
+        self.commands.confirm()
+        self.tuner.add_snapshot(monotonic())
+        self.shares.update(self.algorithms.values(), monotonic())
+        if self.external_statistics and self._statistics is not None:
+            self._statistics.add_snapshot(self)
+        if self._anomaly_detector is not None:
+            self._check_anomalies()
+        if self._watchdog is not None and self.online:
+            self._check_watchdog()
+        self._fire_transition_events()
+        if self.telemetry.subscriptions:
+            self.telemetry.update(self)
+        if self.history is not None and self.online:
+            self._hass.async_add_executor_job(
+                self.history.append, time(), read_values(self)
+            )
+        if self._farm is not None:
+            self._farm.update_rig(self.entry_id, RigContribution.from_mining_rig(self))
+        if self._filter_changed and self.online:
+            # Offline polls have no devices to create the entities from
+            self._filter_changed = False
+            for filter_callback in list(self._filter_callbacks):
+                filter_callback()
+        if self._profile is not None:
+            self._profile("process", perf_counter() - started)
+            started = perf_counter()
         await self.publish_updates()
+        if self._profile is not None:
+            self._profile("publish", perf_counter() - started)
+
+    def _fire_transition_events(self) -> None:
+        """Fire events for the changes since the previous poll."""
+        snapshot = RigSnapshot.from_mining_rig(self, self._snapshot)
+        previous, self._snapshot = self._snapshot, snapshot
+        if previous is None:
+            return
+        events = diff_snapshots(previous, snapshot)
+        if events:
+            self._fire_events(events)
+
+    def _fire_events(self, events: list[tuple[str, dict[str, Any]]]) -> None:
+        """Fire events with the rig name and the device registry ids added."""
+        registry = device_registry.async_get(self._hass)
+        rig_device = registry.async_get_device({(DOMAIN, f"{self._name} Excavator")})
+        for event_type, data in events:
+            data["name"] = self._name
+            data["rig_device_id"] = rig_device.id if rig_device else None
+            if "uuid" in data:
+                device = registry.async_get_device({(DOMAIN, data["uuid"])})
+                data["device_id"] = device.id if device else None
+            self._hass.bus.async_fire(event_type, data)
+
+    def _check_watchdog(self) -> None:
+        """Restart stalled workers and report it."""
+        budget_exhausted = self._watchdog.budget_exhausted
+        restarts = self._watchdog.check(self, monotonic())
+        events = []
+        for restart in restarts:
+            _LOGGER.warning(
+                "%s: restarting GPU %s %s, %s (attempt %s)",
+                self._name,
+                restart.device_id,
+                restart.algorithm,
+                restart.reason,
+                restart.attempt,
+            )
+            self.commands.restart_workers(restart.device_uuid)
+            self.watchdog_restarts += 1
+            events.append(
+                (
+                    EVENT_WORKER_RESTARTED,
+                    {
+                        "uuid": restart.device_uuid,
+                        "gpu": restart.device_id,
+                        "algorithm": restart.algorithm,
+                        "reason": restart.reason,
+                        "attempt": restart.attempt,
+                    },
+                )
+            )
+        if self._watchdog.budget_exhausted and not budget_exhausted:
+            _LOGGER.warning("%s: worker restart budget exhausted", self._name)
+            events.append((EVENT_RESTART_BUDGET_EXHAUSTED, {}))
+        if events:
+            self._fire_events(events)
+
+    def _update_indexes(self) -> None:
+        """Rebuild the lookup indexes if the device/worker layout changed.
+
+        Every poll creates new container objects, so the indexes map to ids and
+        are only rebuilt when devices, workers or their algorithms change, e.g.
+        after Excavator restarted and handed out new worker ids.
+        """
+        layout = (
+            tuple((device.id, device.uuid) for device in self.devices.values()),
+            tuple(
+                (
+                    worker.id,
+                    worker.device_id,
+                    tuple(worker.algorithms),
+                )
+                for worker in self.workers.values()
+            ),
+        )
+        if layout == self._layout:
+            return
+        self._layout = layout
+
+        self._device_id_by_uuid = {
+            device.uuid: device.id for device in self.devices.values()
+        }
+        self._worker_ids_by_device = {}
+        self._worker_ids_by_algorithm = {}
+        self._worker_algorithm_ids = {}
+        for worker in self.workers.values():
+            self._worker_ids_by_device.setdefault(worker.device_id, []).append(
+                worker.id
+            )
+            for algorithm in worker.algorithms.values():
+                self._worker_ids_by_algorithm.setdefault(algorithm.name, []).append(
+                    worker.id
+                )
+                self._worker_algorithm_ids[(worker.device_uuid, algorithm.name)] = (
+                    worker.id,
+                    algorithm.id,
+                )
 
     async def publish_updates(self) -> None:
         """Schedule call all registered callbacks."""
-        for callback in self._callbacks:
-            callback()
+        for update_callback in self._callbacks:
+            update_callback()
+
+    def async_shutdown(self) -> None:
+        """Stop polling, write pending statistics and leave the farm."""
+        if self._remove_update_listener:
+            self._remove_update_listener()
+            self._remove_update_listener = None
+        if self._cancel_fast_update_timer:
+            self._cancel_fast_update_timer()
+            self._cancel_fast_update_timer = None
+        self._refresh_debouncer.async_cancel()
+        self.commands.async_cancel()
+        for subscription in self.telemetry.subscriptions:
+            subscription.cancel()
+        if self._farm is not None:
+            self._farm.remove_rig(self.entry_id)
+
+    @property
+    def escalated(self) -> bool:
+        """Return True while polling fast because of an anomaly."""
+        return self._escalated_until is not None
+
+    def set_update_intervals(
+        self, update_interval: int, update_interval_fast: int
+    ) -> None:
+        """Set new normal and fast update intervals."""
+        self.update_interval = update_interval
+        self.update_interval_fast = update_interval_fast
+        self._apply_update_interval()
+
+    def set_fast_update(self, fast_update: bool, duration: float | None = None) -> None:
+        """Switch between the normal and the fast update interval.
+
+        The fast interval always reverts after duration seconds, by default
+        after fast_update_duration.
+        """
+        if self._cancel_fast_update_timer:
+            self._cancel_fast_update_timer()
+            self._cancel_fast_update_timer = None
+        self.fast_update = fast_update
+        self.fast_update_until = None
+        if fast_update:
+            if duration is None:
+                duration = self.fast_update_duration
+            self.fast_update_until = dt_util.utcnow() + datetime.timedelta(
+                seconds=duration
+            )
+            self._cancel_fast_update_timer = (
+                homeassistant.helpers.event.async_call_later(
+                    self._hass, duration, self._async_fast_update_expired
+                )
+            )
+        self._apply_update_interval()
+
+    @callback
+    def _async_fast_update_expired(self, now: datetime.datetime) -> None:
+        """Revert to the normal update interval."""
+        self._cancel_fast_update_timer = None
+        self.set_fast_update(False)
+        for update_callback in self._callbacks:
+            update_callback()
+
+    def set_auto_fast_update(self, auto_fast_update: bool) -> None:
+        """Enable or disable the fast update on anomalies."""
+        if not auto_fast_update:
+            self._anomaly_detector = None
+            self._escalated_until = None
+            self._apply_update_interval()
+        elif self._anomaly_detector is None:
+            self._anomaly_detector = AnomalyDetector()
 
-    def set_update_interval(self, hass: HomeAssistant, update_interval: int) -> None:
-        """Set new update interval."""
+    def _apply_update_interval(self, restart: bool = False) -> None:
+        """Track the update interval currently in effect.
+
+        The timer is only re-armed if the interval changed or restart is set.
+        """
+        if self.fast_update or self.escalated:
+            update_interval = self.update_interval_fast
+        else:
+            update_interval = self.update_interval
+        if (
+            update_interval == self._active_update_interval
+            and self._remove_update_listener
+            and not restart
+        ):
+            return
         if self._remove_update_listener:
             self._remove_update_listener()
+        self._active_update_interval = update_interval
         self._remove_update_listener = (
             homeassistant.helpers.event.async_track_time_interval(
-                hass, self.update, datetime.timedelta(seconds=update_interval)
+                self._hass, self.update, datetime.timedelta(seconds=update_interval)
             )
         )
 
+    def _check_anomalies(self) -> None:
+        """Escalate to the fast interval for a bounded time on anomalies."""
+        now = monotonic()
+        anomalies = self._anomaly_detector.check(self, now)
+
+        if self._escalated_until is not None and now >= self._escalated_until:
+            _LOGGER.info("%s: anomaly fast update ended", self._name)
+            self._escalated_until = None
+            self._apply_update_interval()
+
+        if not anomalies:
+            return
+        if self._escalated_until is None:
+            if (
+                self._escalation_started is not None
+                and now - self._escalation_started
+                < FAST_UPDATE_ESCALATION_MAX_DURATION + FAST_UPDATE_ESCALATION_COOLDOWN
+            ):
+                return
+            _LOGGER.info(
+                "%s: fast update because of %s", self._name, ", ".join(anomalies)
+            )
+            self._escalation_started = now
+        self._escalated_until = min(
+            now + FAST_UPDATE_ESCALATION_DURATION,
+            self._escalation_started + FAST_UPDATE_ESCALATION_MAX_DURATION,
+        )
+        self._apply_update_interval()
+
     def get_algorithm(self, algorithm_id) -> Algorithm | None:
         """Get algorithm by id."""
         if algorithm_id in self.algorithms:
@@ -109,3 +623,35 @@ class MiningRig:
         if worker_id in self.workers:
             return self.workers[worker_id]
         return None
+
+    def get_device_by_uuid(self, device_uuid: str) -> GraphicsCard | None:
+        """Get device by uuid."""
+        return self.get_device(self._device_id_by_uuid.get(device_uuid))
+
+    def get_workers_for_device(self, device_id) -> list[Worker]:
+        """Get all workers running on a device."""
+        return [
+            self.workers[worker_id]
+            for worker_id in self._worker_ids_by_device.get(device_id, ())
+            if worker_id in self.workers
+        ]
+
+    def get_workers_for_algorithm(self, algorithm_name: str) -> list[Worker]:
+        """Get all workers mining an algorithm."""
+        return [
+            self.workers[worker_id]
+            for worker_id in self._worker_ids_by_algorithm.get(algorithm_name, ())
+            if worker_id in self.workers
+        ]
+
+    def get_worker_algorithm(
+        self, device_uuid: str, algorithm_name: str
+    ) -> Algorithm | None:
+        """Get the algorithm a device is mining, independent of the worker id."""
+        ids = self._worker_algorithm_ids.get((device_uuid, algorithm_name))
+        if ids is None:
+            return None
+        worker = self.get_worker(ids[0])
+        if worker is None:
+            return None
+        return worker.algorithms.get(ids[1])
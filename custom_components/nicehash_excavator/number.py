@@ -0,0 +1,250 @@
+"""Number integration."""
+from __future__ import annotations
+
+from functools import partial
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components.number import NumberEntity, NumberMode
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import PERCENTAGE, POWER_WATT, TIME_MINUTES
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import entity_platform
+from homeassistant.helpers.entity import EntityCategory
+from homeassistant.helpers.restore_state import RestoreEntity
+
+from .commands import FAN_SPEED, POWER_LIMIT
+from .const import (
+    ATTR_MAX_TEMP,
+    CONFIG_NAME,
+    DEFAULT_TUNER_MAX_TEMP,
+    DOMAIN,
+    MAX_FAST_UPDATE_DURATION,
+    MAX_POWER_LIMIT,
+    MIN_POWER_LIMIT,
+    SERVICE_STOP_POWER_TUNING,
+    SERVICE_TUNE_POWER_LIMIT,
+)
+from .entities import async_add_filtered_entities
+from .mining_rig import MiningRig
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, config_entry: ConfigEntry, async_add_entities
+) -> None:
+    """Set up the number."""
+
+    mining_rig: MiningRig = hass.data[DOMAIN][config_entry.entry_id]
+
+    async_add_entities([FastUpdateDurationNumber(mining_rig, config_entry)])
+    if mining_rig.enable_controls:
+        async_add_filtered_entities(
+            hass,
+            mining_rig,
+            config_entry,
+            async_add_entities,
+            partial(_gpu_numbers, mining_rig, config_entry),
+        )
+
+    platform = entity_platform.async_get_current_platform()
+    platform.async_register_entity_service(
+        SERVICE_TUNE_POWER_LIMIT,
+        {
+            vol.Optional(ATTR_MAX_TEMP, default=DEFAULT_TUNER_MAX_TEMP): vol.All(
+                vol.Coerce(float), vol.Range(min=30, max=100)
+            )
+        },
+        "async_tune",
+    )
+    platform.async_register_entity_service(
+        SERVICE_STOP_POWER_TUNING, {}, "async_stop_tuning"
+    )
+
+
+def _gpu_numbers(
+    mining_rig: MiningRig, config_entry: ConfigEntry
+) -> list[GpuControlNumber]:
+    """Create the numbers of the GPUs kept by the rig filter."""
+    numbers = []
+    for device in mining_rig.devices.values():
+        numbers.append(GpuFanSpeedNumber(mining_rig, config_entry, device.uuid))
+        numbers.append(GpuPowerLimitNumber(mining_rig, config_entry, device.uuid))
+    return numbers
+
+
+class FastUpdateDurationNumber(NumberEntity, RestoreEntity):
+    """Default duration of fast update mode when the switch is turned on."""
+
+    _attr_should_poll = False
+    _attr_entity_category = EntityCategory.CONFIG
+    _attr_icon = "mdi:timer-outline"
+    _attr_mode = NumberMode.BOX
+    _attr_native_min_value = 1
+    _attr_native_max_value = MAX_FAST_UPDATE_DURATION
+    _attr_native_step = 1
+    _attr_native_unit_of_measurement = TIME_MINUTES
+
+    def __init__(self, mining_rig: MiningRig, config_entry: ConfigEntry) -> None:
+        """Initialize the number."""
+        self._mining_rig = mining_rig
+        self._rig_name = config_entry.data.get(CONFIG_NAME)
+        self._attr_name = f"{self._rig_name} fast update duration"
+        self._attr_unique_id = f"{self._rig_name}_fast_update_duration"
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, f"{self._rig_name} Excavator")},
+        }
+
+    @property
+    def native_value(self) -> float:
+        """Duration in minutes."""
+        return self._mining_rig.fast_update_duration / 60
+
+    async def async_added_to_hass(self) -> None:
+        """Restore the duration set before a restart."""
+        await super().async_added_to_hass()
+        last_state = await self.async_get_last_state()
+        if last_state is None:
+            return
+        try:
+            minutes = float(last_state.state)
+        except ValueError:
+            return
+        if self.native_min_value <= minutes <= self.native_max_value:
+            self._mining_rig.fast_update_duration = minutes * 60
+
+    async def async_set_native_value(self, value: float) -> None:
+        """Set the duration used the next time fast update mode is turned on."""
+        self._mining_rig.fast_update_duration = value * 60
+        self.async_write_ha_state()
+
+
+class GpuControlNumber(NumberEntity):
+    """Base of the GPU settings sent through the CommandQueue."""
+
+    _attr_should_poll = False
+    _attr_mode = NumberMode.SLIDER
+    _setting: str
+
+    def __init__(
+        self, mining_rig: MiningRig, config_entry: ConfigEntry, device_uuid: str
+    ) -> None:
+        """Initialize the number."""
+        self._mining_rig = mining_rig
+        self._device_uuid = device_uuid
+        rig_name = config_entry.data.get(CONFIG_NAME)
+        device = mining_rig.get_device_by_uuid(device_uuid)
+        self.filter_subject = {"device_id": device.id, "device_uuid": device_uuid}
+        self._attr_name = (
+            f"{rig_name} GPU {device.id} {self._setting.replace('_', ' ')}"
+        )
+        self._attr_unique_id = f"{rig_name}_{device_uuid}_{self._setting}"
+        self._attr_device_info = {"identifiers": {(DOMAIN, device_uuid)}}
+
+    @property
+    def available(self) -> bool:
+        """Return True if the GPU is reported by the rig."""
+        return (
+            self._mining_rig.online
+            and self._mining_rig.get_device_by_uuid(self._device_uuid) is not None
+        )
+
+    async def async_added_to_hass(self) -> None:
+        """Run when this Entity has been added to HA."""
+        self._mining_rig.register_callback(self.async_write_ha_state)
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Entity being removed from hass."""
+        self._mining_rig.remove_callback(self.async_write_ha_state)
+
+
+class GpuFanSpeedNumber(GpuControlNumber):
+    """Fan speed of a GPU."""
+
+    _setting = FAN_SPEED
+    _attr_icon = "mdi:fan"
+    _attr_native_min_value = 0
+    _attr_native_max_value = 100
+    _attr_native_step = 1
+    _attr_native_unit_of_measurement = PERCENTAGE
+
+    @property
+    def native_value(self) -> float | None:
+        """Requested fan speed until confirmed, then the reported one."""
+        desired = self._mining_rig.commands.desired(FAN_SPEED, self._device_uuid)
+        if desired is not None:
+            return desired
+        device = self._mining_rig.get_device_by_uuid(self._device_uuid)
+        return None if device is None else device.gpu_fan_speed
+
+    async def async_set_native_value(self, value: float) -> None:
+        """Queue the fan speed."""
+        self._mining_rig.commands.set_fan_speed(self._device_uuid, int(value))
+        self.async_write_ha_state()
+
+
+class GpuPowerLimitNumber(GpuControlNumber, RestoreEntity):
+    """Power limit of a GPU, Excavator does not report the current one."""
+
+    _setting = POWER_LIMIT
+    _attr_icon = "mdi:flash"
+    _attr_assumed_state = True
+    _attr_native_min_value = MIN_POWER_LIMIT
+    _attr_native_max_value = MAX_POWER_LIMIT
+    _attr_native_step = 1
+    _attr_native_unit_of_measurement = POWER_WATT
+
+    @property
+    def native_value(self) -> float | None:
+        """Requested power limit, or the last one Excavator accepted."""
+        desired = self._mining_rig.commands.desired(POWER_LIMIT, self._device_uuid)
+        if desired is not None:
+            return desired
+        return self._mining_rig.commands.power_limits.get(self._device_uuid)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Tuning state and the tuned limit of the current algorithm."""
+        tuner = self._mining_rig.tuner
+        attributes = {"tuning": tuner.is_tuning(self._device_uuid)}
+        algorithm_name = tuner.get_algorithm(self._device_uuid)
+        if algorithm_name is not None:
+            result = tuner.get_result(self._device_uuid, algorithm_name)
+            if result is not None:
+                attributes["tuned_algorithm"] = algorithm_name
+                attributes["tuned_power_limit"] = result.power_limit
+                # H/J to MH/J
+                attributes["tuned_efficiency"] = round(result.efficiency / 1e6, 4)
+        return attributes
+
+    async def async_added_to_hass(self) -> None:
+        """Restore the last accepted power limit."""
+        await super().async_added_to_hass()
+        last_state = await self.async_get_last_state()
+        if last_state is None:
+            return
+        try:
+            watts = float(last_state.state)
+        except ValueError:
+            return
+        self._mining_rig.commands.power_limits.setdefault(self._device_uuid, watts)
+
+    async def async_set_native_value(self, value: float) -> None:
+        """Queue the power limit."""
+        self._mining_rig.commands.set_power_limit(self._device_uuid, int(value))
+        self.async_write_ha_state()
+
+    async def async_tune(self, max_temp: float) -> None:
+        """Search for the most efficient power limit of the current algorithm."""
+        if not self._mining_rig.tuner.start(self._device_uuid, max_temp):
+            raise HomeAssistantError(
+                f"{self.name}: tuning needs a GPU mining a single algorithm"
+                " and a known power limit or power usage"
+            )
+        self.async_write_ha_state()
+
+    async def async_stop_tuning(self) -> None:
+        """Abort tuning and go back to the power limit it started from."""
+        self._mining_rig.tuner.stop(self._device_uuid)
+        self.async_write_ha_state()
@@ -0,0 +1,176 @@
+"""Parser turning Excavator responses into typed records."""
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from .data_containers import Algorithm, GraphicsCard, RigInfo, Worker
+from .filters import NO_FILTER, RigFilter
+
+_LOGGER = logging.getLogger(__name__)
+
+
+# Accepted value types, anything else becomes None.
+# Exact types so that bool is not accepted as int.
+INT = frozenset({int})
+NUMBER = frozenset({int, float})
+STR = frozenset({str})
+BOOL = frozenset({bool})
+
+
+# attribute, response keys in order of preference, accepted types
+FieldSpec = tuple[str, tuple[str, ...], frozenset[type]]
+
+# Fields prefixed with __ are experimental in Excavator and may lose the
+# prefix in later versions, so both spellings are accepted
+DEVICE_FIELDS: tuple[FieldSpec, ...] = (
+    ("id", ("device_id",), INT),
+    ("name", ("name",), STR),
+    ("subvendor", ("subvendor",), STR),
+    ("uuid", ("uuid",), STR),
+    ("gpu_temp", ("gpu_temp",), NUMBER),
+    ("gpu_load", ("gpu_load",), NUMBER),
+    ("gpu_load_memctrl", ("gpu_load_memctrl",), NUMBER),
+    ("gpu_power_usage", ("gpu_power_usage",), NUMBER),
+    ("gpu_fan_speed", ("gpu_fan_speed",), NUMBER),
+    ("too_hot", ("too_hot",), BOOL),
+    ("vram_temp", ("__vram_temp", "vram_temp"), NUMBER),
+    ("hotspot_temp", ("__hotspot_temp", "hotspot_temp"), NUMBER),
+)
+ALGORITHM_FIELDS: tuple[FieldSpec, ...] = (
+    ("id", ("algorithm_id", "id"), INT),
+    ("name", ("name",), STR),
+    ("speed", ("speed",), NUMBER),
+    ("accepted_shares", ("accepted_shares",), INT),
+    ("rejected_shares", ("rejected_shares",), INT),
+)
+WORKER_FIELDS: tuple[FieldSpec, ...] = (
+    ("id", ("worker_id",), INT),
+    ("device_id", ("device_id",), INT),
+    ("device_uuid", ("device_uuid",), STR),
+)
+INFO_FIELDS: tuple[FieldSpec, ...] = (
+    ("version", ("version",), STR),
+    ("build_platform", ("build_platform",), STR),
+    ("build_number", ("build_number",), INT),
+    ("excavator_cuda_ver", ("excavator_cuda_ver",), INT),
+    ("driver_cuda_ver", ("driver_cuda_ver",), INT),
+    ("uptime", ("uptime",), NUMBER),
+    ("cpu_load", ("cpu_load",), NUMBER),
+    ("ram_load", ("ram_load",), NUMBER),
+)
+
+
+class RecordParser:
+    """Extracts one record type from response dicts.
+
+    Every record tries the keys of a field in order of preference, so a
+    response mixing the spellings of a field is still parsed completely.
+    """
+
+    def __init__(self, record_type: type, fields: tuple[FieldSpec, ...]) -> None:
+        """Init RecordParser."""
+        self._record_type = record_type
+        self._fields = fields
+
+    def parse(self, data: dict[str, Any]) -> Any:
+        """Build a record, with None for missing or invalid values."""
+        values = {}
+        for attribute, keys, accepted in self._fields:
+            for key in keys:
+                if key in data:
+                    value = data[key]
+                    if type(value) in accepted:
+                        values[attribute] = value
+                    break
+        return self._record_type(**values)
+
+
+class PayloadParser:
+    """Parses the responses of a rig.
+
+    Excluded GPUs and algorithms are dropped before their records are parsed,
+    excluded device metrics are not extracted and stay None.
+    """
+
+    def __init__(self, rig_filter: RigFilter = NO_FILTER) -> None:
+        """Init PayloadParser."""
+        self._filter = rig_filter
+        excluded_fields = rig_filter.device_fields
+        self._devices = RecordParser(
+            GraphicsCard,
+            tuple(spec for spec in DEVICE_FIELDS if spec[0] not in excluded_fields),
+        )
+        self._algorithms = RecordParser(Algorithm, ALGORITHM_FIELDS)
+        self._workers = RecordParser(Worker, WORKER_FIELDS)
+        self._info = RecordParser(RigInfo, INFO_FIELDS)
+
+    def parse_info(self, response: dict[str, Any]) -> RigInfo:
+        """Parse an info response."""
+        return self._info.parse(response)
+
+    def parse_devices(self, response: dict[str, Any]) -> dict[int, GraphicsCard]:
+        """Parse a devices.get response, skipping devices without an id"""
+        devices = {}
+        rig_filter = self._filter
+        for device_data in _records(response, "devices"):
+            if rig_filter.gpus and rig_filter.excludes_gpu(
+                device_data.get("device_id"), device_data.get("uuid")
+            ):
+                continue
+            card = self._devices.parse(device_data)
+            if card.id is None:
+                _LOGGER.debug("Skipping device without id: %s", device_data)
+                continue
+            devices[card.id] = card
+        return devices
+
+    def parse_algorithms(self, response: dict[str, Any]) -> dict[int, Algorithm]:
+        """Parse an algorithm.list response, skipping algorithms without an id"""
+        algorithms = {}
+        excluded = self._filter.algorithms
+        for algorithm_data in _records(response, "algorithms"):
+            if excluded and algorithm_data.get("name") in excluded:
+                continue
+            algorithm = self._algorithms.parse(algorithm_data)
+            if algorithm.id is None:
+                _LOGGER.debug("Skipping algorithm without id: %s", algorithm_data)
+                continue
+            algorithms[algorithm.id] = algorithm
+        return algorithms
+
+    def parse_workers(self, response: dict[str, Any]) -> dict[int, Worker]:
+        """Parse a worker.list response, skipping workers without an id"""
+        workers = {}
+        rig_filter = self._filter
+        for worker_data in _records(response, "workers"):
+            if rig_filter.gpus and rig_filter.excludes_gpu(
+                worker_data.get("device_id"), worker_data.get("device_uuid")
+            ):
+                continue
+            worker = self._workers.parse(worker_data)
+            if worker.id is None:
+                _LOGGER.debug("Skipping worker without id: %s", worker_data)
+                continue
+            for algorithm_data in _records(worker_data, "algorithms"):
+                if (
+                    rig_filter.algorithms
+                    and algorithm_data.get("name") in rig_filter.algorithms
+                ):
+                    continue
+                # Same fields as algorithm.list, the id is under "id" here
+                algorithm = self._algorithms.parse(algorithm_data)
+                if algorithm.id is not None:
+                    worker.algorithms[algorithm.id] = algorithm
+            workers[worker.id] = worker
+        return workers
+
+
+def _records(response: dict[str, Any], key: str) -> list[dict[str, Any]]:
+    """Return the list of record dicts under key, ignoring malformed entries."""
+    if not isinstance(response, dict):
+        return []
+    records = response.get(key)
+    if not isinstance(records, list):
+        return []
+    return [record for record in records if isinstance(record, dict)]
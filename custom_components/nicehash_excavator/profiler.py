@@ -0,0 +1,154 @@
+"""Sampling profiler for the event loop and the rig poll phases."""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from collections.abc import Callable
+import os
+import sys
+import threading
+from time import monotonic, perf_counter
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, PROFILE_LAG_INTERVAL, PROFILE_SAMPLE_INTERVAL
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+PhaseRecorder = Callable[[str, float], None]
+
+
+def _frame_name(frame) -> str:
+    """Short name of a frame for folded stacks."""
+    code = frame.f_code
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{module}:{code.co_name}"
+
+
+class Profiler:
+    """Profiles the event loop thread for a fixed duration.
+
+    A background thread samples the stack of the event loop thread every
+    PROFILE_SAMPLE_INTERVAL seconds into folded stacks, as read by
+    flamegraph.pl and speedscope. A task on the loop measures how late it
+    wakes up, which is the time the loop was blocked. MiningRigs report the
+    wall-clock time of their poll phases through phase_recorder. Nothing of
+    this exists while no profile runs.
+    """
+
+    def __init__(self, hass: HomeAssistant, duration: float) -> None:
+        """Init Profiler."""
+        self._hass = hass
+        self.duration = duration
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self.idle_samples = 0
+        self.integration_samples = 0
+        self.module_samples: Counter[str] = Counter()
+        # (rig name, phase) -> durations in seconds
+        self.phases: dict[tuple[str, str], list[float]] = {}
+        self.loop_lags: list[float] = []
+        self.started = dt_util.utcnow()
+        self._loop_thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._sample, name=f"{DOMAIN}_profiler", daemon=True
+        )
+
+    def phase_recorder(self, rig_name: str) -> PhaseRecorder:
+        """Return a callback recording phase durations of a rig."""
+
+        def record(phase: str, seconds: float) -> None:
+            self.phases.setdefault((rig_name, phase), []).append(seconds)
+
+        return record
+
+    async def async_run(self) -> None:
+        """Profile for the configured duration."""
+        self._thread.start()
+        try:
+            end = monotonic() + self.duration
+            while monotonic() < end:
+                expected = perf_counter() + PROFILE_LAG_INTERVAL
+                await asyncio.sleep(PROFILE_LAG_INTERVAL)
+                self.loop_lags.append(max(0.0, perf_counter() - expected))
+        finally:
+            self._stop.set()
+            await self._hass.async_add_executor_job(self._thread.join)
+
+    def _sample(self) -> None:
+        """Sample the event loop thread until stopped."""
+        while not self._stop.wait(PROFILE_SAMPLE_INTERVAL):
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            self.samples += 1
+            # The loop waits for I/O in the selector
+            if frame.f_code.co_name == "select" and frame.f_code.co_filename.endswith(
+                "selectors.py"
+            ):
+                self.idle_samples += 1
+                continue
+            names = []
+            modules = set()
+            while frame is not None:
+                names.append(_frame_name(frame))
+                filename = frame.f_code.co_filename
+                if filename.startswith(PACKAGE_DIR):
+                    modules.add(os.path.basename(filename))
+                frame = frame.f_back
+            self.stacks[";".join(reversed(names))] += 1
+            if modules:
+                self.integration_samples += 1
+                self.module_samples.update(modules)
+
+    def folded(self) -> str:
+        """Busy samples as folded stacks."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.items())
+
+    def report(self) -> str:
+        """Human readable summary."""
+        busy = self.samples - self.idle_samples
+        lines = [
+            f"Profile of {self.duration:g} s started {self.started.isoformat()}",
+            f"Samples every {PROFILE_SAMPLE_INTERVAL * 1000:g} ms: {self.samples}, "
+            f"event loop busy in {busy}, "
+            f"in {DOMAIN} code {self.integration_samples}"
+            + (f" ({self.integration_samples / busy:.1%} of busy)" if busy else ""),
+        ]
+        if self.loop_lags:
+            lags = sorted(self.loop_lags)
+            lines.append(
+                f"Event loop lag: mean {sum(lags) / len(lags) * 1000:.2f} ms, "
+                f"p99 {lags[int(len(lags) * 0.99)] * 1000:.2f} ms, "
+                f"max {lags[-1] * 1000:.2f} ms"
+            )
+        lines.append("")
+        lines.append("Samples per integration module:")
+        for module, count in self.module_samples.most_common():
+            lines.append(f"  {module:<24} {count}")
+        lines.append("")
+        lines.append("Phases (rig, phase, calls, mean ms, max ms, total ms):")
+        for (rig_name, phase), durations in sorted(self.phases.items()):
+            lines.append(
+                f"  {rig_name:<20} {phase:<10} {len(durations):>6} "
+                f"{sum(durations) / len(durations) * 1000:>9.3f} "
+                f"{max(durations) * 1000:>9.3f} {sum(durations) * 1000:>10.3f}"
+            )
+        lines.append("")
+        lines.append(
+            "The update phase includes the time spent waiting for the Excavator."
+        )
+        return "\n".join(lines) + "\n"
+
+    def write(self, directory: str) -> tuple[str, str]:
+        """Write the report and the folded stacks, return both paths."""
+        stamp = self.started.strftime("%Y%m%d-%H%M%S")
+        report_path = os.path.join(directory, f"{DOMAIN}_profile_{stamp}.txt")
+        folded_path = os.path.join(directory, f"{DOMAIN}_profile_{stamp}.folded")
+        with open(report_path, "w", encoding="utf-8") as report_file:
+            report_file.write(self.report())
+        with open(folded_path, "w", encoding="utf-8") as folded_file:
+            folded_file.write(self.folded())
+        return report_path, folded_path
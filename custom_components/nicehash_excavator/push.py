@@ -0,0 +1,83 @@
+"""Webhook receiving snapshots pushed by the Excavator sidecar."""
+from __future__ import annotations
+
+import logging
+
+from aiohttp import web
+
+from homeassistant.components import persistent_notification, webhook
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONFIG_NAME, CONFIG_WEBHOOK_ID, DOMAIN
+from .mining_rig import MiningRig
+
+_LOGGER = logging.getLogger(__name__)
+
+# Excavator methods of a snapshot, each an object or null
+SNAPSHOT_SECTIONS = ("info", "devices.get", "algorithm.list", "worker.list")
+
+
+def async_register_webhook(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
+    """Register the push webhook of a config entry, creating its id once."""
+    webhook_id = config_entry.data.get(CONFIG_WEBHOOK_ID)
+    if webhook_id is None:
+        webhook_id = webhook.async_generate_id()
+        hass.config_entries.async_update_entry(
+            config_entry, data={**config_entry.data, CONFIG_WEBHOOK_ID: webhook_id}
+        )
+        persistent_notification.async_create(
+            hass,
+            f"Push snapshots of {config_entry.data[CONFIG_NAME]} to "
+            f"`{webhook.async_generate_path(webhook_id)}`",
+            title="Nicehash Excavator push",
+            notification_id=f"{DOMAIN}_{webhook_id}",
+        )
+
+    async def handle_webhook(
+        hass: HomeAssistant, webhook_id: str, request: web.Request
+    ) -> web.Response:
+        """Feed a pushed snapshot into the MiningRig."""
+        mining_rig: MiningRig | None = hass.data[DOMAIN].get(config_entry.entry_id)
+        if mining_rig is None:
+            return web.Response(status=404)
+        try:
+            payload = await request.json()
+        except ValueError:
+            return web.Response(status=400, text="Invalid JSON")
+        if not isinstance(payload, dict):
+            return web.Response(status=400, text="Expected a JSON object")
+        invalid = [
+            section
+            for section in SNAPSHOT_SECTIONS
+            if payload.get(section) is not None
+            and not isinstance(payload[section], dict)
+        ]
+        if invalid:
+            return web.Response(
+                status=400, text=f"Expected JSON objects for {', '.join(invalid)}"
+            )
+        try:
+            await mining_rig.async_push(payload)
+        except (AttributeError, TypeError, ValueError) as err:
+            _LOGGER.debug(
+                "%s: rejected pushed snapshot: %s", config_entry.data[CONFIG_NAME], err
+            )
+            return web.Response(status=400, text="Invalid snapshot")
+        return web.Response(status=200)
+
+    webhook.async_register(
+        hass, DOMAIN, config_entry.data[CONFIG_NAME], webhook_id, handle_webhook
+    )
+    _LOGGER.debug(
+        "%s: receiving pushes on %s",
+        config_entry.data[CONFIG_NAME],
+        webhook.async_generate_path(webhook_id),
+    )
+
+
+def async_unregister_webhook(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
+    """Unregister the push webhook of a config entry."""
+    webhook_id = config_entry.data.get(CONFIG_WEBHOOK_ID)
+    if webhook_id is not None:
+        webhook.async_unregister(hass, webhook_id)
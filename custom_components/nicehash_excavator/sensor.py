@@ -1,17 +1,245 @@
 """Sensor integration."""
-import logging
+from __future__ import annotations
 
-from homeassistant.components.sensor import SensorDeviceClass
+from collections.abc import Callable
+from dataclasses import dataclass, replace
+from functools import partial
+import logging
+from typing import Any
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import PERCENTAGE, POWER_WATT, TEMP_CELSIUS
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.entity import Entity
-
-from .const import CONFIG_ENABLE_DEBUG_LOGGING, CONFIG_NAME, DOMAIN
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity import EntityCategory
+from homeassistant.helpers.typing import StateType
+
+from .const import (
+    CONFIG_ENABLE_DEBUG_LOGGING,
+    CONFIG_NAME,
+    DATA_FARM,
+    DOMAIN,
+    HASHRATE_UNIT,
+)
+from .data_containers import GraphicsCard
+from .entities import async_add_filtered_entities
+from .farm import FARM_ID, FARM_NAME, Farm
+from .filters import RigFilter
 from .mining_rig import MiningRig
 
 _LOGGER = logging.getLogger(__name__)
 
+SHARE_RATE_UNIT = "shares/min"
+
+
+def hashrate(speed: float) -> float:
+    """Convert an Excavator speed in H/s to the displayed Mh/s."""
+    return round(speed / 1000000, 2)
+
+
+def total_power(mining_rig: MiningRig) -> float:
+    """Sum of the power usage of all devices."""
+    power = 0
+    for device in mining_rig.devices.values():
+        if device.gpu_power_usage is not None:
+            power += device.gpu_power_usage
+    return power
+
+
+def gpu_models(mining_rig: MiningRig) -> str:
+    """Comma separated list of the GPU models."""
+    devices = ", ".join(
+        device.name.replace("GeForce ", "") for device in mining_rig.devices.values()
+    )
+    return devices if len(devices) <= 255 else "value to long"
+
+
+def hottest_gpu_attributes(farm: Farm) -> dict[str, any]:
+    """Rig and GPU of the hottest GPU in the farm."""
+    if farm.hottest_gpu is None:
+        return {}
+    return {"rig": farm.hottest_gpu[1], "gpu": farm.hottest_gpu[2]}
+
+
+@dataclass
+class RigSensorEntityDescription(SensorEntityDescription):
+    """Describes a sensor reading its value from the MiningRig."""
+
+    value_fn: Callable[[MiningRig], StateType] = lambda mining_rig: None
+
+
+@dataclass
+class FarmSensorEntityDescription(SensorEntityDescription):
+    """Describes a sensor reading its value from the Farm."""
+
+    value_fn: Callable[[Farm], StateType] = lambda farm: None
+    attributes_fn: Callable[[Farm], dict[str, any]] | None = None
+
+
+@dataclass
+class DeviceSensorEntityDescription(SensorEntityDescription):
+    """Describes a sensor reading its value from a GraphicsCard."""
+
+    value_fn: Callable[[GraphicsCard], StateType] = lambda device: None
+
+
+RIG_SENSORS: tuple[RigSensorEntityDescription, ...] = (
+    RigSensorEntityDescription(
+        key="status",
+        name="status",
+        value_fn=lambda mining_rig: "Online" if mining_rig.online else "Offline",
+    ),
+    RigSensorEntityDescription(
+        key="gpu_models",
+        name="GPU models",
+        value_fn=gpu_models,
+    ),
+    RigSensorEntityDescription(
+        key="gpu_count",
+        name="GPU count",
+        value_fn=lambda mining_rig: len(mining_rig.devices),
+    ),
+    RigSensorEntityDescription(
+        key="power",
+        name="Power",
+        device_class=SensorDeviceClass.POWER,
+        native_unit_of_measurement=POWER_WATT,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=total_power,
+    ),
+    RigSensorEntityDescription(
+        key="cpu",
+        name="CPU",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda mining_rig: round(mining_rig.info.cpu_load, 2),
+    ),
+    RigSensorEntityDescription(
+        key="ram",
+        name="RAM",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda mining_rig: round(mining_rig.info.ram_load),
+    ),
+)
+
+DEVICE_SENSORS: tuple[DeviceSensorEntityDescription, ...] = (
+    DeviceSensorEntityDescription(
+        key="temp",
+        name="GPU",
+        device_class=SensorDeviceClass.TEMPERATURE,
+        native_unit_of_measurement=TEMP_CELSIUS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda device: device.gpu_temp,
+    ),
+    DeviceSensorEntityDescription(
+        key="vram_temp",
+        name="VRAM",
+        device_class=SensorDeviceClass.TEMPERATURE,
+        native_unit_of_measurement=TEMP_CELSIUS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda device: device.vram_temp,
+    ),
+    DeviceSensorEntityDescription(
+        key="hotspot_temp",
+        name="Hotspot",
+        device_class=SensorDeviceClass.TEMPERATURE,
+        native_unit_of_measurement=TEMP_CELSIUS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda device: device.hotspot_temp,
+    ),
+    DeviceSensorEntityDescription(
+        key="overtemp",
+        name="Overtemp",
+        value_fn=lambda device: device.too_hot,
+    ),
+    DeviceSensorEntityDescription(
+        key="fan",
+        name="Fan",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda device: device.gpu_fan_speed,
+    ),
+    DeviceSensorEntityDescription(
+        key="power",
+        name="Power",
+        device_class=SensorDeviceClass.POWER,
+        native_unit_of_measurement=POWER_WATT,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda device: device.gpu_power_usage,
+    ),
+    DeviceSensorEntityDescription(
+        key="gpu_model",
+        name="GPU Model",
+        value_fn=lambda device: device.name,
+    ),
+    DeviceSensorEntityDescription(
+        key="vendor_id",
+        name="Vendor ID",
+        value_fn=lambda device: device.subvendor,
+    ),
+)
+
+FARM_SENSORS: tuple[FarmSensorEntityDescription, ...] = (
+    FarmSensorEntityDescription(
+        key="power",
+        name="Power",
+        device_class=SensorDeviceClass.POWER,
+        native_unit_of_measurement=POWER_WATT,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda farm: round(farm.total_power, 2),
+    ),
+    FarmSensorEntityDescription(
+        key="online_rigs",
+        name="Online rigs",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda farm: farm.online_rigs,
+    ),
+    FarmSensorEntityDescription(
+        key="hottest_gpu",
+        name="Hottest GPU",
+        device_class=SensorDeviceClass.TEMPERATURE,
+        native_unit_of_measurement=TEMP_CELSIUS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda farm: farm.hottest_gpu[0] if farm.hottest_gpu else None,
+        attributes_fn=hottest_gpu_attributes,
+    ),
+)
+
+WATCHDOG_RESTARTS_SENSOR = RigSensorEntityDescription(
+    key="watchdog_restarts",
+    name="watchdog restarts",
+    icon="mdi:restart-alert",
+    entity_category=EntityCategory.DIAGNOSTIC,
+    state_class=SensorStateClass.TOTAL_INCREASING,
+    value_fn=lambda mining_rig: mining_rig.watchdog_restarts,
+)
+
+RIG_SUMMARY_SENSOR = RigSensorEntityDescription(
+    key="summary",
+    name="Summary",
+    device_class=SensorDeviceClass.POWER,
+    native_unit_of_measurement=POWER_WATT,
+    state_class=SensorStateClass.MEASUREMENT,
+    value_fn=total_power,
+)
+
+GPU_SUMMARY_SENSOR = DeviceSensorEntityDescription(
+    key="summary",
+    name="",
+)
+
+# Device sensors in order of preference for the state of the compact GPU
+# sensor, the first one not excluded is used and the others are attributes
+GPU_SUMMARY_STATES = ("temp", "hotspot_temp", "vram_temp", "power", "fan")
+# Attribute names of the compact GPU sensor differing from the sensor key
+GPU_SUMMARY_ATTRIBUTES = {"gpu_model": "model"}
+
 
 async def async_setup_entry(
     hass: HomeAssistant, config_entry: ConfigEntry, async_add_entities
@@ -20,49 +248,131 @@ async def async_setup_entry(
 
     mining_rig: MiningRig = hass.data[DOMAIN][config_entry.entry_id]
 
+    farm: Farm = hass.data[DATA_FARM]
+    # The farm entities live on one rig and move to another when it unloads
+    config_entry.async_on_unload(lambda: farm.remove_host(config_entry.entry_id))
+    farm.add_host(
+        config_entry.entry_id,
+        partial(async_setup_farm, farm, config_entry, async_add_entities),
+    )
+
+    async_add_filtered_entities(
+        hass,
+        mining_rig,
+        config_entry,
+        async_add_entities,
+        partial(_rig_sensors, mining_rig, config_entry),
+    )
+
+
+def _rig_sensors(mining_rig: MiningRig, config_entry: ConfigEntry) -> list[SensorBase]:
+    """Create the sensors of a rig kept by its filter."""
     new_devices = []
 
-    new_devices.append(OnlineSensor(mining_rig, config_entry))
-    new_devices.append(GpuModelsSensor(mining_rig, config_entry))
-    new_devices.append(GpuCountSensor(mining_rig, config_entry))
-    new_devices.append(TotalPowerSensor(mining_rig, config_entry))
-    new_devices.append(CPUSensor(mining_rig, config_entry))
-    new_devices.append(RAMSensor(mining_rig, config_entry))
+    if mining_rig.watchdog_enabled:
+        new_devices.append(
+            RigSensor(mining_rig, config_entry, WATCHDOG_RESTARTS_SENSOR)
+        )
 
-    for device_id in mining_rig.devices:
-        new_devices.append(GpuTempSensor(mining_rig, config_entry, device_id))
-        new_devices.append(VRAMTempSensor(mining_rig, config_entry, device_id))
-        new_devices.append(HotspotTempSensor(mining_rig, config_entry, device_id))
-        new_devices.append(OvertempSensor(mining_rig, config_entry, device_id))
-        new_devices.append(FanSensor(mining_rig, config_entry, device_id))
-        new_devices.append(PowerSensor(mining_rig, config_entry, device_id))
-        new_devices.append(ModelSensor(mining_rig, config_entry, device_id))
-        new_devices.append(VendorSensor(mining_rig, config_entry, device_id))
-
-    for algorithm_id in mining_rig.algorithms:
+    if mining_rig.compact_mode:
         new_devices.append(
-            AlgorithmHashrateSensor(mining_rig, config_entry, algorithm_id)
+            RigSummarySensor(mining_rig, config_entry, RIG_SUMMARY_SENSOR)
         )
+        for device_id in mining_rig.devices:
+            new_devices.append(GpuSummarySensor(mining_rig, config_entry, device_id))
+        return new_devices
+
+    # Without raw states the measurements are only kept as external statistics
+    rig_sensors = RIG_SENSORS
+    device_sensors = DEVICE_SENSORS
+    if mining_rig.exclude_raw_states:
+        rig_sensors = [d for d in RIG_SENSORS if d.state_class is None]
+        device_sensors = [d for d in DEVICE_SENSORS if d.state_class is None]
+    excluded_metrics = mining_rig.rig_filter.metrics
+    if excluded_metrics:
+        device_sensors = [d for d in device_sensors if d.key not in excluded_metrics]
+
+    for description in rig_sensors:
+        new_devices.append(RigSensor(mining_rig, config_entry, description))
+
+    for device_id in mining_rig.devices:
+        for description in device_sensors:
+            new_devices.append(
+                DeviceSensor(mining_rig, config_entry, description, device_id)
+            )
+
+    # Excluded GPUs and algorithms are not parsed at all. Share rates are not
+    # kept as statistics, so they are added even without raw states.
+    if "shares" not in excluded_metrics:
+        for algorithm in mining_rig.algorithms.values():
+            new_devices.append(
+                AlgorithmShareRateSensor(mining_rig, config_entry, algorithm.name)
+            )
+            new_devices.append(
+                AlgorithmRejectRatioSensor(mining_rig, config_entry, algorithm.name)
+            )
+
+    if mining_rig.exclude_raw_states:
+        return new_devices
 
-    for worker_id in mining_rig.workers:
-        for algorithm_id in mining_rig.get_worker(worker_id).algorithms:
+    if "hashrate" not in excluded_metrics:
+        for algorithm_id in mining_rig.algorithms:
             new_devices.append(
-                WorkerAlgorithmHashrateSensor(
-                    mining_rig, config_entry, worker_id, algorithm_id
+                AlgorithmHashrateSensor(mining_rig, config_entry, algorithm_id)
+            )
+
+    if "hashrate" not in excluded_metrics:
+        for worker in mining_rig.workers.values():
+            # The device is missing when devices.get failed or the uuid is None
+            if mining_rig.get_device_by_uuid(worker.device_uuid) is None:
+                continue
+            for algorithm in worker.algorithms.values():
+                new_devices.append(
+                    WorkerAlgorithmHashrateSensor(
+                        mining_rig, config_entry, worker.device_uuid, algorithm.name
+                    )
                 )
+
+    return new_devices
+
+
+def async_setup_farm(farm: Farm, config_entry: ConfigEntry, async_add_entities) -> None:
+    """Add the farm sensors, with hashrate sensors for new algorithms on the fly."""
+    async_add_entities([FarmSensor(farm, description) for description in FARM_SENSORS])
+    known_algorithms = set()
+
+    def add_algorithm_sensors() -> None:
+        new_algorithms = farm.hashrates.keys() - known_algorithms
+        if new_algorithms:
+            known_algorithms.update(new_algorithms)
+            async_add_entities(
+                [FarmHashrateSensor(farm, name) for name in sorted(new_algorithms)]
             )
 
-    if new_devices:
-        async_add_entities(new_devices)
+    add_algorithm_sensors()
+    farm.register_callback(add_algorithm_sensors)
+    config_entry.async_on_unload(lambda: farm.remove_callback(add_algorithm_sensors))
 
 
-class SensorBase(Entity):
-    """Base representation of a Sensor."""
+class SensorBase(SensorEntity):
+    """Base representation of a Sensor.
 
-    should_poll = False
+    Name, unique id and device info are static for the lifetime of the entity,
+    so they are computed once on construction instead of on every state write.
+    """
 
-    def __init__(self, mining_rig: MiningRig, config_entry: ConfigEntry) -> None:
+    _attr_should_poll = False
+    # GPU, metric and algorithm the sensor covers, see async_add_filtered_entities
+    filter_subject: dict[str, Any] | None = None
+
+    def __init__(
+        self,
+        mining_rig: MiningRig,
+        config_entry: ConfigEntry,
+        description: SensorEntityDescription,
+    ) -> None:
         """Initialize the sensor."""
+        self.entity_description = description
         self._rig_name = config_entry.data.get(CONFIG_NAME)
         self._mining_rig = mining_rig
         try:
@@ -83,13 +393,31 @@ class SensorBase(Entity):
         """Entity being removed from hass."""
         self._mining_rig.remove_callback(self.async_write_ha_state)
 
+    def _log_error(self, error: Exception) -> None:
+        """Log a value lookup error if debug logging is enabled."""
+        if self._enable_debug_logging:
+            _LOGGER.info(error)
+
 
 class RigSensor(SensorBase):
-    """Base representation of a Rig Sensor."""
+    """Representation of a Rig Sensor."""
 
-    @property
-    def device_info(self) -> any:
-        """Information about this entity/device."""
+    entity_description: RigSensorEntityDescription
+
+    def __init__(
+        self,
+        mining_rig: MiningRig,
+        config_entry: ConfigEntry,
+        description: RigSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(mining_rig, config_entry, description)
+        self._attr_name = f"{self._rig_name} {description.name}"
+        self._attr_unique_id = f"{self._rig_name}_{description.key}"
+        self._attr_device_info = self._rig_device_info()
+
+    def _rig_device_info(self) -> dict[str, any]:
+        """Information about the rig device."""
 
         info = {
             "identifiers": {
@@ -106,489 +434,374 @@ class RigSensor(SensorBase):
                 "sw_version"
             ] = f"{self._mining_rig.info.version}, Build: {self._mining_rig.info.build_number}"
 
-            info["uptime"] = f"{self._mining_rig.info.uptime / 60 / 60}h"
-
-            gpu_models: dict[str, int]
-            gpu_models = {}
-            for device_id in self._mining_rig.devices:
-                gpu_model = self._mining_rig.get_device(device_id).name
-                if gpu_model in gpu_models:
-                    gpu_count = gpu_models[gpu_model]
-                    gpu_models[gpu_model] = gpu_count + 1
-                else:
-                    gpu_models[gpu_model] = 1
-
-            model_string = ""
-            for gpu_model, gpu_count in gpu_models.items():
-                if model_string:
-                    model_string = (
-                        model_string + "; " + str(gpu_count) + "x " + gpu_model
-                    )
-                else:
-                    model_string = str(gpu_count) + "x " + gpu_model
+            gpu_model_counts: dict[str, int] = {}
+            for device in self._mining_rig.devices.values():
+                gpu_model_counts[device.name] = gpu_model_counts.get(device.name, 0) + 1
 
-            info["model"] = model_string
+            info["model"] = "; ".join(
+                f"{gpu_count}x {gpu_model}"
+                for gpu_model, gpu_count in gpu_model_counts.items()
+            )
         except (AttributeError, TypeError) as error:
-            if self._enable_debug_logging:
-                _LOGGER.info(error)
+            self._log_error(error)
             info["model"] = "No GPUs found"
-            info["uptime"] = "Not available"
         return info
 
+    @property
+    def native_value(self) -> StateType:
+        try:
+            return self.entity_description.value_fn(self._mining_rig)
+        except (AttributeError, TypeError) as error:
+            self._log_error(error)
+            return None
 
-class DeviceSensorBase(SensorBase):
-    """Base representation of a Graphics device Sensor."""
+
+class DeviceSensor(SensorBase):
+    """Representation of a Graphics device Sensor."""
+
+    entity_description: DeviceSensorEntityDescription
 
     def __init__(
         self,
         mining_rig: MiningRig,
         config_entry: ConfigEntry,
+        description: SensorEntityDescription,
         device_id: int,
     ) -> None:
         """Initialize the sensor."""
-        super().__init__(mining_rig, config_entry)
-        self._device_id = device_id
+        super().__init__(mining_rig, config_entry, description)
+        device = mining_rig.get_device(device_id)
         self._device_name = f"GPU {device_id}"
-        self._device_uuid = mining_rig.get_device(device_id).uuid
-
-    @property
-    def device_info(self) -> any:
-        """Information about this entity/device."""
-        try:
-            return {
-                "identifiers": {
-                    (
-                        DOMAIN,
-                        self._device_uuid,
-                    )
-                },
-                "name": self._device_name,
-                "model": self._mining_rig.get_device(self._device_id).name,
-                "manufacturer": self._mining_rig.get_device(self._device_id).subvendor,
-                "via_device": (
+        self._device_uuid = device.uuid
+        self.filter_subject = {
+            "device_id": device_id,
+            "device_uuid": device.uuid,
+            "metric": description.key,
+        }
+        self._attr_name = (
+            f"{self._rig_name} {self._device_name} {description.name}".rstrip()
+        )
+        self._attr_unique_id = f"{self._rig_name}_{self._device_uuid}_{description.key}"
+        self._attr_device_info = {
+            "identifiers": {
+                (
                     DOMAIN,
-                    f"{self._rig_name} Excavator",
-                ),
-            }
-        except AttributeError as error:
-            if self._enable_debug_logging:
-                _LOGGER.info(error)
-            return "unavailable"
-
-
-class GpuTempSensor(DeviceSensorBase):
-    """GPU temp sensor."""
-
-    device_class = SensorDeviceClass.TEMPERATURE
-    _attr_unit_of_measurement = TEMP_CELSIUS
-
-    @property
-    def name(self) -> str:
-        return f"{self._rig_name} {self._device_name} GPU"
-
-    @property
-    def unique_id(self) -> str:
-        return f"{self._rig_name}_{self._device_uuid}_temp"
-
-    @property
-    def state(self) -> float:
-        try:
-            return self._mining_rig.get_device(self._device_id).gpu_temp
-        except AttributeError as error:
-            if self._enable_debug_logging:
-                _LOGGER.info(error)
-            return "unavailable"
-
-
-class VRAMTempSensor(DeviceSensorBase):
-    """VRAM temp Sensor."""
-
-    device_class = SensorDeviceClass.TEMPERATURE
-    _attr_unit_of_measurement = TEMP_CELSIUS
-
-    @property
-    def name(self) -> str:
-        return f"{self._rig_name} {self._device_name} VRAM"
-
-    @property
-    def unique_id(self) -> str:
-        return f"{self._rig_name}_{self._device_uuid}_vram_temp"
-
-    @property
-    def state(self) -> float:
-        try:
-            return self._mining_rig.get_device(self._device_id).vram_temp
-        except AttributeError as error:
-            if self._enable_debug_logging:
-                _LOGGER.info(error)
-            return "unavailable"
-
-
-class HotspotTempSensor(DeviceSensorBase):
-    """Hotspot Sensor."""
-
-    device_class = SensorDeviceClass.TEMPERATURE
-    _attr_unit_of_measurement = TEMP_CELSIUS
-
-    @property
-    def name(self) -> str:
-        return f"{self._rig_name} {self._device_name} Hotspot"
-
-    @property
-    def unique_id(self) -> str:
-        return f"{self._rig_name}_{self._device_uuid}_hotspot_temp"
-
-    @property
-    def state(self) -> float:
-        try:
-            return self._mining_rig.get_device(self._device_id).hotspot_temp
-        except AttributeError as error:
-            if self._enable_debug_logging:
-                _LOGGER.info(error)
-            return "unavailable"
-
-
-class FanSensor(DeviceSensorBase):
-    """Fan Sensor."""
-
-    _attr_unit_of_measurement = PERCENTAGE
-
-    @property
-    def name(self) -> str:
-        return f"{self._rig_name} {self._device_name} Fan"
-
-    @property
-    def unique_id(self) -> str:
-        return f"{self._rig_name}_{self._device_uuid}_fan"
-
-    @property
-    def state(self) -> float:
-        try:
-            return self._mining_rig.get_device(self._device_id).gpu_fan_speed
-        except AttributeError as error:
-            if self._enable_debug_logging:
-                _LOGGER.info(error)
-            return "unavailable"
-
-
-class OvertempSensor(DeviceSensorBase):
-    """Overtemp Sensor."""
-
-    @property
-    def name(self) -> str:
-        return f"{self._rig_name} {self._device_name} Overtemp"
-
-    @property
-    def unique_id(self) -> str:
-        return f"{self._rig_name}_{self._device_uuid}_overtemp"
-
-    @property
-    def state(self) -> bool:
-        try:
-            return self._mining_rig.get_device(self._device_id).too_hot
-        except AttributeError as error:
-            if self._enable_debug_logging:
-                _LOGGER.info(error)
-            return "unavailable"
-
-
-class PowerSensor(DeviceSensorBase):
-    """Power Sensor."""
-
-    device_class = SensorDeviceClass.POWER
-    _attr_unit_of_measurement = POWER_WATT
-
-    @property
-    def name(self) -> str:
-        return f"{self._rig_name} {self._device_name} Power"
-
-    @property
-    def unique_id(self) -> str:
-        return f"{self._rig_name}_{self._device_uuid}_power"
-
-    @property
-    def state(self) -> float:
-        try:
-            return self._mining_rig.get_device(self._device_id).gpu_power_usage
-        except AttributeError as error:
-            if self._enable_debug_logging:
-                _LOGGER.info(error)
-            return "unavailable"
-
-
-class ModelSensor(DeviceSensorBase):
-    """Model Sensor."""
-
-    @property
-    def name(self) -> str:
-        return f"{self._rig_name} {self._device_name} GPU Model"
-
-    @property
-    def unique_id(self) -> str:
-        return f"{self._rig_name}_{self._device_uuid}_gpu_model"
-
-    @property
-    def state(self) -> str:
-        try:
-            return self._mining_rig.get_device(self._device_id).name
-        except AttributeError as error:
-            if self._enable_debug_logging:
-                _LOGGER.info(error)
-            return "unavailable"
-
-
-class VendorSensor(DeviceSensorBase):
-    """Vendor Sensor."""
-
-    @property
-    def name(self) -> str:
-        return f"{self._rig_name} {self._device_name} Vendor ID"
-
-    @property
-    def unique_id(self) -> str:
-        return f"{self._rig_name}_{self._device_uuid}_vendor_id"
+                    self._device_uuid,
+                )
+            },
+            "name": self._device_name,
+            "model": device.name,
+            "manufacturer": device.subvendor,
+            "via_device": (
+                DOMAIN,
+                f"{self._rig_name} Excavator",
+            ),
+        }
 
     @property
-    def state(self) -> str:
+    def native_value(self) -> StateType:
         try:
-            return self._mining_rig.get_device(self._device_id).subvendor
-        except AttributeError as error:
-            if self._enable_debug_logging:
-                _LOGGER.info(error)
-            return "unavailable"
+            return self.entity_description.value_fn(
+                self._mining_rig.get_device_by_uuid(self._device_uuid)
+            )
+        except (AttributeError, TypeError) as error:
+            self._log_error(error)
+            return None
 
 
-class WorkerAlgorithmHashrateSensor(DeviceSensorBase):
-    """Hashrate Sensor per GPU and Algorithm ."""
+class WorkerAlgorithmHashrateSensor(DeviceSensor):
+    """Hashrate Sensor per GPU and Algorithm.
 
-    _attr_unit_of_measurement = "Mh/s"
+    Identified by device uuid and algorithm name, as worker ids change when
+    Excavator restarts.
+    """
 
     def __init__(
         self,
         mining_rig: MiningRig,
         config_entry: ConfigEntry,
-        worker_id: int,
-        algorithm_id: int,
+        device_uuid: str,
+        algorithm_name: str,
     ) -> None:
         """Initialize the sensor."""
-        for device_id in mining_rig.devices:
-            if device_id == mining_rig.get_worker(worker_id).device_id:
-                self._device_id = device_id
-                break
-
-        super().__init__(mining_rig, config_entry, self._device_id)
-        self._worker_id = worker_id
-        self._algorithm_id = algorithm_id
-
-    @property
-    def name(self) -> str:
-        try:
-            return f"{self._rig_name} {self._device_name} {self._mining_rig.get_worker(self._worker_id).algorithms[self._algorithm_id].name}"
-        except AttributeError as error:
-            if self._enable_debug_logging:
-                _LOGGER.info(error)
-            return "unavailable"
-
-    @property
-    def unique_id(self) -> str:
-        try:
-            return f"{self._rig_name}_{self._device_uuid}_{self._mining_rig.get_worker(self._worker_id).algorithms[self._algorithm_id].name}"
-        except AttributeError as error:
-            if self._enable_debug_logging:
-                _LOGGER.info(error)
-            return "unavailable"
+        description = SensorEntityDescription(
+            key=algorithm_name,
+            name=algorithm_name,
+            native_unit_of_measurement=HASHRATE_UNIT,
+            state_class=SensorStateClass.MEASUREMENT,
+        )
+        device_id = mining_rig.get_device_by_uuid(device_uuid).id
+        super().__init__(mining_rig, config_entry, description, device_id)
+        self._algorithm_name = algorithm_name
+        self.filter_subject.update(metric="hashrate", algorithm=algorithm_name)
 
     @property
-    def state(self) -> float:
+    def native_value(self) -> StateType:
         try:
-            worker = self._mining_rig.get_worker(self._worker_id)
-            algorithm = worker.algorithms[self._algorithm_id]
-            return round(
-                algorithm.speed / 1000000,
-                2,
+            return hashrate(
+                self._mining_rig.get_worker_algorithm(
+                    self._device_uuid, self._algorithm_name
+                ).speed
             )
         except (AttributeError, TypeError) as error:
-            if self._enable_debug_logging:
-                _LOGGER.info(error)
-            return "unavailable"
+            self._log_error(error)
+            return None
 
 
 class AlgorithmHashrateSensor(RigSensor):
     """Hashrate Sensor per Algorithm."""
 
-    _attr_unit_of_measurement = "Mh/s"
-
     def __init__(
         self, mining_rig: MiningRig, config_entry: ConfigEntry, algorithm_id: int
     ) -> None:
         """Initialize the sensor."""
-        super().__init__(mining_rig, config_entry)
+        algorithm_name = mining_rig.get_algorithm(algorithm_id).name
+        description = RigSensorEntityDescription(
+            key=f"{algorithm_name}_hashrate",
+            name=algorithm_name,
+            native_unit_of_measurement=HASHRATE_UNIT,
+            state_class=SensorStateClass.MEASUREMENT,
+        )
+        super().__init__(mining_rig, config_entry, description)
         self._algorithm_id = algorithm_id
+        self.filter_subject = {"metric": "hashrate", "algorithm": algorithm_name}
 
     @property
-    def name(self) -> str:
+    def native_value(self) -> StateType:
         try:
-            return f"{self._rig_name} {self._mining_rig.get_algorithm(self._algorithm_id).name}"
-        except AttributeError as error:
-            if self._enable_debug_logging:
-                _LOGGER.info(error)
-            return "unavailable"
+            return hashrate(self._mining_rig.get_algorithm(self._algorithm_id).speed)
+        except (AttributeError, TypeError) as error:
+            self._log_error(error)
+            return None
 
-    @property
-    def unique_id(self) -> str:
-        try:
-            return f"{self._rig_name}_{self._mining_rig.get_algorithm(self._algorithm_id).name}_hashrate"
-        except AttributeError as error:
-            if self._enable_debug_logging:
-                _LOGGER.info(error)
-            return "unavailable"
+
+class AlgorithmShareRateSensor(RigSensor):
+    """Accepted shares per minute of an Algorithm, with the raw counters."""
+
+    def __init__(
+        self, mining_rig: MiningRig, config_entry: ConfigEntry, algorithm_name: str
+    ) -> None:
+        """Initialize the sensor."""
+        description = RigSensorEntityDescription(
+            key=f"{algorithm_name}_share_rate",
+            name=f"{algorithm_name} share rate",
+            icon="mdi:check-circle-outline",
+            native_unit_of_measurement=SHARE_RATE_UNIT,
+            state_class=SensorStateClass.MEASUREMENT,
+        )
+        super().__init__(mining_rig, config_entry, description)
+        self._algorithm_name = algorithm_name
+        self.filter_subject = {"metric": "shares", "algorithm": algorithm_name}
 
     @property
-    def state(self) -> float:
+    def native_value(self) -> StateType:
         try:
-            algorithm = self._mining_rig.get_algorithm(self._algorithm_id)
             return round(
-                algorithm.speed / 1000000,
+                self._mining_rig.shares.get(self._algorithm_name).accepted_per_minute,
                 2,
             )
         except (AttributeError, TypeError) as error:
-            if self._enable_debug_logging:
-                _LOGGER.info(error)
-            return "unavailable"
-
-
-class OnlineSensor(RigSensor):
-    """Online Sensor"""
-
-    @property
-    def name(self) -> str:
-        return f"{self._rig_name} status"
-
-    @property
-    def unique_id(self) -> str:
-        return f"{self._rig_name}_status"
-
-    @property
-    def state(self) -> str:
-        return "Online" if self._mining_rig.online else "Offline"
-
+            self._log_error(error)
+            return None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, any]:
+        counter = self._mining_rig.shares.get(self._algorithm_name)
+        if counter is None:
+            return {}
+        rejected_per_minute = counter.rejected_per_minute
+        return {
+            "accepted_shares": counter.accepted,
+            "rejected_shares": counter.rejected,
+            "rejected_per_minute": None
+            if rejected_per_minute is None
+            else round(rejected_per_minute, 2),
+        }
 
-class GpuModelsSensor(RigSensor):
-    """Gpu models Sensor"""
 
-    @property
-    def name(self) -> str:
-        return f"{self._rig_name} GPU models"
+class AlgorithmRejectRatioSensor(RigSensor):
+    """Percentage of rejected shares of an Algorithm."""
 
-    @property
-    def unique_id(self) -> str:
-        return f"{self._rig_name}_gpu_models"
+    def __init__(
+        self, mining_rig: MiningRig, config_entry: ConfigEntry, algorithm_name: str
+    ) -> None:
+        """Initialize the sensor."""
+        description = RigSensorEntityDescription(
+            key=f"{algorithm_name}_reject_ratio",
+            name=f"{algorithm_name} reject ratio",
+            icon="mdi:close-circle-outline",
+            native_unit_of_measurement=PERCENTAGE,
+            state_class=SensorStateClass.MEASUREMENT,
+        )
+        super().__init__(mining_rig, config_entry, description)
+        self._algorithm_name = algorithm_name
+        self.filter_subject = {"metric": "shares", "algorithm": algorithm_name}
 
     @property
-    def state(self) -> str:
+    def native_value(self) -> StateType:
         try:
-            devices = ""
-            for device_id in self._mining_rig.devices:
-                devices += (
-                    self._mining_rig.get_device(device_id).name.replace("GeForce ", "")
-                    + ", "
-                )
-            return devices[:-2] if len(devices[:-2]) <= 255 else "value to long"
-        except AttributeError as error:
-            if self._enable_debug_logging:
-                _LOGGER.info(error)
-            return "unavailable"
-
-
-class GpuCountSensor(RigSensor):
-    """Gpu count Sensor"""
+            return round(
+                self._mining_rig.shares.get(self._algorithm_name).reject_ratio * 100,
+                2,
+            )
+        except (AttributeError, TypeError) as error:
+            self._log_error(error)
+            return None
 
-    @property
-    def name(self) -> str:
-        return f"{self._rig_name} GPU count"
 
-    @property
-    def unique_id(self) -> str:
-        return f"{self._rig_name}_gpu_count"
+class RigSummarySensor(RigSensor):
+    """Single summary sensor per rig used in compact mode."""
 
     @property
-    def state(self) -> int:
+    def extra_state_attributes(self) -> dict[str, any]:
+        attributes = {
+            "status": "Online" if self._mining_rig.online else "Offline",
+            "gpu_count": len(self._mining_rig.devices),
+        }
         try:
-            return len(self._mining_rig.devices)
-        except AttributeError as error:
-            if self._enable_debug_logging:
-                _LOGGER.info(error)
-            return "unavailable"
-
+            attributes["cpu"] = round(self._mining_rig.info.cpu_load, 2)
+            attributes["ram"] = round(self._mining_rig.info.ram_load)
+        except (AttributeError, TypeError) as error:
+            self._log_error(error)
+        excluded_metrics = self._mining_rig.rig_filter.metrics
+        for algorithm in self._mining_rig.algorithms.values():
+            if "hashrate" not in excluded_metrics:
+                try:
+                    attributes[f"{algorithm.name}_hashrate"] = hashrate(algorithm.speed)
+                except TypeError as error:
+                    self._log_error(error)
+            counter = self._mining_rig.shares.get(algorithm.name)
+            if counter is not None and "shares" not in excluded_metrics:
+                attributes[f"{algorithm.name}_accepted_shares"] = counter.accepted
+                attributes[f"{algorithm.name}_rejected_shares"] = counter.rejected
+        return attributes
+
+
+class GpuSummarySensor(DeviceSensor):
+    """Single sensor per GPU used in compact mode, metrics as attributes.
+
+    Only metrics kept by the rig filter are shown, the state is the first
+    kept metric of GPU_SUMMARY_STATES. A changed filter applies on the next
+    state write.
+    """
 
-class TotalPowerSensor(RigSensor):
-    """Miner Power Sensor."""
+    def __init__(
+        self, mining_rig: MiningRig, config_entry: ConfigEntry, device_id: int
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(mining_rig, config_entry, GPU_SUMMARY_SENSOR, device_id)
+        self._apply_filter(mining_rig.rig_filter)
+
+    def _apply_filter(self, rig_filter: RigFilter) -> None:
+        """Pick the state and attribute metrics kept by the filter."""
+        self._rig_filter = rig_filter
+        kept = {
+            description.key: description
+            for description in DEVICE_SENSORS
+            if description.key not in rig_filter.metrics
+        }
+        state_key = next((key for key in GPU_SUMMARY_STATES if key in kept), None)
+        self.entity_description = GPU_SUMMARY_SENSOR
+        if state_key is not None:
+            self.entity_description = replace(
+                kept.pop(state_key), key="summary", name=""
+            )
+        self._attribute_descriptions = tuple(kept.values())
+        self._show_hashrates = "hashrate" not in rig_filter.metrics
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Write the state, with the metrics of the current filter."""
+        if self._mining_rig.rig_filter is not self._rig_filter:
+            self._apply_filter(self._mining_rig.rig_filter)
+        super().async_write_ha_state()
+
+    @property
+    def extra_state_attributes(self) -> dict[str, any]:
+        device = self._mining_rig.get_device_by_uuid(self._device_uuid)
+        if device is None:
+            return {}
+        attributes = {
+            GPU_SUMMARY_ATTRIBUTES.get(description.key, description.key): (
+                description.value_fn(device)
+            )
+            for description in self._attribute_descriptions
+        }
+        if not self._show_hashrates:
+            return attributes
+        for worker in self._mining_rig.get_workers_for_device(device.id):
+            try:
+                for algorithm in worker.algorithms.values():
+                    attributes[f"{algorithm.name}_hashrate"] = hashrate(algorithm.speed)
+            except (AttributeError, TypeError) as error:
+                self._log_error(error)
+        return attributes
 
-    device_class = SensorDeviceClass.POWER
-    _attr_unit_of_measurement = POWER_WATT
 
-    @property
-    def name(self) -> str:
-        return f"{self._rig_name} Power"
+class FarmSensor(SensorEntity):
+    """Representation of a sensor of the farm across all rigs.
 
-    @property
-    def unique_id(self) -> str:
-        return f"{self._rig_name}_power"
+    The farm changes on every rig poll, the state is only written when the
+    value or the attributes of this sensor changed.
+    """
 
-    @property
-    def state(self) -> float:
-        try:
-            power = 0
-            for device_id in self._mining_rig.devices:
-                power += self._mining_rig.get_device(device_id).gpu_power_usage
-            return power
-        except (AttributeError, TypeError) as error:
-            if self._enable_debug_logging:
-                _LOGGER.info(error)
-            return "unavailable"
+    _attr_should_poll = False
+    entity_description: FarmSensorEntityDescription
 
+    def __init__(self, farm: Farm, description: FarmSensorEntityDescription) -> None:
+        """Initialize the sensor."""
+        self.entity_description = description
+        self._farm = farm
+        self._written = None
+        self._attr_name = f"{FARM_NAME} {description.name}"
+        self._attr_unique_id = f"{FARM_ID}_{description.key}"
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, FARM_ID)},
+            "name": FARM_NAME,
+            "manufacturer": "NiceHash",
+        }
 
-class CPUSensor(RigSensor):
-    """CPU Sensor."""
+    async def async_added_to_hass(self) -> None:
+        """Run when this Entity has been added to HA."""
+        self._farm.register_callback(self._async_farm_updated)
 
-    _attr_unit_of_measurement = PERCENTAGE
+    async def async_will_remove_from_hass(self) -> None:
+        """Entity being removed from hass."""
+        self._farm.remove_callback(self._async_farm_updated)
 
-    @property
-    def name(self) -> str:
-        return f"{self._rig_name} CPU"
+    @callback
+    def _async_farm_updated(self) -> None:
+        """Write the state if it differs from the last one written."""
+        written = (self.native_value, self.extra_state_attributes)
+        if written != self._written:
+            self._written = written
+            self.async_write_ha_state()
 
     @property
-    def unique_id(self) -> str:
-        return f"{self._rig_name}_cpu"
+    def native_value(self) -> StateType:
+        return self.entity_description.value_fn(self._farm)
 
     @property
-    def state(self) -> float:
-        try:
-            return round(self._mining_rig.info.cpu_load, 2)
-        except (AttributeError, TypeError) as error:
-            if self._enable_debug_logging:
-                _LOGGER.info(error)
-            return "unavailable"
-
+    def extra_state_attributes(self) -> dict[str, any] | None:
+        if self.entity_description.attributes_fn is None:
+            return None
+        return self.entity_description.attributes_fn(self._farm)
 
-class RAMSensor(RigSensor):
-    """RAM Sensor."""
 
-    _attr_unit_of_measurement = PERCENTAGE
+class FarmHashrateSensor(FarmSensor):
+    """Hashrate of an algorithm across all rigs."""
 
-    @property
-    def name(self) -> str:
-        return f"{self._rig_name} RAM"
-
-    @property
-    def unique_id(self) -> str:
-        return f"{self._rig_name}_ram"
+    def __init__(self, farm: Farm, algorithm_name: str) -> None:
+        """Initialize the sensor."""
+        description = FarmSensorEntityDescription(
+            key=f"{algorithm_name}_hashrate",
+            name=algorithm_name,
+            native_unit_of_measurement=HASHRATE_UNIT,
+            state_class=SensorStateClass.MEASUREMENT,
+        )
+        super().__init__(farm, description)
+        self._algorithm_name = algorithm_name
 
     @property
-    def state(self) -> float:
-        try:
-            return round(self._mining_rig.info.ram_load)
-        except (AttributeError, TypeError) as error:
-            if self._enable_debug_logging:
-                _LOGGER.info(error)
-            return "unavailable"
+    def native_value(self) -> StateType:
+        return hashrate(self._farm.hashrates.get(self._algorithm_name, 0))
@@ -0,0 +1,112 @@
+"""Share rates derived from the cumulative Excavator share counters."""
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterable
+
+from .const import SHARE_RATE_WINDOW
+from .data_containers import Algorithm
+
+
+def _is_counter(value) -> bool:
+    """Return True for int values, excluding bool."""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+class ShareCounter:
+    """Share rates of one algorithm over a sliding window.
+
+    Only the counter deltas between polls are kept, with running sums over
+    the window, so each poll is constant time. A counter below its previous
+    value means Excavator restarted and counts from zero again.
+    """
+
+    def __init__(self, now: float, accepted: int, rejected: int) -> None:
+        """Init ShareCounter with the first counter values."""
+        self.accepted = accepted
+        self.rejected = rejected
+        self._started = now
+        self._updated = now
+        # (timestamp, accepted delta, rejected delta) within the window
+        self._deltas: deque[tuple[float, int, int]] = deque()
+        self._window_accepted = 0
+        self._window_rejected = 0
+
+    def update(self, now: float, accepted: int, rejected: int) -> None:
+        """Add the counter values of a poll."""
+        if accepted < self.accepted or rejected < self.rejected:
+            accepted_delta, rejected_delta = accepted, rejected
+        else:
+            accepted_delta = accepted - self.accepted
+            rejected_delta = rejected - self.rejected
+        self.accepted = accepted
+        self.rejected = rejected
+        self._updated = now
+
+        if accepted_delta or rejected_delta:
+            self._deltas.append((now, accepted_delta, rejected_delta))
+            self._window_accepted += accepted_delta
+            self._window_rejected += rejected_delta
+        while self._deltas and self._deltas[0][0] <= now - SHARE_RATE_WINDOW:
+            _, accepted_delta, rejected_delta = self._deltas.popleft()
+            self._window_accepted -= accepted_delta
+            self._window_rejected -= rejected_delta
+
+    def _per_minute(self, shares: int) -> float | None:
+        """Shares per minute over the window, None before a second poll."""
+        span = min(self._updated - self._started, SHARE_RATE_WINDOW)
+        if span <= 0:
+            return None
+        return shares / span * 60
+
+    @property
+    def accepted_per_minute(self) -> float | None:
+        """Accepted shares per minute."""
+        return self._per_minute(self._window_accepted)
+
+    @property
+    def rejected_per_minute(self) -> float | None:
+        """Rejected shares per minute."""
+        return self._per_minute(self._window_rejected)
+
+    @property
+    def reject_ratio(self) -> float | None:
+        """Fraction of rejected shares, None without shares in the window."""
+        total = self._window_accepted + self._window_rejected
+        if not total:
+            return None
+        return self._window_rejected / total
+
+
+class ShareTracker:
+    """Share counters of all algorithms of a rig, keyed by algorithm name."""
+
+    def __init__(self) -> None:
+        """Init ShareTracker."""
+        self._counters: dict[str, ShareCounter] = {}
+
+    def get(self, algorithm_name: str) -> ShareCounter | None:
+        """Return the counter of an algorithm."""
+        return self._counters.get(algorithm_name)
+
+    def update(self, algorithms: Iterable[Algorithm], now: float) -> None:
+        """Add the counters of a poll, dropping algorithms no longer mined."""
+        seen = set()
+        for algorithm in algorithms:
+            if not (
+                _is_counter(algorithm.accepted_shares)
+                and _is_counter(algorithm.rejected_shares)
+            ):
+                continue
+            seen.add(algorithm.name)
+            counter = self._counters.get(algorithm.name)
+            if counter is None:
+                self._counters[algorithm.name] = ShareCounter(
+                    now, algorithm.accepted_shares, algorithm.rejected_shares
+                )
+            else:
+                counter.update(
+                    now, algorithm.accepted_shares, algorithm.rejected_shares
+                )
+        for name in self._counters.keys() - seen:
+            del self._counters[name]
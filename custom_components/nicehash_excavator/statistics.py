@@ -0,0 +1,222 @@
+"""Long-term statistics aggregated from the rig polls."""
+from __future__ import annotations
+
+from collections.abc import Iterator
+import datetime
+import logging
+
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_add_external_statistics
+from homeassistant.const import PERCENTAGE, POWER_WATT, TEMP_CELSIUS
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util, slugify
+
+from .const import DOMAIN, HASHRATE_UNIT
+from .data_containers import is_number
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 60  # seconds
+
+# Device metrics written as statistics: attribute, statistic suffix, unit
+DEVICE_METRICS = (
+    ("gpu_temp", "temp", TEMP_CELSIUS),
+    ("vram_temp", "vram_temp", TEMP_CELSIUS),
+    ("hotspot_temp", "hotspot_temp", TEMP_CELSIUS),
+    ("gpu_fan_speed", "fan", PERCENTAGE),
+    ("gpu_power_usage", "power", POWER_WATT),
+)
+
+
+class StatisticsAggregator:
+    """Aggregates rig metrics into mean/min/max buckets and imports them in batches.
+
+    The recorder only accepts imported statistics on full hours, so samples are
+    aggregated per hour and each completed hour is written with one external
+    statistics import per metric.
+
+    An import replaces the statistics of its hour. The hour in progress is
+    stored, so after a restart it continues instead of being replaced by the
+    samples taken after the restart.
+    """
+
+    def __init__(self, hass: HomeAssistant, rig_name: str, entry_id: str) -> None:
+        """Init StatisticsAggregator."""
+        self._hass = hass
+        self._rig_name = rig_name
+        self._store = self._get_store(hass, entry_id)
+        self._bucket_start: datetime.datetime | None = None
+        # statistic_id -> [sum, count, min, max]
+        self._buckets: dict[str, list[float]] = {}
+        self._metadata: dict[str, StatisticMetaData] = {}
+        # Nothing is stored before the stored hour is loaded
+        self._loaded = False
+        self._save_scheduled = False
+
+    @staticmethod
+    def _get_store(hass: HomeAssistant, entry_id: str) -> Store:
+        """Store of the hour in progress of a rig."""
+        return Store(hass, STORAGE_VERSION, f"{DOMAIN}.statistics.{entry_id}")
+
+    @staticmethod
+    async def async_remove(hass: HomeAssistant, entry_id: str) -> None:
+        """Delete the stored hour of a removed rig."""
+        await StatisticsAggregator._get_store(hass, entry_id).async_remove()
+
+    async def async_load(self) -> None:
+        """Continue the stored hour, or import it if it is over."""
+        data = await self._store.async_load()
+        self._loaded = True
+        if not data or not data["buckets"]:
+            return
+        bucket_start = dt_util.parse_datetime(data["bucket_start"])
+        for statistic_id, metadata in data["metadata"].items():
+            self._metadata.setdefault(statistic_id, metadata)
+        current_start = self._bucket_start or dt_util.utcnow().replace(
+            minute=0, second=0, microsecond=0
+        )
+        if bucket_start != current_start:
+            self._import(bucket_start, data["buckets"])
+            self._async_save()
+            return
+        self._bucket_start = bucket_start
+        for statistic_id, (total, count, minimum, maximum) in data["buckets"].items():
+            bucket = self._buckets.get(statistic_id)
+            if bucket is None:
+                self._buckets[statistic_id] = [total, count, minimum, maximum]
+            else:
+                bucket[0] += total
+                bucket[1] += count
+                bucket[2] = min(bucket[2], minimum)
+                bucket[3] = max(bucket[3], maximum)
+        self._async_save()
+
+    def add_snapshot(self, mining_rig) -> None:
+        """Add the current values of a MiningRig poll."""
+        if not mining_rig.online:
+            return
+        now = dt_util.utcnow()
+        bucket_start = now.replace(minute=0, second=0, microsecond=0)
+        if self._bucket_start is not None and bucket_start != self._bucket_start:
+            self.async_flush()
+        self._bucket_start = bucket_start
+
+        for key, name, unit, value in self._metrics(mining_rig):
+            if not is_number(value):
+                continue
+            statistic_id = f"{DOMAIN}:{slugify(f'{self._rig_name}_{key}')}"
+            if statistic_id not in self._metadata:
+                self._metadata[statistic_id] = StatisticMetaData(
+                    has_mean=True,
+                    has_sum=False,
+                    name=f"{self._rig_name} {name}",
+                    source=DOMAIN,
+                    statistic_id=statistic_id,
+                    unit_of_measurement=unit,
+                )
+            bucket = self._buckets.get(statistic_id)
+            if bucket is None:
+                self._buckets[statistic_id] = [value, 1, value, value]
+            else:
+                bucket[0] += value
+                bucket[1] += 1
+                bucket[2] = min(bucket[2], value)
+                bucket[3] = max(bucket[3], value)
+        self._async_save()
+
+    def async_flush(self) -> None:
+        """Import the aggregated bucket and start a new one."""
+        if self._bucket_start is None or not self._buckets:
+            return
+        self._import(self._bucket_start, self._buckets)
+        self._buckets = {}
+        self._async_save()
+
+    async def async_shutdown(self) -> None:
+        """Import the hour so far and store it to be continued."""
+        if self._bucket_start is not None and self._buckets:
+            self._import(self._bucket_start, self._buckets)
+        if self._loaded:
+            self._save_scheduled = False
+            await self._store.async_save(self._data())
+
+    def _async_save(self) -> None:
+        """Store the hour in progress within STORAGE_SAVE_DELAY.
+
+        A save already scheduled is not pushed back, polls are more frequent
+        than the delay and would postpone it until shutdown.
+        """
+        if self._loaded and not self._save_scheduled:
+            self._save_scheduled = True
+            self._store.async_delay_save(self._scheduled_data, STORAGE_SAVE_DELAY)
+
+    def _scheduled_data(self) -> dict:
+        """Hour in progress for the scheduled save."""
+        self._save_scheduled = False
+        return self._data()
+
+    def _import(
+        self, bucket_start: datetime.datetime, buckets: dict[str, list[float]]
+    ) -> None:
+        """Import the buckets of an hour, one import per metric."""
+        for statistic_id, (total, count, minimum, maximum) in buckets.items():
+            async_add_external_statistics(
+                self._hass,
+                self._metadata[statistic_id],
+                [
+                    StatisticData(
+                        start=bucket_start,
+                        mean=total / count,
+                        min=minimum,
+                        max=maximum,
+                    )
+                ],
+            )
+
+    def _data(self) -> dict:
+        """Hour in progress in storage format."""
+        return {
+            "bucket_start": self._bucket_start and self._bucket_start.isoformat(),
+            "buckets": self._buckets,
+            "metadata": {
+                statistic_id: self._metadata[statistic_id]
+                for statistic_id in self._buckets
+            },
+        }
+
+    @staticmethod
+    def _metrics(mining_rig) -> Iterator[tuple[str, str, str, float]]:
+        """Yield key, name, unit and value of all aggregated metrics."""
+        total_power = 0
+        for device in mining_rig.devices.values():
+            for attribute, suffix, unit in DEVICE_METRICS:
+                yield (
+                    f"{device.uuid}_{suffix}",
+                    f"GPU {device.id} {suffix.replace('_', ' ')}",
+                    unit,
+                    getattr(device, attribute),
+                )
+            if is_number(device.gpu_power_usage):
+                total_power += device.gpu_power_usage
+        yield ("power", "Power", POWER_WATT, total_power)
+
+        for worker in mining_rig.workers.values():
+            for algorithm in worker.algorithms.values():
+                if is_number(algorithm.speed):
+                    yield (
+                        f"{worker.device_uuid}_{algorithm.name}",
+                        f"GPU {worker.device_id} {algorithm.name}",
+                        HASHRATE_UNIT,
+                        algorithm.speed / 1000000,
+                    )
+
+        for algorithm in mining_rig.algorithms.values():
+            if is_number(algorithm.speed):
+                yield (
+                    f"{algorithm.name}_hashrate",
+                    algorithm.name,
+                    HASHRATE_UNIT,
+                    algorithm.speed / 1000000,
+                )
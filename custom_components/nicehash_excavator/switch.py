@@ -1,16 +1,30 @@
 """Switch integration."""
 from __future__ import annotations
 
+from datetime import timedelta
+from functools import partial
+
+import voluptuous as vol
+
 from homeassistant.components.switch import SwitchEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv, entity_platform
+from homeassistant.helpers.restore_state import RestoreEntity
+from homeassistant.util import dt as dt_util
 
 from .const import (
+    ATTR_DURATION,
+    ATTR_ENDS_AT,
+    ATTR_REMAINING,
     CONFIG_NAME,
-    CONFIG_UPDATE_INTERVAL,
-    CONFIG_UPDATE_INTERVAL_FAST,
     DOMAIN,
+    MAX_FAST_UPDATE_DURATION,
+    SERVICE_ENABLE_FAST_UPDATE,
 )
+from .commands import MINING
+from .entities import async_add_filtered_entities
 from .mining_rig import MiningRig
 
 
@@ -21,13 +35,53 @@ async def async_setup_entry(
 
     mining_rig: MiningRig = hass.data[DOMAIN][config_entry.entry_id]
 
-    switch = RequestRateSwitch(hass, mining_rig, config_entry)
+    switches = [RequestRateSwitch(hass, mining_rig, config_entry)]
+    if mining_rig.enable_controls:
+        switches.append(RigMiningSwitch(mining_rig, config_entry))
+    async_add_entities(switches)
+    if mining_rig.enable_controls:
+        async_add_filtered_entities(
+            hass,
+            mining_rig,
+            config_entry,
+            async_add_entities,
+            partial(_gpu_switches, mining_rig, config_entry),
+        )
+
+    platform = entity_platform.async_get_current_platform()
+    platform.async_register_entity_service(
+        SERVICE_ENABLE_FAST_UPDATE,
+        {
+            vol.Optional(ATTR_DURATION): vol.All(
+                cv.positive_time_period,
+                vol.Range(
+                    min=timedelta(seconds=1),
+                    max=timedelta(minutes=MAX_FAST_UPDATE_DURATION),
+                ),
+            )
+        },
+        "async_enable_fast_update",
+    )
+
+
+def _gpu_switches(
+    mining_rig: MiningRig, config_entry: ConfigEntry
+) -> list[GpuMiningSwitch]:
+    """Create the switches of the GPUs kept by the rig filter."""
+    return [
+        GpuMiningSwitch(mining_rig, config_entry, device.uuid)
+        for device in mining_rig.devices.values()
+    ]
+
 
-    async_add_entities([switch])
+class RequestRateSwitch(SwitchEntity, RestoreEntity):
+    """Representation of a switch that can be toggled.
 
+    Fast update mode reverts on its own after a duration and survives a
+    restart of Home Assistant for the remaining time.
+    """
 
-class RequestRateSwitch(SwitchEntity):
-    """Representation of a switch that can be toggled."""
+    _attr_should_poll = False
 
     def __init__(
         self, hass: HomeAssistant, mining_rig: MiningRig, config_entry: ConfigEntry
@@ -37,7 +91,10 @@ class RequestRateSwitch(SwitchEntity):
         self._mining_rig = mining_rig
         self._config_entry = config_entry
         self._rig_name = config_entry.data.get(CONFIG_NAME)
-        self._state = False
+        self._attr_unique_id = f"{self._rig_name}_fast_update"
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, f"{self._rig_name} Excavator")},
+        }
 
     @property
     def name(self):
@@ -47,16 +104,162 @@ class RequestRateSwitch(SwitchEntity):
     @property
     def is_on(self):
         """Return true if device is on."""
-        return self._state
+        return self._mining_rig.fast_update
+
+    @property
+    def extra_state_attributes(self) -> dict[str, str | int | None]:
+        """End and remaining seconds of fast update mode."""
+        until = self._mining_rig.fast_update_until
+        if not self._mining_rig.fast_update or until is None:
+            return {ATTR_ENDS_AT: None, ATTR_REMAINING: None}
+        remaining = max(0, (until - dt_util.utcnow()).total_seconds())
+        return {ATTR_ENDS_AT: until.isoformat(), ATTR_REMAINING: round(remaining)}
+
+    async def async_added_to_hass(self) -> None:
+        """Resume fast update mode for the time it had left before a restart."""
+        await super().async_added_to_hass()
+        self._mining_rig.register_callback(self.async_write_ha_state)
+
+        last_state = await self.async_get_last_state()
+        if last_state is None or last_state.state != "on":
+            return
+        ends_at = dt_util.parse_datetime(
+            str(last_state.attributes.get(ATTR_ENDS_AT) or "")
+        )
+        if ends_at is None:
+            return
+        remaining = (ends_at - dt_util.utcnow()).total_seconds()
+        if remaining > 0:
+            self._mining_rig.set_fast_update(True, remaining)
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Stop listening to the MiningRig."""
+        self._mining_rig.remove_callback(self.async_write_ha_state)
 
     async def async_turn_on(self, **args):
         """Turn the device on."""
-        update_interval = self._config_entry.data.get(CONFIG_UPDATE_INTERVAL_FAST)
-        self._mining_rig.set_update_interval(self._hass, update_interval)
-        self._state = True
+        self._mining_rig.set_fast_update(True)
+        self.async_write_ha_state()
 
     async def async_turn_off(self, **args):
         """Turn the device off."""
-        update_interval = self._config_entry.data.get(CONFIG_UPDATE_INTERVAL)
-        self._mining_rig.set_update_interval(self._hass, update_interval)
-        self._state = False
+        self._mining_rig.set_fast_update(False)
+        self.async_write_ha_state()
+
+    async def async_enable_fast_update(self, duration: timedelta | None = None):
+        """Turn fast update mode on for a duration instead of the default one."""
+        self._mining_rig.set_fast_update(
+            True, None if duration is None else duration.total_seconds()
+        )
+        self.async_write_ha_state()
+
+
+class GpuMiningSwitch(SwitchEntity):
+    """Pause and resume the workers of a GPU through the CommandQueue."""
+
+    _attr_should_poll = False
+    _attr_icon = "mdi:pickaxe"
+
+    def __init__(
+        self, mining_rig: MiningRig, config_entry: ConfigEntry, device_uuid: str
+    ) -> None:
+        """Initialize the switch."""
+        self._mining_rig = mining_rig
+        self._device_uuid = device_uuid
+        rig_name = config_entry.data.get(CONFIG_NAME)
+        device = mining_rig.get_device_by_uuid(device_uuid)
+        self.filter_subject = {"device_id": device.id, "device_uuid": device_uuid}
+        self._attr_name = f"{rig_name} GPU {device.id} mining"
+        self._attr_unique_id = f"{rig_name}_{device_uuid}_mining"
+        self._attr_device_info = {"identifiers": {(DOMAIN, device_uuid)}}
+
+    @property
+    def available(self) -> bool:
+        """Return True if the GPU is reported by the rig."""
+        return (
+            self._mining_rig.online
+            and self._mining_rig.get_device_by_uuid(self._device_uuid) is not None
+        )
+
+    @property
+    def is_on(self):
+        """Return true if the GPU runs a worker, or is about to."""
+        desired = self._mining_rig.commands.desired(MINING, self._device_uuid)
+        if desired is not None:
+            return desired
+        device = self._mining_rig.get_device_by_uuid(self._device_uuid)
+        return device is not None and bool(
+            self._mining_rig.get_workers_for_device(device.id)
+        )
+
+    async def async_added_to_hass(self) -> None:
+        """Run when this Entity has been added to HA."""
+        self._mining_rig.register_callback(self.async_write_ha_state)
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Entity being removed from hass."""
+        self._mining_rig.remove_callback(self.async_write_ha_state)
+
+    async def async_turn_on(self, **args):
+        """Resume the algorithms mined before the pause."""
+        commands = self._mining_rig.commands
+        if not self.is_on and not commands.can_resume(self._device_uuid):
+            raise HomeAssistantError(f"No algorithm known to resume {self.name}")
+        commands.set_mining(self._device_uuid, True)
+        self.async_write_ha_state()
+
+    async def async_turn_off(self, **args):
+        """Pause all workers of the GPU."""
+        self._mining_rig.commands.set_mining(self._device_uuid, False)
+        self.async_write_ha_state()
+
+
+class RigMiningSwitch(SwitchEntity):
+    """Pause and resume all GPUs of a rig in a single batch."""
+
+    _attr_should_poll = False
+    _attr_icon = "mdi:pickaxe"
+
+    def __init__(self, mining_rig: MiningRig, config_entry: ConfigEntry) -> None:
+        """Initialize the switch."""
+        self._mining_rig = mining_rig
+        rig_name = config_entry.data.get(CONFIG_NAME)
+        self._attr_name = f"{rig_name} mining"
+        self._attr_unique_id = f"{rig_name}_mining"
+        self._attr_device_info = {"identifiers": {(DOMAIN, f"{rig_name} Excavator")}}
+
+    @property
+    def available(self) -> bool:
+        """Return True if mining rig is available."""
+        return self._mining_rig.online
+
+    @property
+    def is_on(self):
+        """Return true if any GPU runs a worker, or is about to."""
+        for device in self._mining_rig.devices.values():
+            desired = self._mining_rig.commands.desired(MINING, device.uuid)
+            if desired is None:
+                desired = bool(self._mining_rig.get_workers_for_device(device.id))
+            if desired:
+                return True
+        return False
+
+    async def async_added_to_hass(self) -> None:
+        """Run when this Entity has been added to HA."""
+        self._mining_rig.register_callback(self.async_write_ha_state)
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Entity being removed from hass."""
+        self._mining_rig.remove_callback(self.async_write_ha_state)
+
+    async def async_turn_on(self, **args):
+        """Resume all paused GPUs."""
+        for device in self._mining_rig.devices.values():
+            self._mining_rig.commands.set_mining(device.uuid, True)
+        self.async_write_ha_state()
+
+    async def async_turn_off(self, **args):
+        """Pause all GPUs."""
+        for device in self._mining_rig.devices.values():
+            self._mining_rig.commands.set_mining(device.uuid, False)
+        self.async_write_ha_state()
@@ -0,0 +1,207 @@
+"""Live per-poll telemetry for websocket subscribers."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import (
+    DEFAULT_TELEMETRY_INTERVAL,
+    DOMAIN,
+    MAX_TELEMETRY_INTERVAL,
+    MIN_TELEMETRY_INTERVAL,
+)
+from .data_containers import is_number
+
+RIG_SLOT = "rig"
+
+# metric, value accessor on a GraphicsCard
+DEVICE_METRICS: tuple[tuple[str, Callable], ...] = (
+    ("temp", lambda d: d.gpu_temp),
+    ("vram_temp", lambda d: d.vram_temp),
+    ("hotspot_temp", lambda d: d.hotspot_temp),
+    ("fan", lambda d: d.gpu_fan_speed),
+    ("power", lambda d: d.gpu_power_usage),
+    ("load", lambda d: d.gpu_load),
+    ("too_hot", lambda d: d.too_hot),
+)
+
+
+def _value(value: Any) -> Any:
+    """Round floats, the deltas are for display."""
+    if isinstance(value, float):
+        return round(value, 2)
+    return value
+
+
+def take_snapshot(mining_rig) -> dict[str, dict[str, Any]]:
+    """Current metrics keyed by GPU slot, rig metrics under RIG_SLOT."""
+    info = mining_rig.info
+    slots: dict[str, dict[str, Any]] = {
+        RIG_SLOT: {
+            "online": mining_rig.online,
+            "cpu": _value(getattr(info, "cpu_load", None)),
+            "ram": _value(getattr(info, "ram_load", None)),
+        }
+    }
+    if not mining_rig.online:
+        return slots
+    for device in mining_rig.devices.values():
+        slots[str(device.id)] = {
+            metric: _value(value_fn(device)) for metric, value_fn in DEVICE_METRICS
+        }
+    for worker in mining_rig.workers.values():
+        metrics = slots.get(str(worker.device_id))
+        if metrics is None:
+            continue
+        for algorithm in worker.algorithms.values():
+            if is_number(algorithm.speed):
+                # Mh/s like the hashrate sensors
+                metrics[f"hashrate_{algorithm.name}"] = round(algorithm.speed / 1e6, 2)
+    return slots
+
+
+def diff_snapshots(
+    old: dict[str, dict[str, Any]], new: dict[str, dict[str, Any]]
+) -> dict[str, dict[str, Any] | None]:
+    """Changed metrics per slot, None for slots that are gone.
+
+    Metrics missing from a slot are sent as None.
+    """
+    delta: dict[str, dict[str, Any] | None] = {}
+    for slot, metrics in new.items():
+        old_metrics = old.get(slot)
+        if old_metrics is None:
+            delta[slot] = dict(metrics)
+            continue
+        changed = {
+            metric: value
+            for metric, value in metrics.items()
+            if old_metrics.get(metric, None) != value or metric not in old_metrics
+        }
+        changed.update({metric: None for metric in old_metrics.keys() - metrics.keys()})
+        if changed:
+            delta[slot] = changed
+    for slot in old.keys() - new.keys():
+        delta[slot] = None
+    return delta
+
+
+def merge_delta(
+    pending: dict[str, dict[str, Any] | None], delta: dict[str, dict[str, Any] | None]
+) -> None:
+    """Fold a delta into deltas not sent yet, the latest value wins."""
+    for slot, metrics in delta.items():
+        if metrics is None or pending.get(slot, {}) is None:
+            pending[slot] = None if metrics is None else dict(metrics)
+        else:
+            pending.setdefault(slot, {}).update(metrics)
+
+
+class TelemetrySubscription:
+    """Sends the deltas of a rig to one websocket client.
+
+    Deltas arriving faster than the interval are merged, so a slow or busy
+    client receives at most one message per interval and the memory held for
+    it never exceeds one value per metric and slot.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        interval: float,
+        send: Callable[[dict[str, Any]], None],
+    ) -> None:
+        """Init TelemetrySubscription."""
+        self._hass = hass
+        self._interval = interval
+        self._send = send
+        self._pending: dict[str, dict[str, Any] | None] = {}
+        self._cancel_flush = None
+
+    def add_delta(self, delta: dict[str, dict[str, Any] | None]) -> None:
+        """Queue a delta, flushed at most once per interval."""
+        merge_delta(self._pending, delta)
+        if self._cancel_flush is None:
+            self._flush()
+
+    @callback
+    def _flush(self, now=None) -> None:
+        """Send the merged deltas, then wait for the interval."""
+        self._cancel_flush = None
+        if not self._pending:
+            return
+        self._send({"slots": self._pending})
+        self._pending = {}
+        self._cancel_flush = async_call_later(self._hass, self._interval, self._flush)
+
+    def cancel(self) -> None:
+        """Drop the pending deltas."""
+        if self._cancel_flush is not None:
+            self._cancel_flush()
+            self._cancel_flush = None
+        self._pending = {}
+
+
+class TelemetryStream:
+    """Deltas between the polls of a rig, computed only while subscribed."""
+
+    def __init__(self) -> None:
+        """Init TelemetryStream."""
+        self.subscriptions: set[TelemetrySubscription] = set()
+        self.snapshot: dict[str, dict[str, Any]] = {}
+
+    def update(self, mining_rig) -> None:
+        """Send the changes of the latest poll to all subscriptions."""
+        snapshot = take_snapshot(mining_rig)
+        delta = diff_snapshots(self.snapshot, snapshot)
+        self.snapshot = snapshot
+        if delta:
+            for subscription in self.subscriptions:
+                subscription.add_delta(delta)
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): f"{DOMAIN}/telemetry/subscribe",
+        vol.Required("entry_id"): str,
+        vol.Optional("interval", default=DEFAULT_TELEMETRY_INTERVAL): vol.All(
+            vol.Coerce(float),
+            vol.Range(min=MIN_TELEMETRY_INTERVAL, max=MAX_TELEMETRY_INTERVAL),
+        ),
+    }
+)
+@callback
+def websocket_subscribe_telemetry(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict
+) -> None:
+    """Stream the per-poll deltas of a rig, starting with a full snapshot."""
+    mining_rig = hass.data.get(DOMAIN, {}).get(msg["entry_id"])
+    if mining_rig is None:
+        connection.send_error(msg["id"], websocket_api.ERR_NOT_FOUND, "Unknown rig")
+        return
+
+    @callback
+    def send(data: dict[str, Any]) -> None:
+        connection.send_message(websocket_api.event_message(msg["id"], data))
+
+    stream: TelemetryStream = mining_rig.telemetry
+    if not stream.subscriptions:
+        # Not kept up to date without subscribers
+        stream.snapshot = take_snapshot(mining_rig)
+    subscription = TelemetrySubscription(hass, msg["interval"], send)
+    stream.subscriptions.add(subscription)
+
+    @callback
+    def unsubscribe() -> None:
+        subscription.cancel()
+        stream.subscriptions.discard(subscription)
+
+    connection.subscriptions[msg["id"]] = unsubscribe
+    connection.send_result(msg["id"])
+    send({"name": mining_rig.name, "full": True, "slots": stream.snapshot})
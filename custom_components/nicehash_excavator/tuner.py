@@ -0,0 +1,304 @@
+"""Search for the most efficient power limit of a GPU."""
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+import logging
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    DOMAIN,
+    MAX_POWER_LIMIT,
+    MIN_POWER_LIMIT,
+    TUNER_OFFLINE_TIMEOUT,
+    TUNER_SETTLE_TIME,
+    TUNER_STEP,
+    TUNER_WINDOW,
+)
+from .data_containers import is_number
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 10  # seconds
+
+
+@dataclass
+class TuningResult:
+    """Measured operating point of a power limit."""
+
+    power_limit: float
+    hashrate: float  # H/s
+    power: float  # W
+
+    @property
+    def efficiency(self) -> float:
+        """Hashes per joule."""
+        return self.hashrate / self.power
+
+
+class PowerLimitTuner:
+    """Steps the power limit of one GPU down while the efficiency improves.
+
+    Each power limit is measured after TUNER_SETTLE_TIME for TUNER_WINDOW
+    seconds. The search stops at the first limit that is less efficient
+    than the best one so far, or at min_limit, and ends on the best limit.
+    A limit at which the GPU gets hotter than max_temp is skipped.
+    The tuner only sees samples and returns power limits, so it runs the
+    same against a real or a simulated GPU.
+    """
+
+    def __init__(
+        self,
+        start_limit: float,
+        max_temp: float,
+        min_limit: float = MIN_POWER_LIMIT,
+        step: float = TUNER_STEP,
+        settle_time: float = TUNER_SETTLE_TIME,
+        window: float = TUNER_WINDOW,
+    ) -> None:
+        """Init PowerLimitTuner."""
+        self.start_limit = start_limit
+        self.limit = start_limit
+        self.best: TuningResult | None = None
+        self.done = False
+        self._max_temp = max_temp
+        self._min_limit = min_limit
+        self._step = step
+        self._settle_time = settle_time
+        self._window = window
+        self._changed_at: float | None = None
+        self._hashrate_sum = 0.0
+        self._power_sum = 0.0
+        self._samples = 0
+
+    def add_sample(
+        self, now: float, hashrate: float, power: float, temp: float
+    ) -> float | None:
+        """Add a poll of the GPU, return a power limit to set or None."""
+        if self.done:
+            return None
+        if self._changed_at is None:
+            self._changed_at = now
+        elapsed = now - self._changed_at
+        if elapsed < self._settle_time:
+            return None
+        if temp > self._max_temp:
+            _LOGGER.debug("%s W too hot at %s °C", self.limit, temp)
+            return self._next(now)
+        self._hashrate_sum += hashrate
+        self._power_sum += power
+        self._samples += 1
+        if elapsed < self._settle_time + self._window or not self._power_sum:
+            return None
+
+        result = TuningResult(
+            self.limit,
+            self._hashrate_sum / self._samples,
+            self._power_sum / self._samples,
+        )
+        _LOGGER.debug(
+            "%s W: %.0f H/s at %.1f W", self.limit, result.hashrate, result.power
+        )
+        if self.best is None or result.efficiency > self.best.efficiency:
+            self.best = result
+            return self._next(now)
+        return self._finish()
+
+    def restart_measurement(self) -> None:
+        """Settle and measure the current power limit again."""
+        self._changed_at = None
+        self._hashrate_sum = self._power_sum = 0.0
+        self._samples = 0
+
+    def _next(self, now: float) -> float | None:
+        """Move on to the next lower power limit."""
+        if self.limit - self._step < self._min_limit:
+            return self._finish()
+        self.limit -= self._step
+        self._changed_at = now
+        self._hashrate_sum = self._power_sum = 0.0
+        self._samples = 0
+        return self.limit
+
+    def _finish(self) -> float | None:
+        """End on the best power limit, or the start limit without a result."""
+        self.done = True
+        self.limit = self.start_limit if self.best is None else self.best.power_limit
+        return self.limit
+
+
+class EfficiencyTuner:
+    """Runs PowerLimitTuners for the GPUs of a rig and keeps their results.
+
+    Results are stored per GPU uuid and algorithm, so they survive restarts
+    and a GPU moving to another slot. A search pauses while its GPU is
+    unreachable or not mining and is aborted after TUNER_OFFLINE_TIMEOUT. An
+    aborted search restores its start limit, once the GPU is back if it is
+    unreachable.
+    """
+
+    def __init__(self, hass: HomeAssistant, mining_rig) -> None:
+        """Init EfficiencyTuner."""
+        self._mining_rig = mining_rig
+        self._store = self._get_store(hass, mining_rig.entry_id)
+        # device uuid -> algorithm name -> result
+        self._results: dict[str, dict[str, TuningResult]] = {}
+        # device uuid -> (algorithm name, tuner)
+        self._sessions: dict[str, tuple[str, PowerLimitTuner]] = {}
+        # device uuid -> time the GPU of a running search became unreachable
+        self._missing_since: dict[str, float] = {}
+        # device uuid -> power limit to restore once the GPU is reachable
+        self._restore: dict[str, float] = {}
+
+    @staticmethod
+    def _get_store(hass: HomeAssistant, entry_id: str) -> Store:
+        """Store of the results of a rig."""
+        return Store(hass, STORAGE_VERSION, f"{DOMAIN}.tuner.{entry_id}")
+
+    @staticmethod
+    async def async_remove(hass: HomeAssistant, entry_id: str) -> None:
+        """Delete the stored results of a removed rig."""
+        await EfficiencyTuner._get_store(hass, entry_id).async_remove()
+
+    async def async_load(self) -> None:
+        """Load the stored results."""
+        data = await self._store.async_load() or {}
+        self._results = {
+            device_uuid: {
+                algorithm: TuningResult(**result)
+                for algorithm, result in results.items()
+            }
+            for device_uuid, results in data.items()
+        }
+
+    def get_result(self, device_uuid: str, algorithm_name: str) -> TuningResult | None:
+        """Result of the last finished search."""
+        return self._results.get(device_uuid, {}).get(algorithm_name)
+
+    def get_algorithm(self, device_uuid: str) -> str | None:
+        """The single algorithm a GPU mines, None for none or several."""
+        rig = self._mining_rig
+        device = rig.get_device_by_uuid(device_uuid)
+        if device is None:
+            return None
+        names = {
+            algorithm.name
+            for worker in rig.get_workers_for_device(device.id)
+            for algorithm in worker.algorithms.values()
+        }
+        return names.pop() if len(names) == 1 else None
+
+    def is_tuning(self, device_uuid: str) -> bool:
+        """Return True while a search runs for the GPU."""
+        return device_uuid in self._sessions
+
+    def start(self, device_uuid: str, max_temp: float) -> bool:
+        """Start a search from the current power limit, False if not possible."""
+        rig = self._mining_rig
+        device = rig.get_device_by_uuid(device_uuid)
+        algorithm_name = self.get_algorithm(device_uuid)
+        if device is None or algorithm_name is None:
+            return False
+        start_limit = rig.commands.power_limits.get(device_uuid)
+        if start_limit is None:
+            if not is_number(device.gpu_power_usage):
+                return False
+            # Round the current draw up to the next step
+            start_limit = -(-device.gpu_power_usage // TUNER_STEP) * TUNER_STEP
+        start_limit = min(max(start_limit, MIN_POWER_LIMIT), MAX_POWER_LIMIT)
+        self._restore.pop(device_uuid, None)
+        self._sessions[device_uuid] = (
+            algorithm_name,
+            PowerLimitTuner(start_limit, max_temp),
+        )
+        rig.commands.set_power_limit(device_uuid, start_limit)
+        _LOGGER.info(
+            "%s: tuning GPU %s for %s from %s W",
+            rig.name,
+            device.id,
+            algorithm_name,
+            start_limit,
+        )
+        return True
+
+    def stop(self, device_uuid: str) -> None:
+        """Abort a search and go back to its start limit."""
+        self._missing_since.pop(device_uuid, None)
+        session = self._sessions.pop(device_uuid, None)
+        if session is None:
+            return
+        rig = self._mining_rig
+        if rig.online and rig.get_device_by_uuid(device_uuid) is not None:
+            rig.commands.set_power_limit(device_uuid, session[1].start_limit)
+        else:
+            self._restore[device_uuid] = session[1].start_limit
+
+    def add_snapshot(self, now: float) -> None:
+        """Feed the current poll to the running searches."""
+        rig = self._mining_rig
+        for device_uuid, limit in list(self._restore.items()):
+            if rig.online and rig.get_device_by_uuid(device_uuid) is not None:
+                del self._restore[device_uuid]
+                rig.commands.set_power_limit(device_uuid, limit)
+        for device_uuid, (algorithm_name, tuner) in list(self._sessions.items()):
+            current_algorithm = self.get_algorithm(device_uuid) if rig.online else None
+            if current_algorithm is None:
+                # Rig offline, GPU gone or workers not running (yet)
+                missing_since = self._missing_since.setdefault(device_uuid, now)
+                if now - missing_since >= TUNER_OFFLINE_TIMEOUT:
+                    _LOGGER.warning(
+                        "%s: GPU %s not mining for %s s, tuning aborted",
+                        rig.name,
+                        device_uuid,
+                        TUNER_OFFLINE_TIMEOUT,
+                    )
+                    self.stop(device_uuid)
+                continue
+            if self._missing_since.pop(device_uuid, None) is not None:
+                # Excavator may have restarted and lost the power limit
+                tuner.restart_measurement()
+                rig.commands.set_power_limit(device_uuid, tuner.limit)
+            if current_algorithm != algorithm_name:
+                _LOGGER.warning(
+                    "%s: GPU %s stopped mining %s, tuning aborted",
+                    rig.name,
+                    device_uuid,
+                    algorithm_name,
+                )
+                self.stop(device_uuid)
+                continue
+            device = rig.get_device_by_uuid(device_uuid)
+            algorithm = rig.get_worker_algorithm(device_uuid, algorithm_name)
+            if algorithm is None:
+                continue
+            values = (algorithm.speed, device.gpu_power_usage, device.gpu_temp)
+            if not all(is_number(value) for value in values):
+                continue
+            limit = tuner.add_sample(now, *values)
+            if limit is not None:
+                rig.commands.set_power_limit(device_uuid, limit)
+            if tuner.done:
+                del self._sessions[device_uuid]
+                if tuner.best is not None:
+                    self._results.setdefault(device_uuid, {})[
+                        algorithm_name
+                    ] = tuner.best
+                    self._store.async_delay_save(self._data, STORAGE_SAVE_DELAY)
+                _LOGGER.info(
+                    "%s: GPU %s tuned for %s to %s W",
+                    rig.name,
+                    device.id,
+                    algorithm_name,
+                    tuner.limit,
+                )
+
+    def _data(self) -> dict:
+        """Results in storage format."""
+        return {
+            device_uuid: {
+                algorithm: asdict(result) for algorithm, result in results.items()
+            }
+            for device_uuid, results in self._results.items()
+        }
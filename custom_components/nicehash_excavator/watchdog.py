@@ -0,0 +1,125 @@
+"""Detect stalled workers and schedule their restart."""
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+
+from .commands import MINING
+from .const import (
+    ANOMALY_BASELINE_WEIGHT,
+    WATCHDOG_BACKOFF,
+    WATCHDOG_BACKOFF_RESET,
+    WATCHDOG_BUDGET_WINDOW,
+    WATCHDOG_COLLAPSE_RATIO,
+    WATCHDOG_MAX_BACKOFF,
+    WATCHDOG_RESTART_BUDGET,
+)
+from .data_containers import is_number
+
+
+@dataclass
+class Restart:
+    """A worker restart decided by the watchdog."""
+
+    device_uuid: str
+    device_id: int
+    algorithm: str
+    reason: str
+    attempt: int
+
+
+class WorkerWatchdog:
+    """Finds workers without hashrate for longer than the grace period.
+
+    A worker is stalled at zero hashrate or below WATCHDOG_COLLAPSE_RATIO of
+    its rolling baseline. Restarts of a GPU back off exponentially from
+    WATCHDOG_BACKOFF up to WATCHDOG_MAX_BACKOFF, and the backoff is reset once
+    the GPU ran WATCHDOG_BACKOFF_RESET seconds after its last restart. A rig
+    restarts at most WATCHDOG_RESTART_BUDGET workers per
+    WATCHDOG_BUDGET_WINDOW, so a broken rig is not restarted in a loop.
+    """
+
+    def __init__(self, grace_period: float) -> None:
+        """Init WorkerWatchdog."""
+        self.grace_period = grace_period
+        self.budget_exhausted = False
+        # (uuid, algorithm name) -> timestamp the worker stalled
+        self._stalled_since: dict[tuple[str, str], float] = {}
+        # (uuid, algorithm name) -> rolling baseline speed
+        self._baselines: dict[tuple[str, str], float] = {}
+        # uuid -> (restart count, timestamp of the last restart)
+        self._attempts: dict[str, tuple[int, float]] = {}
+        self._restarts: deque[float] = deque()
+
+    def check(self, mining_rig, now: float) -> list[Restart]:
+        """Return the workers to restart after the current poll."""
+        while self._restarts and now - self._restarts[0] >= WATCHDOG_BUDGET_WINDOW:
+            self._restarts.popleft()
+        if len(self._restarts) < WATCHDOG_RESTART_BUDGET:
+            self.budget_exhausted = False
+
+        restarts: list[Restart] = []
+        seen = set()
+        for worker in mining_rig.workers.values():
+            for algorithm in worker.algorithms.values():
+                if not is_number(algorithm.speed):
+                    continue
+                key = (worker.device_uuid, algorithm.name)
+                seen.add(key)
+                if mining_rig.commands.desired(MINING, worker.device_uuid) is not None:
+                    # Paused or resumed on purpose, not confirmed yet
+                    self._stalled_since.pop(key, None)
+                    continue
+
+                baseline = self._baselines.get(key)
+                if algorithm.speed <= 0:
+                    reason = "no hashrate"
+                elif (
+                    baseline is not None
+                    and algorithm.speed < baseline * WATCHDOG_COLLAPSE_RATIO
+                ):
+                    reason = "hashrate collapsed"
+                else:
+                    self._stalled_since.pop(key, None)
+                    if baseline is None:
+                        self._baselines[key] = algorithm.speed
+                    else:
+                        self._baselines[key] = baseline + ANOMALY_BASELINE_WEIGHT * (
+                            algorithm.speed - baseline
+                        )
+                    attempts = self._attempts.get(worker.device_uuid)
+                    if attempts and now - attempts[1] >= WATCHDOG_BACKOFF_RESET:
+                        del self._attempts[worker.device_uuid]
+                    continue
+
+                stalled_since = self._stalled_since.setdefault(key, now)
+                if now - stalled_since < self.grace_period:
+                    continue
+                if any(r.device_uuid == worker.device_uuid for r in restarts):
+                    continue
+                count, last_restart = self._attempts.get(worker.device_uuid, (0, None))
+                if last_restart is not None and now - last_restart < min(
+                    WATCHDOG_BACKOFF * 2 ** (count - 1), WATCHDOG_MAX_BACKOFF
+                ):
+                    continue
+                if len(self._restarts) >= WATCHDOG_RESTART_BUDGET:
+                    self.budget_exhausted = True
+                    continue
+
+                self._restarts.append(now)
+                self._attempts[worker.device_uuid] = (count + 1, now)
+                # The restarted worker gets the full grace period again
+                self._stalled_since[key] = now
+                restarts.append(
+                    Restart(
+                        worker.device_uuid,
+                        worker.device_id,
+                        algorithm.name,
+                        reason,
+                        count + 1,
+                    )
+                )
+
+        for key in self._stalled_since.keys() - seen:
+            del self._stalled_since[key]
+        return restarts
@@ -0,0 +1,134 @@
+"""Benchmark decoding and parsing of Excavator devices.get responses.
+
+Compares the stdlib json module, as used by response.json(), with orjson
+and times the PayloadParser extracting the fields the integration uses.
+Runs on synthetic responses of several rig sizes, or on captured
+responses passed as files.
+
+    python scripts/bench_decode.py
+    python scripts/bench_decode.py --gpus 1 8 64 --number 2000
+    python scripts/bench_decode.py devices_get.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import timeit
+import types
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Load the parser without the integration __init__, which needs Home Assistant
+PACKAGE = "custom_components.nicehash_excavator"
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for name, path in (
+    ("custom_components", os.path.join(ROOT, "custom_components")),
+    (PACKAGE, os.path.join(ROOT, "custom_components", "nicehash_excavator")),
+):
+    module = types.ModuleType(name)
+    module.__path__ = [path]
+    sys.modules.setdefault(name, module)
+
+from custom_components.nicehash_excavator.parser import PayloadParser  # noqa: E402
+
+
+def sample_device(device_id: int) -> dict:
+    """A devices.get record with the fields Excavator 1.7 reports."""
+    return {
+        "device_id": device_id,
+        "intensity": 0,
+        "name": "GeForce RTX 3070",
+        "gpu_temp": 62,
+        "__vram_temp": 82,
+        "__hotspot_temp": 74,
+        "gpu_load": 100,
+        "gpu_load_memctrl": 90,
+        "gpu_power_usage": 121.4,
+        "gpu_power_limit_current": 130.0,
+        "gpu_power_limit_min": 100.0,
+        "gpu_power_limit_max": 240.0,
+        "gpu_fan_speed": 64,
+        "gpu_fan_speed_rpm": 1850,
+        "too_hot": False,
+        "uuid": f"GPU-sample-{device_id:04d}",
+        "subvendor": "1458",
+        "details": {
+            "cuda_id": device_id,
+            "sm_major": 8,
+            "sm_minor": 6,
+            "bus_id": device_id + 1,
+            "memory_size": 8589934592,
+            "memory_free": 3221225472,
+            "clock_core": 1500,
+            "clock_memory": 7000,
+            "clock_core_max": 2100,
+            "clock_memory_max": 7001,
+            "kernel_times": [0.012, 0.013, 0.012, 0.013],
+        },
+    }
+
+
+def sample_response(gpus: int) -> bytes:
+    """Encoded devices.get response of a rig with this many GPUs."""
+    response = {
+        "id": 1,
+        "error": None,
+        "devices": [sample_device(device_id) for device_id in range(gpus)],
+    }
+    return json.dumps(response).encode()
+
+
+def bench(label: str, body: bytes, number: int) -> None:
+    """Print the time per response of each decoder, with and without parsing."""
+    parser = PayloadParser()
+    decoders = {"json": lambda: json.loads(body.decode("utf-8"))}
+    if orjson is not None:
+        decoders["orjson"] = lambda: orjson.loads(body)
+    results = []
+    for name, decode in decoders.items():
+        decode_time = min(timeit.repeat(decode, number=number, repeat=5)) / number
+        parse_time = (
+            min(
+                timeit.repeat(
+                    lambda: parser.parse_devices(decode()), number=number, repeat=5
+                )
+            )
+            / number
+        )
+        results.append(f"{name} {decode_time * 1e6:8.1f} {parse_time * 1e6:8.1f}")
+    print(f"{label:>14} {len(body):>8} B  " + "  ".join(results))
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("files", nargs="*", help="captured devices.get responses")
+    parser.add_argument(
+        "--gpus",
+        type=int,
+        nargs="+",
+        default=[1, 8, 32, 128],
+        help="GPU counts of the synthetic responses (default: %(default)s)",
+    )
+    parser.add_argument("--number", type=int, default=1000, help="runs per measurement")
+    args = parser.parse_args()
+
+    if orjson is None:
+        print("orjson is not installed, only the stdlib json module is measured")
+    print("microseconds per response: decode only, decode and parse")
+    if args.files:
+        for path in args.files:
+            with open(path, "rb") as file:
+                bench(os.path.basename(path), file.read(), args.number)
+        return
+    for gpus in args.gpus:
+        bench(f"{gpus} GPUs", sample_response(gpus), args.number)
+
+
+if __name__ == "__main__":
+    main()
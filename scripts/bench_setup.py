@@ -0,0 +1,161 @@
+"""Benchmark the sensor setup of a rig in normal and compact mode.
+
+Feeds a synthetic snapshot from the push sidecar into a MiningRig, adds the
+sensors of the rig to an entity platform of a bare Home Assistant instance
+and reports the entity count, the setup time and the memory allocated
+during setup. Needs Home Assistant installed, Excavator is not contacted.
+
+    python scripts/bench_setup.py
+    python scripts/bench_setup.py --gpus 8 32 --workers-per-gpu 2
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from datetime import timedelta
+import logging
+import os
+import sys
+import tempfile
+from time import perf_counter
+import tracemalloc
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry, entity_platform, entity_registry
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "sidecar")]
+
+# pylint: disable=wrong-import-position
+from custom_components.nicehash_excavator import sensor  # noqa: E402
+from custom_components.nicehash_excavator.const import (  # noqa: E402
+    CONFIG_COMPACT_MODE,
+    CONFIG_HOST_ADDRESS,
+    CONFIG_HOST_PORT,
+    CONFIG_NAME,
+    CONFIG_UPDATE_INTERVAL,
+    CONFIG_UPDATE_INTERVAL_FAST,
+    DATA_FARM,
+    DOMAIN,
+)
+from custom_components.nicehash_excavator.farm import Farm  # noqa: E402
+from custom_components.nicehash_excavator.mining_rig import MiningRig  # noqa: E402
+from excavator_push import sample_snapshot  # noqa: E402
+
+
+def add_workers(snapshot: dict, workers_per_gpu: int) -> dict:
+    """Run more algorithms per GPU, each gets its own worker sensor."""
+    for worker in snapshot["worker.list"]["workers"]:
+        algorithm = worker["algorithms"][0]
+        worker["algorithms"] = [
+            {**algorithm, "id": algorithm["id"] + index, "name": f"algorithm{index}"}
+            for index in range(workers_per_gpu)
+        ]
+    return snapshot
+
+
+async def setup_rig(
+    hass: HomeAssistant, name: str, snapshot: dict, compact: bool
+) -> tuple:
+    """Set up the sensors of one rig, return entity count, seconds and bytes.
+
+    The farm sensors are left out, they exist once per installation.
+    """
+    config_entry = ConfigEntry(
+        version=2,
+        domain=DOMAIN,
+        title="Bench",
+        data={
+            CONFIG_NAME: name,
+            CONFIG_HOST_ADDRESS: "127.0.0.1",
+            CONFIG_HOST_PORT: 18000,
+            CONFIG_UPDATE_INTERVAL: 3600,
+            CONFIG_UPDATE_INTERVAL_FAST: 3600,
+            CONFIG_COMPACT_MODE: compact,
+        },
+        source="user",
+    )
+    mining_rig = MiningRig(hass, config_entry, hass.data[DATA_FARM])
+    await mining_rig.async_push(snapshot)
+    hass.data.setdefault(DOMAIN, {})[config_entry.entry_id] = mining_rig
+
+    platform = entity_platform.EntityPlatform(
+        hass=hass,
+        logger=logging.getLogger(__name__),
+        domain="sensor",
+        platform_name=DOMAIN,
+        platform=None,
+        scan_interval=timedelta(seconds=30),
+        entity_namespace=None,
+    )
+    platform.config_entry = config_entry
+    entity_platform.current_platform.set(platform)
+    entities = []
+
+    def add_entities(new_entities, update_before_add=False):
+        entities.extend(new_entities)
+
+    tracemalloc.start()
+    started = perf_counter()
+    await sensor.async_setup_entry(hass, config_entry, add_entities)
+    await platform.async_add_entities(entities)
+    elapsed = perf_counter() - started
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    mining_rig.async_shutdown()
+    await platform.async_reset()
+    return len(entities), elapsed, allocated
+
+
+async def run(gpu_counts: list[int], workers_per_gpu: int) -> None:
+    """Set up a rig of each size in both modes and print the results."""
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant()
+        hass.config.config_dir = config_dir
+        await device_registry.async_load(hass)
+        await entity_registry.async_load(hass)
+        hass.data[DATA_FARM] = farm = Farm()
+        # Hosted elsewhere, so the benchmarked rigs do not add the farm sensors
+        farm.add_host("bench", lambda: None)
+        await hass.async_start()
+
+        print(f"{'GPUs':>5} {'mode':>8} {'entities':>9} {'setup ms':>9} {'KiB':>8}")
+        for gpus in gpu_counts:
+            snapshot = add_workers(sample_snapshot(gpus), workers_per_gpu)
+            for compact in (False, True):
+                mode = "compact" if compact else "normal"
+                count, elapsed, allocated = await setup_rig(
+                    hass, f"Bench {gpus} {mode}", snapshot, compact
+                )
+                print(
+                    f"{gpus:>5} {mode:>8} "
+                    f"{count:>9} {elapsed * 1000:>9.1f} {allocated / 1024:>8.0f}"
+                )
+
+        await hass.async_stop(force=True)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--gpus",
+        type=int,
+        nargs="+",
+        default=[1, 8, 32],
+        help="GPU counts of the rigs (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--workers-per-gpu",
+        type=int,
+        default=1,
+        help="algorithms per GPU (default: %(default)s)",
+    )
+    args = parser.parse_args()
+    asyncio.run(run(args.gpus, args.workers_per_gpu))
+
+
+if __name__ == "__main__":
+    main()
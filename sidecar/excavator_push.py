@@ -0,0 +1,151 @@
+"""Push Excavator snapshots to the Home Assistant webhook of a rig.
+
+Runs next to Excavator, reads its local API and posts the unmodified
+responses of info, devices.get, algorithm.list and worker.list to the
+webhook shown when push is enabled for the rig in Home Assistant.
+
+Only the Python standard library is used.
+
+    python excavator_push.py http://homeassistant.local:8123/api/webhook/<id>
+    python excavator_push.py <webhook url> --excavator http://127.0.0.1:18000
+    python excavator_push.py <webhook url> --sample 8 --once
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import random
+import time
+from urllib import parse, request
+
+_LOGGER = logging.getLogger("excavator_push")
+
+METHODS = ("info", "devices.get", "algorithm.list", "worker.list")
+
+
+def query_excavator(excavator: str, method: str, timeout: float) -> dict:
+    """Query one method of the local Excavator API."""
+    command = json.dumps({"id": 1, "method": method, "params": []})
+    url = f"{excavator}/api?command={parse.quote(command)}"
+    with request.urlopen(url, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+def sample_snapshot(gpu_count: int) -> dict:
+    """Build a synthetic snapshot for testing without Excavator."""
+    devices = []
+    workers = []
+    for device_id in range(gpu_count):
+        uuid = f"GPU-sample-{device_id:04d}"
+        temp = random.randint(55, 70)
+        devices.append(
+            {
+                "device_id": device_id,
+                "name": "GeForce RTX 3070",
+                "subvendor": "1458",
+                "uuid": uuid,
+                "gpu_temp": temp,
+                "__vram_temp": temp + 20,
+                "__hotspot_temp": temp + 12,
+                "gpu_load": 100,
+                "gpu_load_memctrl": 90,
+                "gpu_power_usage": round(random.uniform(115, 125), 1),
+                "gpu_fan_speed": random.randint(55, 70),
+                "too_hot": False,
+            }
+        )
+        workers.append(
+            {
+                "worker_id": device_id,
+                "device_id": device_id,
+                "device_uuid": uuid,
+                "algorithms": [
+                    {
+                        "id": 20,
+                        "name": "daggerhashimoto",
+                        "speed": random.uniform(60e6, 62e6),
+                    }
+                ],
+            }
+        )
+    return {
+        "info": {
+            "version": "1.7.x",
+            "build_platform": "sample",
+            "build_number": 0,
+            "uptime": int(time.monotonic()),
+            "cpu_load": random.uniform(1, 10),
+            "ram_load": random.uniform(20, 40),
+        },
+        "devices.get": {"devices": devices},
+        "algorithm.list": {
+            "algorithms": [
+                {
+                    "algorithm_id": 20,
+                    "name": "daggerhashimoto",
+                    "speed": sum(w["algorithms"][0]["speed"] for w in workers),
+                }
+            ]
+        },
+        "worker.list": {"workers": workers},
+    }
+
+
+def read_snapshot(excavator: str, timeout: float) -> dict:
+    """Read a complete snapshot from Excavator."""
+    return {method: query_excavator(excavator, method, timeout) for method in METHODS}
+
+
+def push(webhook_url: str, snapshot: dict, timeout: float) -> None:
+    """Post a snapshot to the Home Assistant webhook."""
+    push_request = request.Request(
+        webhook_url,
+        data=json.dumps(snapshot).encode(),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    with request.urlopen(push_request, timeout=timeout):
+        pass
+
+
+def main() -> None:
+    """Push snapshots until interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("webhook_url", help="Home Assistant webhook url of the rig")
+    parser.add_argument(
+        "--excavator",
+        default="http://127.0.0.1:18000",
+        help="local Excavator API (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--interval", type=float, default=1, help="seconds between pushes"
+    )
+    parser.add_argument("--timeout", type=float, default=5, help="request timeout")
+    parser.add_argument(
+        "--sample",
+        type=int,
+        metavar="GPUS",
+        help="send synthetic snapshots with this many GPUs instead of reading Excavator",
+    )
+    parser.add_argument("--once", action="store_true", help="push a single snapshot")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    while True:
+        started = time.monotonic()
+        try:
+            if args.sample:
+                snapshot = sample_snapshot(args.sample)
+            else:
+                snapshot = read_snapshot(args.excavator, args.timeout)
+            push(args.webhook_url, snapshot, args.timeout)
+        except (OSError, ValueError) as error:
+            _LOGGER.warning("Push failed: %s", error)
+        if args.once:
+            return
+        time.sleep(max(0, args.interval - (time.monotonic() - started)))
+
+
+if __name__ == "__main__":
+    main()
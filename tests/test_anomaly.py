@@ -0,0 +1,34 @@
+"""Tests for the anomaly detector."""
+from types import SimpleNamespace
+
+from custom_components.nicehash_excavator.anomaly import AnomalyDetector
+from custom_components.nicehash_excavator.data_containers import (
+    Algorithm,
+    GraphicsCard,
+    Worker,
+)
+
+
+def simulated_rig(uuids: list[str], online: bool = True) -> SimpleNamespace:
+    """MiningRig poll with one worker mining per GPU."""
+    devices = {}
+    workers = {}
+    for device_id, uuid in enumerate(uuids):
+        devices[device_id] = GraphicsCard(id=device_id, uuid=uuid, gpu_temp=60)
+        worker = Worker(id=device_id, device_id=device_id, device_uuid=uuid)
+        worker.algorithms[20] = Algorithm(id=20, name="daggerhashimoto", speed=6e7)
+        workers[device_id] = worker
+    return SimpleNamespace(online=online, devices=devices, workers=workers)
+
+
+def test_forgets_removed_gpus() -> None:
+    """The state of a GPU missing from an online poll is dropped."""
+    detector = AnomalyDetector()
+    detector.check(simulated_rig(["GPU-0", "GPU-1"]), 0)
+    detector.check(simulated_rig([], online=False), 5)
+    assert len(detector._last_temps) == 2  # pylint: disable=protected-access
+
+    detector.check(simulated_rig(["GPU-0"]), 10)
+    # pylint: disable=protected-access
+    assert list(detector._last_temps) == ["GPU-0"]
+    assert list(detector._baselines) == [("GPU-0", "daggerhashimoto")]
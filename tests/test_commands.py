@@ -0,0 +1,91 @@
+"""Tests for the command queue of a rig."""
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import MagicMock, patch
+
+from custom_components.nicehash_excavator.commands import CommandQueue
+from custom_components.nicehash_excavator.data_containers import (
+    Algorithm,
+    GraphicsCard,
+    Worker,
+)
+
+UUID = "GPU-sim-0000"
+ALGORITHM = "daggerhashimoto"
+
+
+class SimulatedRig:
+    """MiningRig with a single GPU mining one algorithm."""
+
+    def __init__(self) -> None:
+        """Init SimulatedRig."""
+        self.entry_id = "sim"
+        self.name = "Simulated rig"
+        self.calls = []
+        self.fail = set()
+        self._device = GraphicsCard(id=0, uuid=UUID)
+        self.workers = {0: self._worker()}
+
+    @staticmethod
+    def _worker() -> Worker:
+        """The worker Excavator starts for the GPU."""
+        worker = Worker(id=0, device_id=0, device_uuid=UUID)
+        worker.algorithms[20] = Algorithm(id=20, name=ALGORITHM)
+        return worker
+
+    async def send(self, method: str, params: list[str]) -> dict:
+        """Apply a call to the simulated Excavator."""
+        self.calls.append(method)
+        if method in self.fail:
+            return {"error": "Failed"}
+        if method == "workers.free":
+            self.workers = {}
+        elif method == "workers.add":
+            self.workers = {0: self._worker()}
+        return {"error": None}
+
+    async def async_request_refresh(self) -> None:
+        """Polls are done by the test."""
+
+    def get_device_by_uuid(self, device_uuid: str) -> GraphicsCard | None:
+        """The GPU."""
+        return self._device if device_uuid == UUID else None
+
+    def get_workers_for_device(self, device_id: int) -> list[Worker]:
+        """The workers of the GPU."""
+        return [
+            worker for worker in self.workers.values() if worker.device_id == device_id
+        ]
+
+
+def flush(queue: CommandQueue) -> None:
+    """Send the pending batch."""
+    asyncio.run(queue._async_flush())  # pylint: disable=protected-access
+
+
+@patch("custom_components.nicehash_excavator.commands.Store")
+def test_failed_resume_keeps_paused_algorithms(store) -> None:
+    """The algorithms of a paused GPU are kept until it mines again."""
+    rig = SimulatedRig()
+    queue = CommandQueue(MagicMock(), rig, rig.send)
+    queue.set_mining(UUID, False)
+    flush(queue)
+    queue.confirm()
+    assert rig.workers == {}
+    assert queue.can_resume(UUID)
+
+    rig.fail.add("workers.add")
+    queue.set_mining(UUID, True)
+    flush(queue)
+    queue.confirm()
+    assert rig.calls[-1] == "workers.add"
+    assert queue.can_resume(UUID)
+
+    rig.fail.clear()
+    queue.set_mining(UUID, True)
+    flush(queue)
+    queue.confirm()
+    assert rig.get_workers_for_device(0)
+    assert not queue.can_resume(UUID)
+    store.return_value.async_save.assert_called_with({})
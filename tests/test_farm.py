@@ -0,0 +1,39 @@
+"""Tests for the farm totals."""
+from custom_components.nicehash_excavator.farm import Farm, RigContribution
+
+
+def contribution(temp: float, rig: str, power: float = 100) -> RigContribution:
+    """Contribution of an online rig with one GPU."""
+    return RigContribution(
+        online=True,
+        power=power,
+        hashrates={"daggerhashimoto": 6e7},
+        hottest_gpu=(temp, rig, 0),
+    )
+
+
+def test_hottest_gpu_follows_contributions() -> None:
+    """The hottest GPU is taken over and searched again when it cools down."""
+    farm = Farm()
+    farm.update_rig("a", contribution(70, "A"))
+    farm.update_rig("b", contribution(60, "B"))
+    assert farm.hottest_gpu == (70, "A", 0)
+
+    farm.update_rig("a", contribution(50, "A"))
+    assert farm.hottest_gpu == (60, "B", 0)
+
+    farm.remove_rig("b")
+    assert farm.hottest_gpu == (50, "A", 0)
+    farm.remove_rig("a")
+    assert farm.hottest_gpu is None
+
+
+def test_callbacks_only_on_changes() -> None:
+    """Listeners are not called for a poll that changes no total."""
+    farm = Farm()
+    calls = []
+    farm.register_callback(lambda: calls.append(farm.total_power))
+    farm.update_rig("a", contribution(70, "A"))
+    farm.update_rig("a", contribution(70, "A"))
+    farm.update_rig("a", contribution(70, "A", power=120))
+    assert calls == [100, 120]
@@ -0,0 +1,23 @@
+"""Tests for the rig filter."""
+from custom_components.nicehash_excavator.filters import RigFilter
+
+RIG_FILTER = RigFilter(
+    gpus=frozenset({"1", "GPU-sim-0002"}),
+    metrics=frozenset({"temp"}),
+    algorithms=frozenset({"kawpow"}),
+)
+
+
+def test_excludes_gpus_by_id_or_uuid() -> None:
+    """Entities of a GPU are excluded by its device id or uuid."""
+    assert RIG_FILTER.excludes(device_id=1, device_uuid="GPU-sim-0001")
+    assert RIG_FILTER.excludes(device_id=2, device_uuid="GPU-sim-0002")
+    assert not RIG_FILTER.excludes(device_id=0, device_uuid="GPU-sim-0000")
+
+
+def test_excludes_metrics_and_algorithms() -> None:
+    """Entities are excluded by metric class or algorithm, rig entities never."""
+    assert RIG_FILTER.excludes(device_id=0, device_uuid="GPU-sim-0000", metric="temp")
+    assert RIG_FILTER.excludes(metric="hashrate", algorithm="kawpow")
+    assert not RIG_FILTER.excludes(metric="hashrate", algorithm="daggerhashimoto")
+    assert not RIG_FILTER.excludes()
@@ -0,0 +1,97 @@
+"""Tests for the Excavator response parser."""
+import pytest
+
+from custom_components.nicehash_excavator.data_containers import GraphicsCard
+from custom_components.nicehash_excavator.parser import PayloadParser
+
+
+@pytest.fixture
+def parser() -> PayloadParser:
+    """Parser without a filter."""
+    return PayloadParser()
+
+
+def test_parse_devices(parser: PayloadParser) -> None:
+    """Devices are parsed with None for missing and invalid values."""
+    devices = parser.parse_devices(
+        {
+            "devices": [
+                {"device_id": 0, "name": "RTX 3080", "gpu_temp": 61.5},
+                {"device_id": 1, "gpu_temp": "hot", "too_hot": 1},
+            ]
+        }
+    )
+    assert devices == {
+        0: GraphicsCard(id=0, name="RTX 3080", gpu_temp=61.5),
+        1: GraphicsCard(id=1),
+    }
+
+
+def test_mixed_field_spellings(parser: PayloadParser) -> None:
+    """Every record accepts both spellings of experimental fields."""
+    devices = parser.parse_devices(
+        {
+            "devices": [
+                {"device_id": 0, "vram_temp": 80},
+                {"device_id": 1, "__vram_temp": 82},
+                {"device_id": 2, "hotspot_temp": 70, "__hotspot_temp": 71},
+            ]
+        }
+    )
+    assert devices[0].vram_temp == 80
+    assert devices[1].vram_temp == 82
+    assert devices[2].hotspot_temp == 71
+
+
+@pytest.mark.parametrize(
+    "response",
+    [
+        None,
+        "devices",
+        42,
+        ["devices"],
+        {},
+        {"devices": None},
+        {"devices": "gpu"},
+        {"devices": {"device_id": 0}},
+        {"devices": [None, 1, "gpu", ["device_id"]]},
+        {"devices": [{"name": "no id"}, {"device_id": "0"}, {"device_id": True}]},
+    ],
+)
+def test_malformed_devices(parser: PayloadParser, response) -> None:
+    """Malformed responses and records are skipped without raising."""
+    assert parser.parse_devices(response) == {}
+
+
+@pytest.mark.parametrize("response", [None, [], "workers", {"workers": [3]}])
+def test_malformed_workers(parser: PayloadParser, response) -> None:
+    """Malformed worker responses are skipped without raising."""
+    assert parser.parse_workers(response) == {}
+    assert parser.parse_algorithms(response) == {}
+
+
+def test_malformed_worker_algorithms(parser: PayloadParser) -> None:
+    """Workers keep their valid algorithms only."""
+    workers = parser.parse_workers(
+        {
+            "workers": [
+                {
+                    "worker_id": 0,
+                    "device_id": 0,
+                    "algorithms": [None, {"name": "no id"}, {"id": 20, "speed": 1.0}],
+                },
+                {"worker_id": 1, "algorithms": "daggerhashimoto"},
+            ]
+        }
+    )
+    assert list(workers[0].algorithms) == [20]
+    assert workers[0].algorithms[20].speed == 1.0
+    assert workers[1].algorithms == {}
+
+
+def test_parse_info_ignores_invalid_values(parser: PayloadParser) -> None:
+    """Info fields of the wrong type are None."""
+    info = parser.parse_info({"version": 1, "build_number": "7", "uptime": 12.5})
+    assert info.version is None
+    assert info.build_number is None
+    assert info.uptime == 12.5
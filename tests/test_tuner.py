@@ -0,0 +1,168 @@
+"""Tests for the power limit tuner against a simulated rig."""
+from __future__ import annotations
+
+import math
+from unittest.mock import MagicMock
+
+from custom_components.nicehash_excavator.const import (
+    TUNER_OFFLINE_TIMEOUT,
+    TUNER_SETTLE_TIME,
+    TUNER_WINDOW,
+)
+from custom_components.nicehash_excavator.data_containers import (
+    Algorithm,
+    GraphicsCard,
+    Worker,
+)
+from custom_components.nicehash_excavator.tuner import EfficiencyTuner, PowerLimitTuner
+
+UUID = "GPU-sim-0000"
+ALGORITHM = "daggerhashimoto"
+POLL_INTERVAL = 5
+
+
+def simulated_gpu(limit: float) -> tuple[float, float, float]:
+    """Hashrate, power and temperature of a GPU at a power limit.
+
+    The hashrate saturates at high power limits, so the efficiency peaks in
+    between. The GPU draws its power limit up to 220 W.
+    """
+    hashrate = 62e6 * max(0.0, 1 - math.exp(-(limit - 60) / 35))
+    power = min(limit, 220)
+    return hashrate, power, 50 + power * 0.12
+
+
+def most_efficient_limit(start_limit: float, min_limit: float = 50) -> float:
+    """Power limit with the best efficiency among the tuner steps."""
+    limits = range(int(start_limit), int(min_limit) - 1, -10)
+    return max(limits, key=lambda limit: simulated_gpu(limit)[0] / limit)
+
+
+def run(tuner: PowerLimitTuner, gpu=simulated_gpu) -> float:
+    """Poll the simulated GPU until the tuner is done, return the final limit."""
+    limit = tuner.start_limit
+    now = 0
+    while not tuner.done:
+        new_limit = tuner.add_sample(now, *gpu(limit))
+        if new_limit is not None:
+            limit = new_limit
+        now += POLL_INTERVAL
+    return limit
+
+
+def test_finds_most_efficient_limit() -> None:
+    """The search ends on the most efficient power limit."""
+    tuner = PowerLimitTuner(220, max_temp=90)
+    assert run(tuner) == most_efficient_limit(220)
+    assert tuner.best.power_limit == tuner.limit
+
+
+def test_skips_too_hot_limits() -> None:
+    """Limits at which the GPU is too hot are never the result."""
+
+    def hot_gpu(limit):
+        hashrate, power, _ = simulated_gpu(limit)
+        return hashrate, power, 90 if limit > 150 else 60
+
+    tuner = PowerLimitTuner(220, max_temp=75)
+    assert run(tuner, hot_gpu) == most_efficient_limit(150)
+
+
+def test_ends_on_start_limit_without_result() -> None:
+    """A GPU too hot at every limit goes back to the start limit."""
+    tuner = PowerLimitTuner(100, max_temp=75)
+    assert run(tuner, lambda limit: (1e6, limit, 80)) == 100
+    assert tuner.best is None
+
+
+class SimulatedRig:
+    """MiningRig with a single simulated GPU mining one algorithm."""
+
+    def __init__(self) -> None:
+        """Init SimulatedRig."""
+        self.entry_id = "sim"
+        self.name = "Simulated rig"
+        self.online = True
+        self.limit = 200
+        self.commands = MagicMock()
+        self.commands.power_limits = {UUID: self.limit}
+        self.commands.set_power_limit.side_effect = self._set_power_limit
+        self._device = GraphicsCard(id=0, uuid=UUID)
+        self._algorithm = Algorithm(id=20, name=ALGORITHM)
+        self._worker = Worker(id=0, device_id=0, device_uuid=UUID)
+        self._worker.algorithms[20] = self._algorithm
+
+    def _set_power_limit(self, device_uuid: str, watts: float) -> None:
+        """Apply a power limit, only reachable GPUs accept it."""
+        assert self.online
+        self.limit = self.commands.power_limits[device_uuid] = watts
+
+    def poll(self) -> None:
+        """Measure the simulated GPU at its power limit."""
+        speed, power, temp = simulated_gpu(self.limit)
+        self._algorithm.speed = speed
+        self._device.gpu_power_usage = power
+        self._device.gpu_temp = temp
+
+    def get_device_by_uuid(self, device_uuid: str) -> GraphicsCard | None:
+        """The GPU, None while offline."""
+        return self._device if self.online and device_uuid == UUID else None
+
+    def get_workers_for_device(self, device_id: int) -> list[Worker]:
+        """The worker of the GPU, none while offline."""
+        return [self._worker] if self.online and device_id == 0 else []
+
+    def get_worker_algorithm(self, device_uuid: str, name: str) -> Algorithm | None:
+        """The algorithm of the worker of the GPU."""
+        if self.online and device_uuid == UUID and name == ALGORITHM:
+            return self._algorithm
+        return None
+
+
+def poll_until(tuner: EfficiencyTuner, rig: SimulatedRig, now: float, end: float):
+    """Feed polls to the tuner until end or until the search is over."""
+    while now < end and tuner.is_tuning(UUID):
+        rig.poll()
+        tuner.add_snapshot(now)
+        now += POLL_INTERVAL
+    return now
+
+
+def test_rig_tuning_survives_short_outage() -> None:
+    """A search pauses while the rig is offline and finishes afterwards."""
+    rig = SimulatedRig()
+    tuner = EfficiencyTuner(MagicMock(), rig)
+    assert tuner.start(UUID, max_temp=90)
+    now = poll_until(tuner, rig, 0, TUNER_SETTLE_TIME + TUNER_WINDOW / 2)
+
+    rig.online = False
+    limit = rig.limit
+    now = poll_until(tuner, rig, now, now + TUNER_OFFLINE_TIMEOUT / 2)
+    assert tuner.is_tuning(UUID)
+
+    rig.online = True
+    rig.limit = 250  # Excavator restarted with its default limit
+    tuner.add_snapshot(now)
+    assert rig.limit == limit
+    poll_until(tuner, rig, now, math.inf)
+    assert rig.limit == most_efficient_limit(200)
+    assert tuner.get_result(UUID, ALGORITHM).power_limit == rig.limit
+
+
+def test_rig_outage_aborts_and_restores_start_limit() -> None:
+    """A search aborted while offline restores its start limit once back."""
+    rig = SimulatedRig()
+    tuner = EfficiencyTuner(MagicMock(), rig)
+    assert tuner.start(UUID, max_temp=90)
+    now = poll_until(tuner, rig, 0, 2 * (TUNER_SETTLE_TIME + TUNER_WINDOW))
+    assert rig.limit < 200
+
+    rig.online = False
+    now = poll_until(tuner, rig, now, now + TUNER_OFFLINE_TIMEOUT + POLL_INTERVAL)
+    assert not tuner.is_tuning(UUID)
+    assert rig.limit < 200
+
+    rig.online = True
+    tuner.add_snapshot(now)
+    assert rig.limit == 200
+    assert tuner.get_result(UUID, ALGORITHM) is None